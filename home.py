@@ -1,11 +1,16 @@
 import streamlit as st
 
+from src import warmup
+
 st.set_page_config(
     page_title="Painel de Conjuntura da Economia do Brasil",
     layout="wide",
     initial_sidebar_state="expanded",
 )
 
+# carrega datasets e visões padrão das páginas em segundo plano (uma vez por processo)
+warmup.start()
+
 st.title("Painel de Conjuntura da Economia do Brasil")
 st.write("Selecione um painel abaixo ou use o menu lateral para navegar.")
 
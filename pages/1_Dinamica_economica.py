@@ -1,73 +1,21 @@
-from pathlib import Path
-
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from src import data_access
+from src.regional import UF_SIGLAS
+
 st.set_page_config(page_title="Dinâmica econômica", layout="wide")
 st.title("Dinâmica econômica")
 
 
 # -----------------------
-# Caminhos para o data set
-# -----------------------
-BASE_DIR = Path(__file__).resolve().parents[1]  # # dados/ processed - acessa os dados tratados
-DATA_DIR = BASE_DIR / "data" / "processed"
-
-PIB_PATH = DATA_DIR / "pibs_quarterly.parquet"
-IBC_PATH = DATA_DIR / "sgs_dados.parquet"
-PPP_PATH = DATA_DIR / "indust_comer_serv.parquet"
-
-# -----------------------
-# Loaders- funções utilizadas (building features) para carregar dados e tratar os dados
-# -----------------------
-@st.cache_data(show_spinner=False)
-def load_parquet(path: Path) -> pd.DataFrame:
-    df = pd.read_parquet(path)
-
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-
-    if "value" in df.columns:
-        df["value"] = pd.to_numeric(df["value"], errors="coerce")
-
-    return df
-
-
-@st.cache_data(show_spinner=False)
-def load_sgs_monthly(path: Path) -> pd.DataFrame:
-    df = pd.read_parquet(path).copy()
-
-    # Se Date está no índice, traz para coluna
-    #if "Date" not in df.columns:
-     #   df = df.reset_index()
-
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df["date"] = df["date"]
-
-    return df
-
-@st.cache_data(show_spinner=False)
-def load_indus_comer_serv(path: Path) -> pd.DataFrame:
-    df = pd.read_parquet(path).copy()
- # Se a coluna date não existir, traze do índice e, após isso, converte para datetime.
-    if "date" not in df.columns:
-        df = df.reset_index()
-
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-
-    # garante ordem e remove datas inválidas
-    df = df.dropna(subset=["date"]).sort_values("date").reset_index(drop=True)
-
-    return df
-
-# -----------------------
-# Transformações
+# Dados (src/data_access.py: um carregador por dataset, compartilhado entre as páginas)
 # -----------------------
-def add_quarter_label(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
-    out["trimestre"] = out["date"].dt.to_period("Q").astype(str)
-    return out
+PIB = "pib"
+IBC = "sgs"
+PPP = "indust-comer-serv"
+REGIONAL = "regional-mensal"  # Brasil e regiões no parquet, UFs no store (particionado por UF)
 
 
 # -----------------------
@@ -192,7 +140,7 @@ def render_last_value_metrics(df: pd.DataFrame, cols: list[tuple[str, str]]):
             cols_ui[i].metric(label, f"{v:.1f}%")
 
 def wide_to_long(df: pd.DataFrame, date_col: str, value_cols: list[str], name_map: dict[str, str]) -> pd.DataFrame:
-    out = df[[date_col] + value_cols].copy()
+    out = df[[date_col] + value_cols]
     out = out.melt(id_vars=[date_col], var_name="serie", value_name="value")
     out["serie"] = out["serie"].map(name_map).fillna(out["serie"])
     out["value"] = pd.to_numeric(out["value"], errors="coerce")
@@ -210,12 +158,11 @@ def main() -> None:
     # =====================
     st.subheader("Produto Interno Bruto (trimestral)")
 
-    if not PIB_PATH.exists():
-        st.error(f"Arquivo não encontrado: {PIB_PATH}")
+    if not data_access.exists(PIB):
+        st.error(f"Arquivo não encontrado: {data_access.path(PIB)}")
         st.stop()
 
-    pib = load_parquet(PIB_PATH)
-    pib = add_quarter_label(pib)
+    pib = data_access.load_quarterly(PIB)
 
     possible_dim_cols = [c for c in ["setor", "grupo"] if c in pib.columns]
     dim_col = possible_dim_cols[0] if possible_dim_cols else None
@@ -257,13 +204,13 @@ def main() -> None:
             df_view = (
                 pib[pib[dim_col].isin(selected if selected is not None else [])]
                 .sort_values("date")
-                .groupby(dim_col, as_index=False)
+                .groupby(dim_col, as_index=False, observed=True)
                 .tail(4)
             )
 
         st.dataframe(df_view, width="stretch")
 
-    plot_df = pib.copy()
+    plot_df = pib
     if dim_col is not None:
         plot_df = plot_df[plot_df[dim_col].isin(selected)]
 
@@ -280,11 +227,11 @@ def main() -> None:
     # =====================
     st.subheader("Índice de Atividade Econômica (IBC-Br)")
 
-    if not IBC_PATH.exists():
-        st.info(f"Arquivo mensal não encontrado: {IBC_PATH}")
+    if not data_access.exists(IBC):
+        st.info(f"Arquivo mensal não encontrado: {data_access.path(IBC)}")
         return
 
-    sgs_m = load_sgs_monthly(IBC_PATH)
+    sgs_m = data_access.load(IBC)
 
     if "ibc_br" not in sgs_m.columns:
         st.warning("A coluna 'ibc_br' não foi encontrada em sgs_mensal.parquet.")
@@ -338,10 +285,10 @@ def main() -> None:
     st.divider()
     st.header("Indústria, comércio e serviços")
 
-    if not PPP_PATH.exists():
-        st.info(f"Arquivo não encontrado: {PPP_PATH}")
+    if not data_access.exists(PPP):
+        st.info(f"Arquivo não encontrado: {data_access.path(PPP)}")
     else:
-        ppp = load_indus_comer_serv(PPP_PATH)
+        ppp = data_access.load(PPP)
 
         # --- métricas: último valor observado ---
         st.subheader("Indicadores (% 12 meses)")
@@ -425,6 +372,43 @@ def main() -> None:
                 width="stretch",
             )
 
+        # --- recorte por UF ---
+        st.subheader("Por UF (% 12 meses)")
+        if not data_access.exists(REGIONAL) or not data_access.has_uf(REGIONAL):
+            st.info("Gere os dados regionais no pipeline (build regional-mensal) para habilitar esta visualização.")
+        else:
+            u1, u2 = st.columns([1, 2])
+            with u1:
+                ufs = sorted(UF_SIGLAS.values())
+                uf_sel = st.selectbox("UF", ufs, index=ufs.index("SP"), key="ppp_uf")
+            reg = data_access.load_regional(REGIONAL, uf_sel)
+
+            with u2:
+                uf_label = st.selectbox(
+                    "Indicador", [series_map[c] for c in series_cols if c in reg.columns], key="ppp_uf_var"
+                )
+            uf_col = inv_map[uf_label]
+
+            # UF, sua região (quando o IBGE publica) e Brasil
+            regiao = reg.loc[reg["uf"] == uf_sel, "regiao"].dropna()
+            regiao = str(regiao.iloc[0]) if not regiao.empty else None
+            keep = (
+                (reg["uf"] == uf_sel)
+                | (reg["nivel"] == "Brasil")
+                | ((reg["nivel"] == "Região") & (reg["regiao"] == regiao))
+            )
+            uf_df = reg.loc[keep, ["date", "nome", uf_col]].dropna().rename(columns={uf_col: "value"})
+            uf_df["nome"] = uf_df["nome"].astype(str)
+
+            if uf_df.empty:
+                st.info(f"O IBGE não publica {uf_label} para {uf_sel}.")
+            else:
+                fig_uf = px.line(
+                    uf_df.sort_values("date"), x="date", y="value", color="nome", title=f"{uf_label} — {uf_sel}"
+                )
+                fig_uf.update_layout(xaxis_title="Data", yaxis_title="Variação (%)", legend_title_text="")
+                st.plotly_chart(fig_uf, width="stretch", key="ppp_uf_line")
+
 
 # Execução
 main()
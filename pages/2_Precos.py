@@ -1,9 +1,10 @@
-from pathlib import Path
-
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from src import data_access
+from src.ipca import LEVEL_NAMES, INDICE_GERAL
+
 
 # -----------------------
 # Configuração da página - Cabeçalho da página (tem que se iniciar por aqui)
@@ -13,66 +14,16 @@ st.title("Preços ao consumidor e ao produtor")
 
 
 # -----------------------
-# Caminhos para o data set
+# Dados (src/data_access.py: um carregador por dataset, compartilhado entre as páginas)
 # -----------------------
-
-BASE_DIR = Path(__file__).resolve().parents[1]  # dados/ processed - acessa os dados tratados
-DATA_DIR = BASE_DIR / "data" / "processed"
-
-SGS_PATH = DATA_DIR / "sgs_dados.parquet"
-IPP_PATH = DATA_DIR / "ipp_m.parquet"
-IPCA_GRUPOS_PATH = DATA_DIR / "ipca_grupos.parquet"
+SGS = "sgs"
+IPP = "ipp"
+IPCA_GRUPOS = "ipca-grupos"
 
 
 # -----------------------
-# Loaders
+# Utilitários
 # -----------------------
-@st.cache_data(show_spinner=False)
-
-def load_monthly_parquet_flexible(path: Path) -> pd.DataFrame:
-    df = pd.read_parquet(path).copy()
-
-    # Caso 1: já existe coluna date
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-
-    # Caso 2: existe coluna Date
-    elif "Date" in df.columns:
-        df["date"] = pd.to_datetime(df["Date"], errors="coerce")
-
-    # Caso 3: data está no índice (com qualquer nome)
-    else:
-        df = df.reset_index()
-
-        # tenta achar uma coluna de data entre as primeiras mais prováveis
-        candidates = [c for c in ["date", "Date", "index"] if c in df.columns]
-        if candidates:
-            df["date"] = pd.to_datetime(df[candidates[0]], errors="coerce")
-        else:
-            # fallback: tenta usar a primeira coluna e converter
-            first_col = df.columns[0]
-            df["date"] = pd.to_datetime(df[first_col], errors="coerce")
-
-    df = df.dropna(subset=["date"]).sort_values("date").reset_index(drop=True)
-    return df
-
-
-
-@st.cache_data(show_spinner=False)
-def load_ipp_long(path: Path) -> pd.DataFrame:
-    df = pd.read_parquet(path).copy()
-
-    # garante colunas esperadas
-    if "date" not in df.columns:
-        df = df.reset_index()
-
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df["value"] = pd.to_numeric(df["value"], errors="coerce")
-
-    df = df.dropna(subset=["date", "value"]).sort_values("date").reset_index(drop=True)
-    return df
-
-
 def last_value(df: pd.DataFrame, col: str):
     s = df[["date", col]].dropna().sort_values("date")
     if s.empty:
@@ -96,7 +47,7 @@ def build_line(df: pd.DataFrame, col: str, title: str, y_label: str):
 
 
 def wide_to_long(df: pd.DataFrame, cols: list[str], name_map: dict[str, str]) -> pd.DataFrame:
-    out = df[["date"] + cols].copy()
+    out = df[["date"] + cols]
     out = out.melt(id_vars=["date"], var_name="serie", value_name="value")
     out["serie"] = out["serie"].map(name_map).fillna(out["serie"])
     out["value"] = pd.to_numeric(out["value"], errors="coerce")
@@ -110,51 +61,17 @@ def last_value_for_sector(ipp: pd.DataFrame, setor: str):
         return None, None
     return s.iloc[-1]["date"], float(s.iloc[-1]["value"])
 
-def load_ipca_grupos_long(path: Path) -> pd.DataFrame:
-    df = pd.read_parquet(path).copy()
-
-    # esperado: date, grupo, indicador, value
-    if "date" not in df.columns:
-        df = df.reset_index()
-
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df["value"] = pd.to_numeric(df["value"], errors="coerce")
-
-    df = df.dropna(subset=["date", "grupo", "indicador", "value"]).sort_values(["date", "grupo"])
-    return df
-
-def ipca_contribuicoes(df_ipca_grupos: pd.DataFrame) -> pd.DataFrame:
-    # separa var mensal e peso mensal
-    var_m = (
-        df_ipca_grupos[df_ipca_grupos["indicador"] == "variacao_mensal"]
-        .rename(columns={"value": "variacao_mensal"})
-        [["date", "grupo", "variacao_mensal"]]
-    )
-
-    peso_m = (
-        df_ipca_grupos[df_ipca_grupos["indicador"] == "peso_mensal"]
-        .rename(columns={"value": "peso_mensal"})
-        [["date", "grupo", "peso_mensal"]]
-    )
-
-    # merge por date+grupo
-    out = var_m.merge(peso_m, on=["date", "grupo"], how="inner")
-
-    # contribuição em pontos percentuais (p.p.)
-    out["contrib_pp"] = out["variacao_mensal"] * out["peso_mensal"] / 100.0
-
-    return out
 
 # -----------------------
 # Página
 # -----------------------
 st.header("Inflação ao consumidor (IPCA)")
 
-if not SGS_PATH.exists():
-    st.error(f"Arquivo não encontrado: {SGS_PATH}")
+if not data_access.exists(SGS):
+    st.error(f"Arquivo não encontrado: {data_access.path(SGS)}")
     st.stop()
 
-sgs = load_monthly_parquet_flexible(SGS_PATH)
+sgs = data_access.load(SGS)
 
 needed = ["ipca", "ipca_12m"]
 missing = [c for c in needed if c not in sgs.columns]
@@ -214,20 +131,17 @@ st.divider()
 # =========================
 st.subheader("Composição do IPCA mensal (contribuições por grupo)")
 
-if not IPCA_GRUPOS_PATH.exists():
-    st.info(f"Arquivo não encontrado: {IPCA_GRUPOS_PATH}")
+if not data_access.exists(IPCA_GRUPOS):
+    st.info(f"Arquivo não encontrado: {data_access.path(IPCA_GRUPOS)}")
     st.info("Gere o ipca_grupos.parquet no pipeline para habilitar esta visualização.")
 else:
-    # 1) carrega e calcula contribuições
-    ipca_g = load_ipca_grupos_long(IPCA_GRUPOS_PATH)
-    contrib = ipca_contribuicoes(ipca_g)
+    # 1) carrega hierarquia e matrizes de contribuição (data x código)
+    hier, _, contrib = data_access.ipca_contribuicoes()
+    nomes = hier.set_index("codigo")["grupo"]
 
-    # ref mensal (robusto p/ merge e filtros)
-    contrib["ref"] = contrib["date"].dt.to_period("M").astype(str)
-
-    # 2) filtros de período (UI)
-    min_d = contrib["date"].min()
-    max_d = contrib["date"].max()
+    # 2) filtros de período e nível de detalhe (UI)
+    min_d = contrib.index.min()
+    max_d = contrib.index.max()
 
     c_left, c_right = st.columns([2, 1])
     with c_left:
@@ -239,22 +153,26 @@ else:
             key="ipca_comp_period",
         )
 
+        # só códigos com filhos podem ser detalhados (índice geral -> grupos -> ... -> itens)
+        pais = hier[hier["codigo"].isin(hier["pai"].dropna())]
+        rotulos = {
+            c: "Índice geral (grupos)" if c == INDICE_GERAL else f"{LEVEL_NAMES[int(n)]}: {g}"
+            for c, g, n in zip(pais["codigo"], pais["grupo"], pais["nivel"])
+        }
+        pai_sel = st.selectbox("Detalhar", list(rotulos), format_func=rotulos.get, key="ipca_comp_pai")
+
     start, end = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1])
-    contrib_f = contrib[(contrib["date"] >= start) & (contrib["date"] <= end)].copy()
+    if (start, end) == (min_d, max_d):
+        start = end = None  # período inteiro: a composição já em cache
+
+    # 3) contribuições dos filhos do código escolhido (compartilhadas entre as sessões), no período
+    contrib_f = data_access.ipca_composicao(pai_sel, start, end)
 
     if contrib_f.empty:
         st.warning("Sem dados no período selecionado.")
         st.stop()
 
-    # 3) remove “índice geral/cheio” do detalhamento (não entra no stack)
-    mask_geral = contrib_f["grupo"].str.contains(
-        r"índice geral|geral|índice\s+cheio",
-        case=False,
-        na=False,
-    )
-    contrib_f = contrib_f[~mask_geral].copy()
-
-    # 4) seleção de grupos (UI) — AGORA sim contrib_f existe
+    # 4) seleção de grupos (UI)
     with c_right:
         st.caption("Seleção de grupos")
 
@@ -275,7 +193,7 @@ else:
                 "Escolher grupos (empilhado)",
                 grupos_all,
                 default=grupos_all,
-                key="ipca_grupos_multiselect",
+                key=f"ipca_grupos_multiselect_{pai_sel}",
             )
 
         agrupar_outros = st.checkbox(
@@ -290,10 +208,11 @@ else:
 
     # 5) aplica seleção ao dataset
     if agrupar_outros:
-        contrib_f["grupo_plot"] = contrib_f["grupo"].where(contrib_f["grupo"].isin(grupos_sel), "Outros")
+        grupo = contrib_f["grupo"].astype(str)
+        contrib_f["grupo_plot"] = grupo.where(grupo.isin(grupos_sel), "Outros")
     else:
-        contrib_f = contrib_f[contrib_f["grupo"].isin(grupos_sel)].copy()
-        contrib_f["grupo_plot"] = contrib_f["grupo"]
+        contrib_f = contrib_f[contrib_f["grupo"].isin(grupos_sel)]
+        contrib_f = contrib_f.assign(grupo_plot=contrib_f["grupo"].astype(str))
 
     # 6) agrega para stack por mês
     plot_stack = (
@@ -313,11 +232,14 @@ else:
     total_pp["date"] = pd.to_datetime(total_pp["ref"] + "-01") + pd.offsets.MonthEnd(0)
 
     # 7) índice geral: usa SGS se existir, senão usa ipca_calc
-    line_df = total_pp[["date", "ref", "ipca_calc"]].copy()
-    line_df["indice_geral"] = line_df["ipca_calc"]  # default
-
-    if "ipca" in sgs.columns:
-        tmp = sgs[["date", "ipca"]].dropna().copy()
+    #    (detalhando um grupo, a linha é a contribuição do próprio grupo)
+    line_df = total_pp[["date", "ref", "ipca_calc"]].assign(indice_geral=total_pp["ipca_calc"])  # default
+    line_name = "Índice geral" if pai_sel == INDICE_GERAL else nomes[pai_sel]
+
+    if pai_sel != INDICE_GERAL and pai_sel in contrib.columns:
+        line_df["indice_geral"] = line_df["date"].map(contrib[pai_sel]).combine_first(line_df["ipca_calc"])
+    elif "ipca" in sgs.columns:
+        tmp = sgs[["date", "ipca"]].dropna()
         tmp["date"] = pd.to_datetime(tmp["date"], errors="coerce")
         tmp["ref"] = tmp["date"].dt.to_period("M").astype(str)
         ipca_headline = tmp.groupby("ref", as_index=False)["ipca"].last()
@@ -336,7 +258,7 @@ else:
         st.metric("Somatório das contribuições (p.p.)", f"{last_calc:.2f}%")
 
     # highlights do último mês
-    last_month = contrib_f[contrib_f["ref"] == last_ref].copy()
+    last_month = contrib_f[contrib_f["ref"] == last_ref]
     if not last_month.empty:
         rank = (
             last_month.groupby("grupo_plot", as_index=False)["contrib_pp"]
@@ -360,14 +282,14 @@ else:
         x="date",
         y="contrib_pp",
         color="grupo_plot",
-        title="IPCA mensal — contribuições por grupo (p.p.) + índice geral",
+        title=f"IPCA mensal — contribuições (p.p.) + {line_name}",
     )
 
     fig_combo.add_scatter(
         x=line_df["date"],
         y=line_df["indice_geral"],
         mode="lines+markers",
-        name="Índice geral",
+        name=line_name,
         yaxis="y2",
     )
 
@@ -376,7 +298,7 @@ else:
         xaxis_title="Data",
         yaxis_title="Contribuição (p.p.)",
         yaxis2=dict(
-            title="Índice geral (%)",
+            title="Índice geral (%)" if pai_sel == INDICE_GERAL else f"{line_name} (p.p.)",
             overlaying="y",
             side="right",
             showgrid=False,
@@ -415,7 +337,7 @@ else:
     # 10) tabela de pesos — última referência
     weights_last = (
         contrib_f[contrib_f["ref"] == last_ref]
-        .groupby("grupo", as_index=False)["peso_mensal"]
+        .groupby("grupo", as_index=False, observed=True)["peso_mensal"]
         .mean()
         .sort_values("peso_mensal", ascending=False)
     )
@@ -435,11 +357,11 @@ st.divider()
 
 st.header("Preços ao produtor em 12 meses (IPP)")
 
-if not IPP_PATH.exists():
-    st.info(f"Arquivo não encontrado: {IPP_PATH}")
+if not data_access.exists(IPP):
+    st.info(f"Arquivo não encontrado: {data_access.path(IPP)}")
     st.stop()
 
-ipp = load_ipp_long(IPP_PATH)
+ipp = data_access.load(IPP)
 
 required_cols = {"date", "setor_ipp", "value"}
 if not required_cols.issubset(set(ipp.columns)):
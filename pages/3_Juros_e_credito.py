@@ -1,9 +1,9 @@
-from pathlib import Path
-
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from src import data_access
+
 
 # -----------------------
 # Configuração da página
@@ -13,46 +13,15 @@ st.title("Juros e crédito")
 
 
 # -----------------------
-# Caminhos
+# Dados (src/data_access.py: um carregador por dataset, compartilhado entre as páginas)
 # -----------------------
-BASE_DIR = Path(__file__).resolve().parents[1] 
-DATA_DIR = BASE_DIR / "data" / "processed"
-
-SGS_PATH = DATA_DIR / "sgs_dados.parquet"
-SELIC_PATH = DATA_DIR / "selic_mensal.parquet"
+SGS = "sgs"
+SELIC = "selic"
 
 
 # -----------------------
-# Loaders / utilitários
+# Utilitários
 # -----------------------
-@st.cache_data(show_spinner=False)
-def load_monthly_parquet_flexible(path: Path) -> pd.DataFrame:
-    df = pd.read_parquet(path).copy()
-
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    elif "Date" in df.columns:
-        df["date"] = pd.to_datetime(df["Date"], errors="coerce")
-    else:
-        df = df.reset_index()
-        candidates = [c for c in ["date", "Date", "index"] if c in df.columns]
-        if candidates:
-            df["date"] = pd.to_datetime(df[candidates[0]], errors="coerce")
-        else:
-            df["date"] = pd.to_datetime(df[df.columns[0]], errors="coerce")
-
-    for c in df.columns:
-        if c == "date":
-            continue
-        try:
-            df[c] = pd.to_numeric(df[c])
-        except (ValueError, TypeError):
-            pass
-
-    df = df.dropna(subset=["date"]).sort_values("date").reset_index(drop=True)
-    return df
-
-
 def last_value(df: pd.DataFrame, col: str):
     s = df[["date", col]].dropna().sort_values("date")
     if s.empty:
@@ -69,7 +38,7 @@ def metric_last(df: pd.DataFrame, label: str, col: str, fmt: str = "{:.2f}"):
 
 
 def wide_to_long(df: pd.DataFrame, cols: list[str], name_map: dict[str, str]) -> pd.DataFrame:
-    out = df[["date"] + cols].copy()
+    out = df[["date"] + cols]
     out = out.melt(id_vars=["date"], var_name="serie", value_name="value")
     out["serie"] = out["serie"].map(name_map).fillna(out["serie"])
     out["value"] = pd.to_numeric(out["value"], errors="coerce")
@@ -117,7 +86,7 @@ def filter_last_months(df: pd.DataFrame, months: int) -> pd.DataFrame:
         return df
     end = df["date"].max()
     start = end - pd.DateOffset(months=months)
-    return df[df["date"] >= start].copy()
+    return df[df["date"] >= start]
 
 def format_br_number(x, decimals=0):
     if x is None or pd.isna(x):
@@ -132,10 +101,10 @@ def format_br_number(x, decimals=0):
 # -----------------------
 st.header("Política monetária (Selic)")
 
-if not SELIC_PATH.exists():
-    st.error(f"Arquivo não encontrado: {SELIC_PATH}")
+if not data_access.exists(SELIC):
+    st.error(f"Arquivo não encontrado: {data_access.path(SELIC)}")
 else:
-    selic_df = load_monthly_parquet_flexible(SELIC_PATH)
+    selic_df = data_access.load(SELIC)
 
     # tenta achar automaticamente a coluna da selic
     possible_selic_cols = [c for c in ["selic", "Selic", "selic_mensal"] if c in selic_df.columns]
@@ -177,12 +146,11 @@ st.divider()
 # -----------------------
 st.header("Mercado de crédito")
 
-if not SGS_PATH.exists():
-    st.error(f"Arquivo não encontrado: {SGS_PATH}")
+if not data_access.exists(SGS):
+    st.error(f"Arquivo não encontrado: {data_access.path(SGS)}")
     st.stop()
 
-sgs = load_monthly_parquet_flexible(SGS_PATH)
-sgs = filter_last_months(sgs, 180)  # último 15 anos (ajuste)
+sgs = data_access.load_recent(SGS, 180)  # último 15 anos (ajuste)
 
 # -------------------
 # 2.1 Crédito (área)
@@ -1,9 +1,10 @@
-from pathlib import Path
-
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from src import data_access
+from src.regional import UF_SIGLAS
+
 
 # -----------------------
 # Configuração da página
@@ -13,43 +14,15 @@ st.title("Emprego e dados socioeconômicos")
 
 
 # -----------------------
-# Caminhos
+# Dados (src/data_access.py: um carregador por dataset, compartilhado entre as páginas)
 # -----------------------
-BASE_DIR = Path(__file__).resolve().parents[1]  # dashboard/ -> raiz do projeto
-DATA_DIR = BASE_DIR / "data" / "processed"
-SOCIO_PATH = DATA_DIR / "socioeconomico_quarterly.parquet"
+SOCIO = "socioeconomico"
+REGIONAL = "regional-trimestral"  # Brasil e regiões no parquet, UFs no store (particionado por UF)
 
 
 # -----------------------
 # Utilitários
 # -----------------------
-@st.cache_data(show_spinner=False)
-def load_quarterly_parquet(path: Path) -> pd.DataFrame:
-    df = pd.read_parquet(path).copy()
-
-    # garantir datetime
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    elif "Date" in df.columns:
-        df["date"] = pd.to_datetime(df["Date"], errors="coerce")
-    else:
-        df = df.reset_index()
-        first = df.columns[0]
-        df["date"] = pd.to_datetime(df[first], errors="coerce")
-
-    # converter numéricos com try/except (sem errors="ignore")
-    for c in df.columns:
-        if c == "date":
-            continue
-        try:
-            df[c] = pd.to_numeric(df[c])
-        except (ValueError, TypeError):
-            pass
-
-    df = df.dropna(subset=["date"]).sort_values("date").reset_index(drop=True)
-    return df
-
-
 def format_br_number(x, decimals=0):
     if x is None or pd.isna(x):
         return "n/d"
@@ -71,14 +44,8 @@ def last_value(df: pd.DataFrame, col: str):
     return s.iloc[-1]["date"], float(s.iloc[-1][col])
 
 
-def add_quarter_col(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
-    out["trimestre"] = out["date"].dt.to_period("Q").astype(str)
-    return out
-
-
 def wide_to_long(df: pd.DataFrame, cols: list[str], name_map: dict[str, str]) -> pd.DataFrame:
-    out = df[["date", "trimestre"] + cols].copy()
+    out = df[["date", "trimestre"] + cols]
     out = out.melt(id_vars=["date", "trimestre"], var_name="serie", value_name="value")
     out["serie"] = out["serie"].map(name_map).fillna(out["serie"])
     out["value"] = pd.to_numeric(out["value"], errors="coerce")
@@ -106,12 +73,11 @@ def series_selector(title: str, options: list[str], default: list[str], key_pref
 # -----------------------
 # Carregamento
 # -----------------------
-if not SOCIO_PATH.exists():
-    st.error(f"Arquivo não encontrado: {SOCIO_PATH}")
+if not data_access.exists(SOCIO):
+    st.error(f"Arquivo não encontrado: {data_access.path(SOCIO)}")
     st.stop()
 
-df = load_quarterly_parquet(SOCIO_PATH)
-df = add_quarter_col(df)
+df = data_access.load_quarterly(SOCIO)
 
 # colunas esperadas (ajusta aqui se necessário)
 cols_expected = [
@@ -225,7 +191,40 @@ st.plotly_chart(fig_bar, width="stretch")
 st.divider()
 
 # -----------------------
-# 4) Tabela recente
+# 4) Recorte por UF
+# -----------------------
+st.header("Por UF")
+
+if not data_access.exists(REGIONAL) or not data_access.has_uf(REGIONAL):
+    st.info("Gere os dados regionais no pipeline (build regional-trimestral) para habilitar esta visualização.")
+else:
+    u1, u2 = st.columns([1, 2])
+    with u1:
+        ufs = sorted(UF_SIGLAS.values())
+        uf_sel = st.selectbox("UF", ufs, index=ufs.index("SP"), key="socio_uf")
+    reg = data_access.load_regional(REGIONAL, uf_sel)
+
+    uf_cols = [c for c in cols_available if c in reg.columns]
+    with u2:
+        uf_label = st.selectbox("Indicador", [name_map[c] for c in uf_cols], key="socio_uf_var")
+    uf_col = inv_map[uf_label]
+
+    # UF, sua região (quando o IBGE publica) e Brasil
+    regiao = reg.loc[reg["uf"] == uf_sel, "regiao"].dropna()
+    regiao = str(regiao.iloc[0]) if not regiao.empty else None
+    keep = (reg["uf"] == uf_sel) | (reg["nivel"] == "Brasil") | ((reg["nivel"] == "Região") & (reg["regiao"] == regiao))
+    uf_df = reg.loc[keep, ["date", "nome", uf_col]].dropna().rename(columns={uf_col: "value"})
+    uf_df["nome"] = uf_df["nome"].astype(str)
+
+    fig_uf = px.line(uf_df.sort_values("date"), x="date", y="value", color="nome", title=f"{uf_label} — {uf_sel}")
+    fig_uf.update_layout(xaxis_title="Trimestre", yaxis_title="Valor", legend_title_text="")
+    st.plotly_chart(fig_uf, width="stretch")
+
+
+st.divider()
+
+# -----------------------
+# 5) Tabela recente
 # -----------------------
 st.header("Dados recentes")
 
@@ -237,6 +236,6 @@ view_labels = st.multiselect(
 )
 
 view_cols = ["date", "trimestre"] + [inv_map[l] for l in view_labels if l in inv_map]
-view = df[view_cols].dropna().sort_values("date").tail(16).copy()
+view = df[view_cols].dropna().sort_values("date").tail(16)
 
 st.dataframe(view, width="stretch")
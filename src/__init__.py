@@ -0,0 +1 @@
+"""Pipeline de dados do Painel de Conjuntura (coleta, tratamento e gravação em data/processed)."""
@@ -0,0 +1,3 @@
+from .makedataset import main
+
+main()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from . import endpoints
+
+# -----------------------
+# Cache em disco das respostas do SIDRA / SGS
+# -----------------------
+# Cada resposta bruta é gravada em data/cache/<origem>/<hash>.parquet, onde o hash
+# é calculado sobre todos os parâmetros da requisição (tabela, variável,
+# classificações, período, códigos, datas...) e sobre o cliente que a executou
+# (endpoints.BACKEND: os dataframes do backend arrow têm outros tipos). Entradas expiram por TTL de cada
+# origem e, quando o cache passa de MAX_BYTES, as menos usadas são removidas (LRU,
+# pelo atime que é atualizado a cada acerto).
+
+BASE_DIR = Path(__file__).resolve().parents[1]  # raiz do projeto
+CACHE_DIR = Path(os.environ.get("CONJUNTURA_CACHE_DIR", Path(os.environ.get("CONJUNTURA_DATA_DIR", BASE_DIR / "data")) / "cache"))
+
+# validade das respostas por origem (segundos)
+TTL = {
+    "sidra": 12 * 3600,
+    "sgs": 6 * 3600,
+    "sidra_meta": 24 * 3600,
+}
+
+MAX_BYTES = 512 * 1024 ** 2
+
+# CONJUNTURA_CACHE=0 desliga o cache; CONJUNTURA_CACHE_ONLY=1 não acessa a rede
+# (usa o que houver em disco, mesmo expirado, e falha se não houver).
+ENABLED = os.environ.get("CONJUNTURA_CACHE", "1") != "0"
+CACHE_ONLY = os.environ.get("CONJUNTURA_CACHE_ONLY", "0") == "1"
+
+_lock = threading.Lock()
+
+
+class CacheMissError(LookupError):
+    """Requisição sem resposta em cache no modo somente-cache."""
+
+
+def configure(enabled: bool | None = None, cache_only: bool | None = None) -> None:
+    global ENABLED, CACHE_ONLY
+    if enabled is not None:
+        ENABLED = enabled
+    if cache_only is not None:
+        CACHE_ONLY = cache_only
+
+
+def _normalize(value):
+    # 5932 e "5932" são a mesma requisição
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return None if value is None else str(value)
+
+
+def request_key(source: str, params: dict) -> str:
+    payload = json.dumps(
+        {"source": source, "backend": endpoints.BACKEND, "params": _normalize(params)}, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _path(source: str, key: str) -> Path:
+    return CACHE_DIR / source / f"{key}.parquet"
+
+
+def get(source: str, params: dict) -> pd.DataFrame | None:
+    """Resposta em cache ou None (ausente/expirada). No modo somente-cache ignora o TTL."""
+    if not ENABLED and not CACHE_ONLY:
+        return None
+
+    path = _path(source, request_key(source, params))
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        if CACHE_ONLY:
+            raise CacheMissError(f"Sem resposta em cache para {source} {params}")
+        return None
+
+    now = time.time()
+    if not CACHE_ONLY and now - st.st_mtime > TTL.get(source, 0):
+        return None
+
+    df = pd.read_parquet(path)
+    # marca o acesso para o LRU (mtime continua sendo a data de gravação)
+    os.utime(path, (now, st.st_mtime))
+    return df
+
+
+def put(source: str, params: dict, df: pd.DataFrame) -> None:
+    if not ENABLED:
+        return
+
+    path = _path(source, request_key(source, params))
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+    df.to_parquet(tmp)
+    os.replace(tmp, path)
+
+    evict()
+
+
+def evict(max_bytes: int = MAX_BYTES) -> None:
+    """Remove as entradas menos usadas até o cache caber em max_bytes."""
+    with _lock:
+        entries = []
+        for p in CACHE_DIR.glob("*/*.parquet"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_atime, st.st_size, p))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries):
+            if total <= max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+
+
+def clear() -> None:
+    with _lock:
+        for p in CACHE_DIR.glob("*/*.parquet"):
+            p.unlink(missing_ok=True)
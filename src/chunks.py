@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import re
+
+import pandas as pd
+
+# -----------------------
+# Divisão de requisições SIDRA por faixas de período
+# -----------------------
+# O SIDRA recusa respostas acima de um número máximo de valores por requisição
+# e o sidrapy monta a resposta inteira em memória. Uma requisição de histórico
+# completo é então dividida em faixas contíguas de períodos, cada uma abaixo do
+# limite: valores por período = variáveis x categorias x territórios, e cada
+# faixa leva até SIDRA_VALUE_LIMIT // valores_por_período períodos.
+# A lista de períodos vem dos metadados da tabela (API de agregados do IBGE).
+
+SIDRA_VALUE_LIMIT = 50_000
+
+# número de unidades territoriais quando o código é "all"
+TERRITORY_COUNT = {
+    "1": 1,      # Brasil
+    "2": 5,      # grandes regiões
+    "3": 27,     # UFs
+    "6": 5570,   # municípios
+}
+
+
+def resolve_periods(spec: str, available: list[str]) -> list[str]:
+    """
+    Períodos de `available` (ordenados) selecionados pelo parâmetro period do
+    SIDRA: "all", "last N", "first N", "AAAAMM", "A-B" e listas "A,B,C".
+    """
+    spec = str(spec).strip()
+    if spec == "all":
+        return list(available)
+
+    m = re.fullmatch(r"(last|first)\s+(\d+)", spec)
+    if m:
+        n = int(m.group(2))
+        return available[-n:] if m.group(1) == "last" else available[:n]
+
+    out: list[str] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if "-" in part:
+            lo, hi = (p.strip() for p in part.split("-", 1))
+            out.extend(p for p in available if int(lo) <= int(p) <= int(hi))
+        elif part in available:
+            out.append(part)
+    return sorted(set(out), key=int)
+
+
+def _count(value, total: int | None) -> int | None:
+    value = str(value).strip()
+    if value in ("all", "allxp"):
+        return total
+    if value == "allxt":
+        return None if total is None else total - 1
+    return len([v for v in value.split(",") if v.strip()])
+
+
+def values_per_period(params: dict, dims: dict[str, int]) -> int | None:
+    """
+    Número de valores que um período da requisição devolve.
+    dims: {"variavel": n, "<id da classificação>": n categorias} (metadados da tabela).
+    None quando a estimativa não é possível (ex.: dimensão ausente nos metadados).
+    """
+    n = _count(params.get("variable", "all"), dims.get("variavel"))
+
+    classifications = params.get("classifications") or {}
+    if isinstance(classifications, dict):
+        for cid, cats in classifications.items():
+            k = _count(cats, dims.get(str(cid)))
+            n = None if n is None or k is None else n * k
+
+    code = str(params.get("ibge_territorial_code", "all"))
+    level = str(params.get("territorial_level", "1"))
+    territories = TERRITORY_COUNT.get(level, TERRITORY_COUNT["6"]) if code == "all" else _count(code, None)
+
+    return None if n is None else n * territories
+
+
+def period_chunks(periods: list[str], per_chunk: int) -> list[str]:
+    """Faixas contíguas "A-B" com até per_chunk períodos cada."""
+    per_chunk = max(1, per_chunk)
+    chunks = []
+    for i in range(0, len(periods), per_chunk):
+        part = periods[i:i + per_chunk]
+        chunks.append(part[0] if len(part) == 1 else f"{part[0]}-{part[-1]}")
+    return chunks
+
+
+def split_params(params: dict, available: list[str], dims: dict[str, int], limit: int = SIDRA_VALUE_LIMIT) -> list[dict]:
+    """
+    Parâmetros de sidra.get_table divididos em faixas de período abaixo de `limit`.
+    Devolve [params] quando uma única requisição basta (ou não há como estimar).
+    """
+    cells = values_per_period(params, dims)
+    periods = resolve_periods(params.get("period", "all"), available)
+    if not cells or not periods or cells * len(periods) <= limit:
+        return [params]
+    return [{**params, "period": p} for p in period_chunks(periods, limit // cells)]
+
+
+# -----------------------
+# Divisão de requisições SGS (séries diárias) em janelas de datas
+# -----------------------
+# A API do SGS (BCB) só devolve séries diárias em janelas de até 10 anos por
+# consulta. Um histórico longo é pedido em janelas consecutivas, sem
+# sobreposição, que são buscadas em paralelo e depois reunidas. Quais séries
+# são diárias vem da requisição (sgs_request(..., freq="daily"), fetch.py).
+
+SGS_MAX_YEARS = 10
+
+
+def date_windows(start, end, years: int = SGS_MAX_YEARS) -> list[tuple[str, str]]:
+    """Janelas [início, fim] (AAAA-MM-DD) consecutivas de no máximo `years` anos cobrindo start..end."""
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    out: list[tuple[str, str]] = []
+    while start <= end:
+        stop = min(start + pd.DateOffset(years=years) - pd.Timedelta(days=1), end)
+        out.append((start.strftime("%Y-%m-%d"), stop.strftime("%Y-%m-%d")))
+        start = stop + pd.Timedelta(days=1)
+    return out
+
+
+def split_sgs_params(params: dict, today=None, years: int = SGS_MAX_YEARS) -> list[dict]:
+    """Parâmetros de sgs.get (série diária), um por janela; a requisição fica inteira se já cabe numa janela."""
+    if not params.get("start"):
+        return [params]
+    end = params.get("end") or today or pd.Timestamp.today()
+    windows = date_windows(params["start"], end, years)
+    if len(windows) <= 1:
+        return [params]
+    return [{**params, "start": a, "end": b} for a, b in windows]
@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Hashable
+
+import pandas as pd
+import streamlit as st
+
+from . import store
+from .encoding import read_parquet
+from .ipca import children, contributions, hierarchy, matrix, to_long, with_codes
+from .makedataset import DATASETS, OUT_DIR
+from .manifest import MANIFEST_NAME, read_manifest
+
+# -----------------------
+# Acesso aos dados publicados (páginas do painel)
+# -----------------------
+# Um carregador por dataset, o mesmo para todas as páginas:
+#   load("sgs")                          -> sgs_dados.parquet inteiro
+#   load("sgs", columns=["ipca"])        -> date + ipca
+#   load_regional("regional-mensal", uf) -> Brasil/regiões + a UF (partição do store)
+#   load_quarterly("pib")                -> + coluna trimestre ("2025Q3")
+#   load_recent("sgs", 180)              -> só os últimos 180 meses
+#   ipca_contribuicoes() / ipca_composicao(pai) -> matrizes e contribuições do IPCA
+# Os nomes são os do pipeline (makedataset.DATASETS). Cada parquet é lido uma
+# vez por processo do servidor (o cache é compartilhado entre sessões e
+# páginas) e sai sempre no mesmo formato:
+#   - date como datetime64, sem datas inválidas
+#   - datasets long (coluna value): sem linhas com value nulo
+#   - linhas na ordem das chaves do dataset (Dataset.keys; wide = por date)
+# A projeção de colunas é feita sobre o dataframe já em cache: pedir colunas
+# diferentes em páginas diferentes não gera novas leituras.
+#
+# Os dataframes ficam em st.cache_resource: uma única instância por processo,
+# sem a cópia (pickle) que o st.cache_data faz a cada acesso. Este módulo liga o
+# copy-on-write do pandas ao ser importado (uma vez por processo), então vale
+# para qualquer página, inclusive aberta direto pela URL, sem passar pela
+# home.py. Cada chamada recebe um dataframe novo que compartilha a memória da instância em cache (cópia rasa): alterar esse
+# dataframe (nova coluna, .loc[...] = ...) copia só o que foi alterado e nunca
+# escreve na instância compartilhada; os arrays de .to_numpy() saem somente
+# leitura. A memória por sessão não cresce com o número de acessos. Se alguém
+# desligar o copy-on-write depois (pd.option_context), cada chamada volta a
+# receber uma cópia.
+#
+# O cache é chaveado pela impressão digital do arquivo (fingerprint): o sha256
+# do manifesto quando ele descreve o arquivo atual, senão tamanho + mtime.
+# Quando o pipeline republica um parquet, a próxima leitura vê outra impressão
+# digital, relê só esse dataset e descarta a entrada anterior; os demais
+# continuam em cache, sem reiniciar o servidor.
+#
+# Recortes de datas (load_recent, ipca_composicao com start/end): quando o
+# pipeline gravou o layout particionado (--partitioned, src/store.py), só o
+# trecho pedido sai do disco (pushdown de datas e filtros no store.read); sem
+# ele, o recorte é feito sobre o dataset inteiro em cache. Cada recorte fica
+# em cache (até WINDOW_ENTRIES por função) até a próxima versão dos dados.
+#
+# Carga única (single flight): pedidos simultâneos da mesma chave (dataset +
+# impressão digital) são agrupados; o primeiro lê e trata o arquivo, os demais
+# esperam e recebem o mesmo resultado. Depois de subir o servidor ou de uma
+# atualização dos dados, uma rajada de visitantes custa uma leitura por
+# dataset, não uma por sessão.
+
+_lock = threading.Lock()
+_loaded: dict[tuple, str] = {}                     # ("load", name) | ("load_regional", name, uf) | ... -> fingerprint em cache
+_manifest: tuple[tuple[int, int], dict] | None = None
+_flights: dict[Hashable, Future] = {}             # chave -> resultado em cálculo
+
+WINDOW_ENTRIES = 32  # recortes de datas em cache por função
+
+
+def _enable_copy_on_write() -> None:
+    """Liga o copy-on-write do pandas no processo, só se ainda não estiver ligado."""
+    if pd.get_option("mode.copy_on_write") is not True:
+        pd.set_option("mode.copy_on_write", True)
+
+
+_enable_copy_on_write()
+
+
+def single_flight(key: Hashable, func: Callable[[], Any]) -> Any:
+    """
+    func() uma vez por chave entre as threads concorrentes: quem chega com a
+    chave já em cálculo espera e recebe o mesmo resultado (ou a mesma exceção).
+    """
+    with _lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = Future()
+    if not leader:
+        return flight.result()
+    try:
+        flight.set_result(func())
+    except BaseException as exc:
+        flight.set_exception(exc)
+    finally:
+        with _lock:
+            del _flights[key]
+    return flight.result()
+
+
+def path(name: str) -> Path:
+    return OUT_DIR / DATASETS[name].filename
+
+
+def exists(name: str) -> bool:
+    return path(name).exists()
+
+
+def uf_name(name: str) -> str:
+    """Dataset do store com as UFs de um dataset regional (by_uf)."""
+    return f"{path(name).stem}_uf"
+
+
+def has_uf(name: str) -> bool:
+    return DATASETS[name].by_uf and store.exists(uf_name(name))
+
+
+def _stat_id(p: Path) -> tuple[int, int]:
+    s = p.stat()
+    return s.st_size, s.st_mtime_ns
+
+
+def _read_manifest_cached() -> dict:
+    """manifest.json, relido só quando o arquivo muda."""
+    global _manifest
+    p = OUT_DIR / MANIFEST_NAME
+    if not p.exists():
+        return {}
+    sid = _stat_id(p)
+    cached = _manifest
+    if cached is None or cached[0] != sid:
+        cached = (sid, read_manifest(OUT_DIR))
+        _manifest = cached
+    return cached[1]
+
+
+def fingerprint(name: str) -> str:
+    """Impressão digital do parquet publicado de `name` (muda quando o arquivo muda)."""
+    p = path(name)
+    size, mtime = _stat_id(p)
+    entry = _read_manifest_cached().get(p.stem) or {}
+    # o manifesto é gravado logo depois do parquet: só vale se descreve este arquivo
+    if entry.get("sha256") and entry.get("bytes") == size:
+        return entry["sha256"]
+    return f"{size}-{mtime}"
+
+
+def store_fingerprint(stem: str) -> str:
+    """Impressão digital de um dataset do store (regravado por troca de diretório: novo inode)."""
+    s = store.dataset_path(stem).stat()
+    return f"{s.st_ino}-{s.st_mtime_ns}"
+
+
+def uf_fingerprint(name: str) -> str:
+    """Impressão digital do store das UFs."""
+    return store_fingerprint(uf_name(name))
+
+
+def _swap(key: tuple, fp: str, clear: Callable[[str], None]) -> None:
+    """Registra fp como a versão em cache de key e descarta a versão anterior (clear(fp_antigo))."""
+    with _lock:
+        old = _loaded.get(key)
+        _loaded[key] = fp
+    if old is not None and old != fp:
+        clear(old)
+
+
+def _shared(key: tuple, fp: str, cached, *args) -> Any:
+    """cached(*args, fp) com carga única por (key, fp) e descarte da versão superada."""
+    def compute() -> Any:
+        # clear com argumentos descarta só aquela entrada (streamlit >= 1.34)
+        _swap(key, fp, lambda old: cached.clear(*args, old))
+        return cached(*args, fp)
+
+    return single_flight(key + (fp,), compute)
+
+
+def _windowed(key: tuple, fp: str, cached, *args) -> Any:
+    """Como _shared, para recortes (uma entrada por recorte): a nova versão descarta todos os recortes anteriores."""
+    def compute() -> Any:
+        _swap(key, fp, lambda old: cached.clear())
+        return cached(*args, fp)
+
+    return single_flight(key + args + (fp,), compute)
+
+
+def _between(df: pd.DataFrame, start=None, end=None) -> pd.DataFrame:
+    if start is not None:
+        df = df[df["date"] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df["date"] <= pd.Timestamp(end)]
+    return df
+
+
+def normalize(df: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """Formato comum dos datasets nas páginas (ver acima)."""
+    # encoding.read_parquet e store.read já devolvem date como datetime64
+    if not pd.api.types.is_datetime64_dtype(df["date"]):
+        df = df.assign(date=pd.to_datetime(df["date"], errors="coerce"))
+    drop = ["date"] + (["value"] if "value" in df.columns else [])
+    df = df.dropna(subset=drop)
+    keys = [k for k in keys if k in df.columns]
+    return df.sort_values(keys, kind="stable").reset_index(drop=True)
+
+
+@st.cache_resource(show_spinner=False)
+def _read(name: str, fp: str) -> pd.DataFrame:
+    return normalize(read_parquet(path(name)), DATASETS[name].keys)
+
+
+def _view(df: pd.DataFrame) -> pd.DataFrame:
+    """Dataframe da página: cópia rasa com copy-on-write ligado (o padrão deste módulo), senão uma cópia."""
+    return df.copy(deep=pd.get_option("mode.copy_on_write") is not True)
+
+
+def _project(df: pd.DataFrame, columns: list[str] | None) -> pd.DataFrame:
+    if columns is None:
+        return _view(df)
+    # seleção de colunas já é um dataframe novo (sem copy-on-write, uma cópia)
+    return df[["date"] + [c for c in columns if c != "date" and c in df.columns]]
+
+
+def load(name: str, columns: list[str] | None = None) -> pd.DataFrame:
+    """Dataset publicado `name`; columns -> só essas colunas (date sempre incluída)."""
+    return _project(_shared(("load", name), fingerprint(name), _read, name), columns)
+
+
+@st.cache_resource(show_spinner=False)
+def _read_regional(name: str, uf: str, fp: str) -> pd.DataFrame:
+    df_uf = store.read(uf_name(name), where={"uf": [uf]})
+    return pd.concat([load(name), normalize(df_uf, DATASETS[name].keys)], ignore_index=True)
+
+
+def load_regional(name: str, uf: str, columns: list[str] | None = None) -> pd.DataFrame:
+    """Agregados (Brasil e regiões) + a UF escolhida (só a partição da UF é lida)."""
+    fp = f"{fingerprint(name)}/{uf_fingerprint(name)}"
+    return _project(_shared(("load_regional", name, uf), fp, _read_regional, name, uf), columns)
+
+
+@st.cache_resource(show_spinner=False)
+def _read_quarterly(name: str, fp: str) -> pd.DataFrame:
+    df = load(name)
+    return df.assign(trimestre=df["date"].dt.to_period("Q").astype(str))
+
+
+def load_quarterly(name: str, columns: list[str] | None = None) -> pd.DataFrame:
+    """Dataset trimestral com o rótulo do trimestre (trimestre = "2025Q3")."""
+    cols = None if columns is None else ["trimestre", *columns]
+    return _project(_shared(("load_quarterly", name), fingerprint(name), _read_quarterly, name), cols)
+
+
+def has_store(name: str) -> bool:
+    """O pipeline gravou o layout particionado de `name` (--partitioned)?"""
+    return store.exists(path(name).stem)
+
+
+@st.cache_resource(show_spinner=False, max_entries=WINDOW_ENTRIES)
+def _read_recent(name: str, months: int, columns: tuple[str, ...] | None, fp: str) -> pd.DataFrame:
+    stem = path(name).stem
+    last = store.last_date(stem)
+    start = None if last is None else last - pd.DateOffset(months=months)
+    df = store.read(stem, columns=None if columns is None else list(columns), start=start)
+    return normalize(df, DATASETS[name].keys)
+
+
+def load_recent(name: str, months: int, columns: list[str] | None = None) -> pd.DataFrame:
+    """Últimos `months` meses, contados da data mais recente do dataset (date >= última - months)."""
+    if not has_store(name):
+        df = load(name, columns)
+        return df if df.empty else _between(df, df["date"].max() - pd.DateOffset(months=months))
+    cols = None if columns is None else tuple(columns)
+    fp = f"{fingerprint(name)}/{store_fingerprint(path(name).stem)}"
+    return _project(_windowed(("load_recent", name), fp, _read_recent, name, months, cols), None)
+
+
+# -----------------------
+# IPCA: hierarquia e contribuições (páginas de preços)
+# -----------------------
+IPCA_GRUPOS = "ipca-grupos"
+
+
+@st.cache_resource(show_spinner=False)
+def _ipca_contribuicoes(fp: str) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    # parquet no formato antigo (só grupos): hierarquia de dois níveis
+    df = with_codes(load(IPCA_GRUPOS))
+    peso = matrix(df, "peso_mensal")
+    contrib = contributions(matrix(df, "variacao_mensal"), peso)
+    return hierarchy(df), peso, contrib
+
+
+def ipca_contribuicoes() -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Hierarquia e matrizes data x código do IPCA:
+      hier    -> codigo, grupo (nome), nivel, pai
+      peso    -> peso mensal (%)
+      contrib -> contribuição para o índice geral (p.p.) = variação x peso / 100
+    """
+    shared = _shared(("ipca_contribuicoes",), fingerprint(IPCA_GRUPOS), _ipca_contribuicoes)
+    return tuple(_view(df) for df in shared)
+
+
+def _compose(hier: pd.DataFrame, peso: pd.DataFrame, contrib: pd.DataFrame, pai: str) -> pd.DataFrame:
+    filhos = children(hier, pai)["codigo"].tolist()
+    out = to_long(contrib, filhos, "contrib_pp")
+    out = out.merge(to_long(peso, filhos, "peso_mensal"), on=["date", "codigo"], how="left")
+    out["grupo"] = out["codigo"].map(hier.set_index("codigo")["grupo"])
+    out["ref"] = out["date"].dt.to_period("M").astype(str)
+    return out
+
+
+@st.cache_resource(show_spinner=False)
+def _ipca_composicao(pai: str, fp: str) -> pd.DataFrame:
+    hier, peso, contrib = ipca_contribuicoes()
+    return _compose(hier, peso, contrib, pai)
+
+
+@st.cache_resource(show_spinner=False, max_entries=WINDOW_ENTRIES)
+def _ipca_composicao_recorte(pai: str, start, end, fp: str) -> pd.DataFrame:
+    # só as linhas dos filhos de `pai` no período saem do disco
+    df = store.read(path(IPCA_GRUPOS).stem, start=start, end=end, where={"pai": [pai]})
+    df = normalize(df, DATASETS[IPCA_GRUPOS].keys)
+    peso = matrix(df, "peso_mensal")
+    hier = ipca_contribuicoes()[0]
+    return _compose(hier, peso, contributions(matrix(df, "variacao_mensal"), peso), pai)
+
+
+def ipca_composicao(pai: str, start=None, end=None) -> pd.DataFrame:
+    """
+    Contribuições dos filhos de `pai`: date, codigo, contrib_pp, peso_mensal, grupo, ref.
+    start / end -> só o período pedido (sem eles, o período inteiro).
+    """
+    fp = fingerprint(IPCA_GRUPOS)
+    stem = path(IPCA_GRUPOS).stem
+    # store no formato antigo (só grupos) não tem a coluna pai: recorte em memória
+    if (start is None and end is None) or not has_store(IPCA_GRUPOS) or "pai" not in store.columns(stem):
+        out = _shared(("ipca_composicao", pai), fp, _ipca_composicao, pai)
+        return _project(_between(out, start, end), None)
+    fp = f"{fp}/{store_fingerprint(stem)}"
+    return _project(_windowed(("ipca_composicao_recorte",), fp, _ipca_composicao_recorte, pai, start, end), None)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# -----------------------
+# Tipos compactos e codificação dos parquets processados
+# -----------------------
+# Antes de gravar, cada dataset é convertido para tipos enxutos:
+#   - rótulos repetidos (setor, grupo, indicador...) -> dictionary/categorical
+#   - date -> date32 (dia, sem hora)
+#   - float64 -> float32 quando não há perda na precisão publicada
+# e gravado com zstd e row groups de tamanho fixo. O schema leva metadados
+# (chave "conjuntura") que dizem aos loaders que os tipos já estão corretos:
+# read_parquet() devolve date como datetime64[ns] direto do date32, sem
+# pd.to_datetime; só arquivos sem os metadados (gravados antes) são convertidos.
+
+COMPRESSION = "zstd"
+COMPRESSION_LEVEL = 6
+ROW_GROUP_SIZE = 100_000
+
+# maior erro absoluto aceito ao converter float64 -> float32 (dados publicados
+# com até 4 casas decimais)
+FLOAT32_TOL = 5e-5
+# coluna de texto vira categórica se tiver no máximo esta fração de valores distintos
+CATEGORY_MAX_RATIO = 0.5
+
+METADATA_KEY = b"conjuntura"
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Converte colunas para os tipos mais compactos sem perda."""
+    out = df.copy()
+    for c in out.columns:
+        s = out[c]
+        if c == "date":
+            out[c] = pd.to_datetime(s, errors="coerce")
+        elif s.dtype == object or pd.api.types.is_string_dtype(s.dtype):
+            if len(s) and s.nunique(dropna=True) <= CATEGORY_MAX_RATIO * len(s):
+                out[c] = s.astype("category")
+        elif s.dtype == np.float64:
+            f32 = s.to_numpy(dtype=np.float32)
+            err = np.abs(f32.astype(np.float64) - s.to_numpy())
+            if not np.any(err[np.isfinite(err)] > FLOAT32_TOL):
+                out[c] = f32
+    return out
+
+
+def to_arrow(df: pd.DataFrame) -> pa.Table:
+    """Tabela Arrow compacta (date32, dictionary, float32) com os metadados de tipos."""
+    compact = compact_frame(df)
+    table = pa.Table.from_pandas(compact, preserve_index=False)
+
+    if "date" in table.column_names:
+        i = table.column_names.index("date")
+        table = table.set_column(i, "date", table.column("date").cast(pa.date32()))
+
+    info = {
+        "version": 1,
+        "coerced": True,
+        "date": "date32" if "date" in table.column_names else None,
+        "categorical": [f.name for f in table.schema if pa.types.is_dictionary(f.type)],
+        "float32": [f.name for f in table.schema if pa.types.is_float32(f.type)],
+    }
+    meta = dict(table.schema.metadata or {})
+    meta[METADATA_KEY] = json.dumps(info).encode("utf-8")
+    return table.replace_schema_metadata(meta)
+
+
+def write_parquet(df: pd.DataFrame, path: Path) -> pa.Table:
+    table = to_arrow(df)
+    pq.write_table(
+        table,
+        path,
+        compression=COMPRESSION,
+        compression_level=COMPRESSION_LEVEL,
+        row_group_size=ROW_GROUP_SIZE,
+        use_dictionary=True,
+    )
+    return table
+
+
+def schema_info(path: Path) -> dict | None:
+    """Metadados de tipos gravados por write_parquet (None se o arquivo não os tem)."""
+    meta = pq.read_schema(path).metadata or {}
+    raw = meta.get(METADATA_KEY)
+    return json.loads(raw) if raw else None
+
+
+def read_parquet(path: Path, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Lê um parquet processado. date volta como datetime64[ns] (no disco, date32):
+    com os metadados de write_parquet os tipos já estão corretos e a coluna só
+    muda de unidade; sem eles (arquivo antigo), date passa por pd.to_datetime.
+    """
+    table = pq.read_table(path, columns=columns)
+    df = table.to_pandas(date_as_object=False)
+    if "date" not in df.columns:
+        return df
+    raw = (table.schema.metadata or {}).get(METADATA_KEY)
+    if raw and json.loads(raw).get("coerced"):
+        df["date"] = df["date"].astype("datetime64[ns]")
+    else:
+        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    return df
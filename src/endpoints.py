@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote, urlencode
+
+import pandas as pd
+
+from . import instrument
+
+# -----------------------
+# Acesso HTTP direto às APIs do SIDRA, do SGS e de metadados do IBGE
+# -----------------------
+# Por padrão as chamadas ao SIDRA e ao SGS passam pelos clientes sidrapy e
+# python-bcb. Com CONJUNTURA_BACKEND=http o fetch monta a URL aqui e interpreta o
+# JSON devolvido, no mesmo formato de dataframe dos clientes; com
+# CONJUNTURA_BACKEND=arrow o JSON é decodificado direto em colunas tipadas
+# (native.py). Nos dois casos também vale:
+#   - CONJUNTURA_API_URL: apontar as três APIs para outro servidor (o substituto
+#     local de standin.py, que responde com respostas gravadas)
+#   - CONJUNTURA_RECORD_DIR: gravar cada resposta recebida como fixture, para
+#     reproduzi-la depois (python -m src.standin record)
+
+SIDRA_URL = "https://apisidra.ibge.gov.br"
+SGS_URL = "https://api.bcb.gov.br"
+IBGE_URL = "https://servicodados.ibge.gov.br"
+
+TIMEOUT = 60  # segundos
+
+# "lib" (sidrapy / python-bcb) | "http" (mesmos dataframes, via esta camada) | "arrow" (native.py)
+BACKEND = os.environ.get("CONJUNTURA_BACKEND", "lib")
+API_URL = os.environ.get("CONJUNTURA_API_URL") or None
+RECORD_DIR = Path(os.environ["CONJUNTURA_RECORD_DIR"]) if os.environ.get("CONJUNTURA_RECORD_DIR") else None
+
+
+def configure(backend: str | None = None, api_url: str | None = None, record_dir: Path | None = None) -> None:
+    global BACKEND, API_URL, RECORD_DIR
+    if backend is not None:
+        BACKEND = backend
+    if api_url is not None:
+        API_URL = api_url or None
+    if record_dir is not None:
+        RECORD_DIR = record_dir
+
+
+def _base(default: str) -> str:
+    return (API_URL or default).rstrip("/")
+
+
+# -----------------------
+# URLs
+# -----------------------
+
+def _segment(value) -> str:
+    return quote(str(value), safe=",-")
+
+
+def sidra_path(params: dict) -> str:
+    """Caminho da API de valores do SIDRA para os parâmetros de sidra.get_table."""
+    parts = [
+        "values",
+        "t", _segment(params["table_code"]),
+        f"n{params['territorial_level']}", _segment(params["ibge_territorial_code"]),
+    ]
+    if params.get("variable") is not None:
+        parts += ["v", _segment(params["variable"])]
+    if params.get("period") is not None:
+        parts += ["p", _segment(params["period"])]
+    for cls, cats in (params.get("classifications") or {}).items():
+        parts += [f"c{cls}", _segment(cats)]
+    parts += ["h", _segment(params.get("header", "y"))]
+    return "/" + "/".join(parts)
+
+
+def _br_date(value) -> str:
+    return pd.Timestamp(value).strftime("%d/%m/%Y")
+
+
+def sgs_path(code, start=None, end=None) -> str:
+    query = {"formato": "json"}
+    if start:
+        query["dataInicial"] = _br_date(start)
+    if end:
+        query["dataFinal"] = _br_date(end)
+    return f"/dados/serie/bcdata.sgs.{code}/dados?{urlencode(query, safe='/')}"
+
+
+def meta_path(table_code, kind: str) -> str:
+    return f"/api/v3/agregados/{table_code}/{kind}"
+
+
+# -----------------------
+# Requisições e fixtures
+# -----------------------
+
+def fixture_name(path: str) -> str:
+    """Arquivo da fixture de uma URL (caminho + query, sem o host)."""
+    return hashlib.sha256(path.encode("utf-8")).hexdigest()[:24] + ".json"
+
+
+def _record(path: str, body: bytes) -> None:
+    RECORD_DIR.mkdir(parents=True, exist_ok=True)
+    target = RECORD_DIR / fixture_name(path)
+    tmp = target.with_suffix(".tmp")
+    payload = {"url": path, "recorded": datetime.now().isoformat(timespec="seconds"), "body": body.decode("utf-8")}
+    tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(target)
+
+
+def get_bytes(base: str, path: str) -> bytes:
+    with urllib.request.urlopen(_base(base) + path, timeout=TIMEOUT) as resp:
+        body = resp.read()
+    instrument.add_bytes(len(body))
+    if RECORD_DIR is not None:
+        _record(path, body)
+    return body
+
+
+def get_json(base: str, path: str):
+    return json.loads(get_bytes(base, path))
+
+
+# -----------------------
+# JSON -> dataframe (mesmo formato dos clientes)
+# -----------------------
+
+def sidra_frame(data: list[dict]) -> pd.DataFrame:
+    """Como sidrapy.get_table: uma linha por registro, colunas de texto (com header="y", a 1ª linha traz os rótulos)."""
+    return pd.DataFrame(data)
+
+
+def sgs_frame(data: list[dict], name: str) -> pd.DataFrame:
+    """Como bcb.sgs.get: índice Date e uma coluna float com o nome da série."""
+    df = pd.DataFrame(data, columns=["data", "valor"])
+    return pd.DataFrame(
+        {name: pd.to_numeric(df["valor"], errors="coerce").to_numpy()},
+        index=pd.DatetimeIndex(pd.to_datetime(df["data"], format="%d/%m/%Y"), name="Date"),
+    )
+
+
+def get_sidra(**params) -> pd.DataFrame:
+    return sidra_frame(get_json(SIDRA_URL, sidra_path(params)))
+
+
+def get_sgs(codes: dict[str, str], start=None, end=None, **_) -> pd.DataFrame:
+    frames = [sgs_frame(get_json(SGS_URL, sgs_path(code, start, end)), name) for name, code in codes.items()]
+    return frames[0] if len(frames) == 1 else pd.concat(frames, axis=1, join="outer").sort_index()
+
+
+def get_meta(table_code, kind: str):
+    return get_json(IBGE_URL, meta_path(table_code, kind))
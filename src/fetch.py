@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import contextvars
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+import pandas as pd
+import pyarrow as pa
+
+from . import cache, endpoints
+from .chunks import split_params, split_sgs_params
+
+# -----------------------
+# Camada de coleta (SIDRA / SGS)
+# -----------------------
+# Cada requisição é descrita por um FetchRequest (origem + parâmetros da chamada).
+# fetch_all executa todas em um pool de threads limitado, respeitando um
+# número máximo de conexões simultâneas por host e repetindo falhas com backoff.
+# Requisições SIDRA grandes são divididas em faixas de período, e séries diárias
+# do SGS em janelas de até 10 anos (ver chunks.py); as partes são buscadas em
+# paralelo e, à medida que chegam, guardadas em Arrow (texto em buffers
+# contíguos) até a montagem do dataframe final.
+
+# limite de requisições simultâneas por origem (host)
+HOST_LIMITS = {
+    "sidra": 4,  # apisidra.ibge.gov.br
+    "sgs": 4,    # api.bcb.gov.br
+    "sidra_meta": 2,  # servicodados.ibge.gov.br (metadados das tabelas)
+}
+
+MAX_WORKERS = 8
+CHUNK_WORKERS = 4
+RETRIES = 3
+BACKOFF_BASE = 1.0  # segundos
+BACKOFF_MAX = 30.0
+
+_host_semaphores = {
+    host: threading.BoundedSemaphore(limit) for host, limit in HOST_LIMITS.items()
+}
+
+# metadados das tabelas SIDRA já consultados nesta execução (só consultas bem-sucedidas)
+_meta: dict[str, tuple[list[str], dict[str, int]]] = {}
+
+
+@dataclass(frozen=True)
+class FetchRequest:
+    """
+    Uma chamada a sidra.get_table (source="sidra") ou sgs.get (source="sgs").
+    params são repassados como keyword arguments para a função da origem;
+    freq é a periodicidade da série ("daily" -> janelas de datas no SGS).
+    """
+    source: str
+    params: dict = field(default_factory=dict)
+    freq: str | None = None
+
+
+def sidra_request(**params) -> FetchRequest:
+    params.setdefault("header", "n")
+    return FetchRequest("sidra", params)
+
+
+def sgs_request(codes: dict[str, str], start: str | None = None, freq: str | None = None, **params) -> FetchRequest:
+    return FetchRequest("sgs", {"codes": codes, "start": start, **params}, freq)
+
+
+def meta_request(table_code, kind: str) -> FetchRequest:
+    """Metadados de uma tabela SIDRA: kind="periodos" | "metadados"."""
+    return FetchRequest("sidra_meta", {"table_code": str(table_code), "kind": kind})
+
+
+def _sidra_meta(table_code: str, kind: str) -> pd.DataFrame:
+    data = endpoints.get_meta(table_code, kind)
+    if kind == "periodos":
+        return pd.DataFrame({"periodo": sorted((str(p["id"]) for p in data), key=int)})
+    if kind == "metadados":
+        # tamanho de cada dimensão: variáveis e categorias de cada classificação
+        dims = {"variavel": len(data.get("variaveis", []))}
+        for c in data.get("classificacoes", []):
+            dims[str(c["id"])] = len(c.get("categorias", []))
+        return pd.DataFrame({"dim": list(dims), "n": list(dims.values())})
+    raise ValueError(f"Metadado desconhecido: {kind}")
+
+
+def _call_source(req: FetchRequest) -> pd.DataFrame:
+    # clientes importados só quando há de fato uma chamada à rede
+    if req.source == "sidra_meta":
+        return _sidra_meta(**req.params)
+    if endpoints.BACKEND == "arrow":
+        # cliente nativo: JSON decodificado direto em colunas tipadas (native.py)
+        from . import native
+        if req.source == "sidra":
+            return native.get_sidra(**req.params)
+        if req.source == "sgs":
+            return native.get_sgs(**req.params)
+    if endpoints.BACKEND == "http":
+        # URL e JSON tratados aqui (endpoints.py): permite o servidor substituto e a gravação
+        if req.source == "sidra":
+            return endpoints.get_sidra(**req.params)
+        if req.source == "sgs":
+            return endpoints.get_sgs(**req.params)
+    if req.source == "sidra":
+        import sidrapy as sidra
+        return sidra.get_table(**req.params)
+    if req.source == "sgs":
+        from bcb import sgs
+        return sgs.get(**req.params)
+    raise ValueError(f"Origem desconhecida: {req.source}")
+
+
+def _fetch_single(req: FetchRequest, retries: int = RETRIES, backoff: float = BACKOFF_BASE) -> pd.DataFrame:
+    """
+    Executa uma requisição respeitando o limite do host e repetindo falhas
+    com backoff exponencial (com jitter). Respostas válidas ficam no cache em disco.
+    """
+    cached = cache.get(req.source, req.params)
+    if cached is not None:
+        return cached
+
+    sem = _host_semaphores[req.source]
+    for attempt in range(retries + 1):
+        try:
+            with sem:
+                df = _call_source(req)
+            break
+        except Exception:
+            if attempt == retries:
+                raise
+            # espera fora do semáforo para liberar a vaga do host
+            delay = min(BACKOFF_MAX, backoff * 2 ** attempt)
+            time.sleep(delay + random.uniform(0, delay / 2))
+
+    cache.put(req.source, req.params, df)
+    return df
+
+
+def _table_meta(table_code: str) -> tuple[list[str], dict[str, int]] | None:
+    """
+    Períodos e tamanho das dimensões da tabela (uma consulta por tabela e
+    execução). Uma falha devolve None e não fica guardada: a próxima
+    requisição da tabela consulta de novo.
+    """
+    meta = _meta.get(table_code)
+    if meta is not None:
+        return meta
+    try:
+        periods = _fetch_single(meta_request(table_code, "periodos"), retries=1)
+        dims = _fetch_single(meta_request(table_code, "metadados"), retries=1)
+    except Exception:
+        return None
+    meta = _meta[table_code] = (periods["periodo"].tolist(), dict(zip(dims["dim"], dims["n"].astype(int))))
+    return meta
+
+
+def split_sidra(req: FetchRequest) -> list[FetchRequest]:
+    """
+    Divide uma requisição SIDRA em faixas de período abaixo do limite de valores.
+    Sem metadados da tabela (rede/cache indisponível) a requisição segue inteira.
+    """
+    if req.source != "sidra" or req.params.get("header", "y") != "n":
+        return [req]
+    meta = _table_meta(str(req.params.get("table_code")))
+    if meta is None:
+        return [req]
+    parts = split_params(req.params, *meta)
+    if len(parts) == 1:
+        return [req]
+    return [FetchRequest(req.source, p, req.freq) for p in parts]
+
+
+def split_sgs(req: FetchRequest) -> list[FetchRequest]:
+    """Divide uma requisição SGS de série diária em janelas de datas aceitas pela API."""
+    if req.source != "sgs" or req.freq != "daily":
+        return [req]
+    parts = split_sgs_params(req.params)
+    if len(parts) == 1:
+        return [req]
+    return [FetchRequest(req.source, p, req.freq) for p in parts]
+
+
+def stitch_sgs(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Junta as janelas do SGS (indexadas por data): ordem cronológica, sem datas repetidas."""
+    out = pd.concat(frames)
+    out = out[~out.index.duplicated(keep="last")]
+    return out.sort_index()
+
+
+def fetch_chunks(parts: list[FetchRequest], max_workers: int = CHUNK_WORKERS) -> pd.DataFrame:
+    """
+    Busca as partes em paralelo e junta na ordem dos períodos. Cada parte é
+    uma requisição independente (com retry e cache próprios). Ao chegar, a
+    resposta é convertida para uma tabela Arrow e o dataframe é descartado:
+    ficam em memória no máximo max_workers respostas como dataframe, mais as
+    partes já convertidas (compactas). O dataframe final é montado uma vez,
+    no fim, com os textos repetidos compartilhados (um objeto por valor distinto).
+    """
+    sgs = parts[0].source == "sgs"
+    tables: list[pa.Table | None] = [None] * len(parts)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(parts))) as pool:
+        # cada parte roda no contexto do chamador (os bytes recebidos contam para a etapa dele)
+        futures = {
+            pool.submit(contextvars.copy_context().run, _fetch_single, part): i for i, part in enumerate(parts)
+        }
+        for fut in as_completed(futures):
+            # sai do dicionário: o future (e o dataframe da resposta) é liberado após a conversão
+            i = futures.pop(fut)
+            tables[i] = pa.Table.from_pandas(fut.result(), preserve_index=sgs)
+            del fut
+    df = pa.concat_tables(tables, promote_options="default").to_pandas()
+    del tables
+    if sgs:
+        return stitch_sgs([df])
+    # categorias (cliente nativo) em ordem alfabética, como em native.get_sidra
+    for c in df.columns:
+        if isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].cat.reorder_categories(sorted(df[c].cat.categories))
+    return df
+
+
+def fetch_one(req: FetchRequest) -> pd.DataFrame:
+    """
+    Executa uma requisição; requisições SIDRA grandes são buscadas em faixas de
+    período e séries diárias longas do SGS em janelas de datas.
+    """
+    parts = split_sidra(req) if req.source == "sidra" else split_sgs(req)
+    if len(parts) > 1:
+        return fetch_chunks(parts)
+    return _fetch_single(req)
+
+
+def fetch_all(requests: dict[str, FetchRequest], max_workers: int = MAX_WORKERS) -> dict[str, pd.DataFrame]:
+    """
+    Executa todas as requisições em paralelo e devolve {nome: dataframe bruto}.
+    O tempo total fica próximo ao da requisição mais lenta, não à soma delas.
+    """
+    if not requests:
+        return {}
+
+    results: dict[str, pd.DataFrame] = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(requests))) as pool:
+        futures = {pool.submit(fetch_one, req): name for name, req in requests.items()}
+        for fut in as_completed(futures):
+            results[futures[fut]] = fut.result()
+
+    # preserva a ordem de declaração
+    return {name: results[name] for name in requests}
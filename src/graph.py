@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+# -----------------------
+# Grafo de construção (DAG)
+# -----------------------
+# O pipeline é descrito como nós (fetch -> tidy/merge -> write) ligados por
+# dependências. Cada nó executado tem a saída resumida por um hash de conteúdo.
+# Numa nova execução, um nó só é recalculado se o hash das suas entradas mudou
+# (ou se sua saída não está mais disponível); os demais são pulados.
+# Nós independentes rodam em paralelo. Um nó que falha não derruba os demais:
+# só os que dependem dele deixam de rodar.
+
+MAX_WORKERS = 16
+
+
+@dataclass(frozen=True)
+class Node:
+    name: str
+    func: Callable[[dict[str, Any]], Any]   # {dep: saída} -> saída
+    deps: tuple[str, ...] = ()
+    always: bool = False                    # nós de origem (fetch) sempre rodam
+    fresh: Callable[[], bool] = field(default=lambda: True)  # a saída persistida ainda existe?
+
+
+def content_hash(obj: Any) -> str:
+    """Hash estável do conteúdo de um dataframe (ou de qualquer objeto serializável)."""
+    h = hashlib.sha256()
+    if isinstance(obj, pd.DataFrame):
+        h.update(json.dumps([str(c) for c in obj.columns]).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    else:
+        h.update(json.dumps(obj, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+def load_state(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_state(path: Path, state: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _with_deps(nodes: dict[str, Node], targets: list[str]) -> list[str]:
+    """Nós necessários para os alvos, em ordem topológica."""
+    order: list[str] = []
+    seen: set[str] = set()
+
+    def visit(name: str, stack: tuple[str, ...] = ()) -> None:
+        if name in stack:
+            raise ValueError(f"Ciclo no grafo: {' -> '.join(stack + (name,))}")
+        if name in seen:
+            return
+        for dep in nodes[name].deps:
+            visit(dep, stack + (name,))
+        seen.add(name)
+        order.append(name)
+
+    for t in targets:
+        visit(t)
+    return order
+
+
+def run(
+    nodes: dict[str, Node],
+    targets: list[str],
+    state_path: Path,
+    force: bool = False,
+    max_workers: int = MAX_WORKERS,
+    errors: dict[str, BaseException] | None = None,
+) -> dict[str, str]:
+    """
+    Executa os nós necessários para `targets`.
+    Retorna {nó: "run" | "skip" | "failed" | "blocked"}; as exceções dos nós
+    que falharam são colocadas em `errors` (blocked = dependia de um nó que falhou).
+    O estado (hash de entrada e de saída de cada nó) é gravado em state_path.
+    """
+    errors = {} if errors is None else errors
+    order = _with_deps(nodes, targets)
+    state = load_state(state_path)
+    lock = threading.Lock()
+
+    results: dict[str, Any] = {}
+    out_hash: dict[str, str] = {}
+    status: dict[str, str] = {}
+
+    def input_hash(node: Node) -> str:
+        return content_hash({dep: out_hash[dep] for dep in node.deps})
+
+    def execute(name: str) -> None:
+        node = nodes[name]
+        in_hash = input_hash(node)
+        prev = state.get(name, {})
+
+        if (
+            not force
+            and not node.always
+            and prev.get("input") == in_hash
+            and "output" in prev
+            and node.fresh()
+        ):
+            with lock:
+                out_hash[name] = prev["output"]
+                status[name] = "skip"
+            return
+
+        # dependência pulada, mas este nó precisa rodar: materializa a dependência
+        for dep in node.deps:
+            if dep not in results:
+                materialize(dep)
+
+        value = node.func({dep: results[dep] for dep in node.deps})
+        with lock:
+            results[name] = value
+            out_hash[name] = content_hash(value)
+            status[name] = "run"
+            state[name] = {"input": in_hash, "output": out_hash[name]}
+
+    def materialize(name: str) -> None:
+        node = nodes[name]
+        for dep in node.deps:
+            if dep not in results:
+                materialize(dep)
+        value = node.func({dep: results[dep] for dep in node.deps})
+        with lock:
+            results[name] = value
+
+    pending = list(order)
+    done: set[str] = set()
+    failed: set[str] = set()
+    running: dict = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            for name in list(pending):
+                deps = nodes[name].deps
+                if any(d in failed for d in deps):
+                    pending.remove(name)
+                    failed.add(name)
+                    status[name] = "blocked"
+                elif all(d in done for d in deps):
+                    pending.remove(name)
+                    running[pool.submit(execute, name)] = name
+
+            if not running:
+                continue
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in finished:
+                name = running.pop(fut)
+                try:
+                    fut.result()
+                except Exception as e:
+                    errors[name] = e
+                    failed.add(name)
+                    status[name] = "failed"
+                else:
+                    done.add(name)
+
+    save_state(state_path, state)
+    return status
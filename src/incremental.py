@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+
+from .encoding import read_parquet
+
+# -----------------------
+# Atualização incremental
+# -----------------------
+# Em vez de buscar todo o histórico, lê a última data já gravada em cada parquet
+# de data/processed e pede às APIs apenas uma janela de revisão + os períodos novos.
+# O resultado é então mesclado à tabela existente (os valores novos prevalecem).
+
+# quantos períodos anteriores ao último gravado são buscados de novo (revisões)
+REVISION_WINDOW = {
+    "monthly": 6,    # meses
+    "quarterly": 4,  # trimestres
+}
+
+
+def last_date(path: Path) -> pd.Timestamp | None:
+    """Maior valor da coluna date do parquet (lendo apenas essa coluna)."""
+    if not path.exists():
+        return None
+    d = read_parquet(path, columns=["date"])["date"].max()
+    return None if pd.isna(d) else d
+
+
+def sgs_start(path: Path, default: str, window: int = REVISION_WINDOW["monthly"]) -> str:
+    """
+    Data inicial para sgs.get: primeiro dia do mês `window` meses antes da
+    última data gravada. Sem parquet anterior, usa `default`.
+    """
+    d = last_date(path)
+    if d is None:
+        return default
+    start = (d - pd.DateOffset(months=window)).replace(day=1)
+    return max(start, pd.Timestamp(default)).strftime("%Y-%m-%d")
+
+
+def sidra_period(path: Path, freq: str, default: str = "all") -> str:
+    """
+    Parâmetro period do SIDRA ("last N") cobrindo a janela de revisão e todos
+    os períodos posteriores à última data gravada. freq: "monthly" | "quarterly".
+    """
+    d = last_date(path)
+    if d is None:
+        return default
+
+    today = pd.Timestamp.today()
+    if freq == "monthly":
+        elapsed = (today.year - d.year) * 12 + (today.month - d.month)
+    elif freq == "quarterly":
+        elapsed = (today.year - d.year) * 4 + (today.quarter - d.quarter)
+    else:
+        raise ValueError(f"Frequência desconhecida: {freq}")
+
+    return f"last {max(elapsed, 0) + REVISION_WINDOW[freq]}"
+
+
+def merge_incremental(new: pd.DataFrame, path: Path, keys: list[str]) -> pd.DataFrame:
+    """
+    Mescla as linhas recém-buscadas à tabela gravada em `path`.
+    Linhas com as mesmas chaves são substituídas pelas novas (revisões).
+    """
+    if not path.exists():
+        return new
+    return merge_frames(new, read_parquet(path), keys)
+
+
+def merge_frames(new: pd.DataFrame, old: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """Une `old` e `new`; nas chaves repetidas ficam as linhas de `new`."""
+    old = old.copy()
+    old["date"] = pd.to_datetime(old["date"], errors="coerce")
+
+    # frames vazios ou só com nulos ficam fora do concat: o pandas deixará de
+    # ignorá-los na escolha dos tipos das colunas (FutureWarning)
+    frames = [df for df in (old, new) if not df.empty and df.notna().any().any()] or [new]
+    out = pd.concat(frames, ignore_index=True)
+    out = out.drop_duplicates(subset=keys, keep="last")
+    return out.sort_values(keys).reset_index(drop=True)
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+# -----------------------
+# Instrumentação das etapas do build
+# -----------------------
+# Cada nó do grafo (fetch / tidy / validate / write) e cada junção de séries
+# dentro do tidy (merge) vira um registro com: tempo de parede, bytes recebidos,
+# linhas de entrada e de saída e pico de memória (tracemalloc).
+# Os registros vão para data/processed/build_report.json e para uma tabela no
+# console, que compara cada etapa com o relatório da execução anterior.
+#
+# Bytes: os recebidos da rede quando o fetch passa por endpoints.py
+# (CONJUNTURA_BACKEND=http); com sidrapy/python-bcb, o tamanho em memória da
+# resposta (marcado como estimado). Respostas do cache não contam bytes de rede.
+# Memória (opcional, --trace-memory: o tracemalloc deixa o build várias vezes
+# mais lento): mede o processo inteiro; com etapas em paralelo, o pico de uma
+# etapa é o maior pico do processo enquanto ela rodava.
+
+REPORT_NAME = "build_report.json"
+
+# etapa mais lenta que na execução anterior: acima destes limites, é destacada
+REGRESSION_RATIO = 1.25
+REGRESSION_MIN_S = 0.2
+
+_current: contextvars.ContextVar["Stage | None"] = contextvars.ContextVar("stage", default=None)
+_lock = threading.Lock()
+_active: set["Stage"] = set()
+_records: list["Stage"] = []
+_enabled = False
+_trace_memory = False
+
+
+@dataclass(eq=False)
+class Stage:
+    name: str                    # ex.: "fetch:pim_12m", "tidy:pib", "tidy:pib/merge"
+    kind: str                    # fetch | tidy | merge | validate | write
+    dataset: str | None
+    start: float = 0.0
+    seconds: float = 0.0
+    rows_in: int | None = None
+    rows_out: int | None = None
+    bytes: int = 0
+    bytes_estimated: bool = False
+    peak_mb: float | None = None
+
+
+def _rows(obj: Any) -> int | None:
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(len(obj))
+    if isinstance(obj, dict):
+        counts = [_rows(v) for v in obj.values()]
+        counts = [c for c in counts if c is not None]
+        return sum(counts) if counts else None
+    if isinstance(obj, (list, tuple)):
+        return _rows(dict(enumerate(obj)))
+    return None
+
+
+def _bump_peak() -> None:
+    """Repassa o pico do intervalo que terminou às etapas ativas e zera o pico."""
+    peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+    for st in _active:
+        st.peak_mb = max(st.peak_mb or 0.0, peak)
+    tracemalloc.reset_peak()
+
+
+def start(trace_memory: bool = False) -> None:
+    """Liga a coleta (uma execução do build por vez)."""
+    global _enabled, _trace_memory
+    with _lock:
+        _records.clear()
+        _active.clear()
+        _enabled = True
+        _trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def stop() -> list[Stage]:
+    global _enabled
+    with _lock:
+        _enabled = False
+        if _trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return list(_records)
+
+
+@contextmanager
+def stage(name: str, kind: str, dataset: str | None = None, inputs: Any = None):
+    """Mede o bloco; o chamador informa a saída com `st.rows_out = ...` (ou via wrap)."""
+    if not _enabled:
+        yield None
+        return
+    st = Stage(name, kind, dataset, rows_in=_rows(inputs))
+    token = _current.set(st)
+    with _lock:
+        if _trace_memory:
+            _bump_peak()
+        _active.add(st)
+    st.start = time.perf_counter()
+    try:
+        yield st
+    finally:
+        st.seconds = time.perf_counter() - st.start
+        _current.reset(token)
+        with _lock:
+            if _trace_memory:
+                _bump_peak()
+            _active.discard(st)
+            _records.append(st)
+
+
+def substage(kind: str, inputs: Any = None):
+    """Etapa aninhada na etapa corrente (ex.: merge dentro do tidy); fora de um build, não mede nada."""
+    parent = _current.get()
+    if parent is None:
+        return _noop()
+    return stage(f"{parent.name}/{kind}", kind, parent.dataset, inputs)
+
+
+@contextmanager
+def _noop():
+    yield None
+
+
+def add_bytes(n: int) -> None:
+    """Bytes recebidos da rede pela etapa corrente."""
+    st = _current.get()
+    if st is not None:
+        with _lock:
+            st.bytes += n
+
+
+def wrap(name: str, kind: str, dataset: str | None, func: Callable[[dict], Any]) -> Callable[[dict], Any]:
+    """Função de nó do grafo instrumentada."""
+    def run(inputs: dict) -> Any:
+        with stage(name, kind, dataset, inputs) as st:
+            out = func(inputs)
+            if st is not None:
+                st.rows_out = _rows(out)
+                if kind == "fetch" and st.bytes == 0 and isinstance(out, pd.DataFrame):
+                    st.bytes = int(out.memory_usage(deep=True).sum())
+                    st.bytes_estimated = True
+            return out
+    return run
+
+
+# -----------------------
+# Relatório
+# -----------------------
+
+def report(records: list[Stage], status: dict[str, str], total_s: float) -> dict:
+    t0 = min((r.start for r in records), default=0.0)
+    stages = []
+    for r in sorted(records, key=lambda r: r.start):
+        d = asdict(r)
+        d["start"] = round(r.start - t0, 4)
+        d["seconds"] = round(r.seconds, 4)
+        d["peak_mb"] = None if r.peak_mb is None else round(r.peak_mb, 1)
+        stages.append(d)
+
+    # resumo por dataset e tipo de etapa (fetches em paralelo: tempo = do primeiro início ao último fim)
+    summary: dict[str, dict] = {}
+    for r in records:
+        key = f"{r.dataset or '-'} {r.kind}"
+        s = summary.setdefault(key, {"dataset": r.dataset, "kind": r.kind, "n": 0, "first": r.start, "last": r.start,
+                                     "rows_in": None, "rows_out": None, "bytes": 0, "bytes_estimated": False,
+                                     "peak_mb": None})
+        s["n"] += 1
+        s["first"] = min(s["first"], r.start)
+        s["last"] = max(s["last"], r.start + r.seconds)
+        s["bytes"] += r.bytes
+        s["bytes_estimated"] |= r.bytes_estimated
+        for c in ("rows_in", "rows_out"):
+            v = getattr(r, c)
+            if v is not None:
+                s[c] = (s[c] or 0) + v
+        if r.peak_mb is not None:
+            s["peak_mb"] = round(max(s["peak_mb"] or 0.0, r.peak_mb), 1)
+    for s in summary.values():
+        s["seconds"] = round(s.pop("last") - s.pop("first"), 4)
+
+    return {
+        "when": datetime.now().isoformat(timespec="seconds"),
+        "total_s": round(total_s, 3),
+        "status": status,
+        "summary": summary,
+        "stages": stages,
+    }
+
+
+def read_report(out_dir: Path) -> dict | None:
+    path = out_dir / REPORT_NAME
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return None
+
+
+def write_report(rep: dict, out_dir: Path) -> Path:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / REPORT_NAME
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(rep, indent=2, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+    return path
+
+
+def _fmt_bytes(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f}{unit}" if unit == "B" else f"{n:.1f}{unit}"
+        n /= 1024
+    return str(n)
+
+
+def format_table(rep: dict, previous: dict | None = None) -> str:
+    """Tabela do resumo por dataset/etapa, com a variação de tempo em relação ao relatório anterior."""
+    prev = (previous or {}).get("summary", {})
+    order = {"fetch": 0, "tidy": 1, "merge": 2, "validate": 3, "write": 4}
+    rows = sorted(rep["summary"].items(), key=lambda kv: (kv[1]["dataset"] or "", order.get(kv[1]["kind"], 9)))
+
+    lines = [f"{'dataset':<22}{'etapa':<10}{'n':>4}{'tempo':>9}{'anterior':>10}{'linhas':>20}{'bytes':>10}{'pico':>10}"]
+    for key, s in rows:
+        p = prev.get(key, {}).get("seconds")
+        flag = ""
+        if p is not None and s["seconds"] > p * REGRESSION_RATIO and s["seconds"] - p > REGRESSION_MIN_S:
+            flag = "  <- mais lento"
+        rows_in = "-" if s["rows_in"] is None else s["rows_in"]
+        rows_out = "-" if s["rows_out"] is None else s["rows_out"]
+        before = "" if p is None else f"{p:.2f}s"
+        size = ("~" if s.get("bytes_estimated") else "") + _fmt_bytes(s["bytes"]) if s["bytes"] else "-"
+        peak = "-" if s["peak_mb"] is None else f"{s['peak_mb']:.0f}MB"
+        lines.append(
+            f"{s['dataset'] or '-':<22}{s['kind']:<10}{s['n']:>4}{s['seconds']:>8.2f}s{before:>10}"
+            f"{f'{rows_in} -> {rows_out}':>20}{size:>10}{peak:>10}{flag}"
+        )
+    total_prev = (previous or {}).get("total_s")
+    lines.append(f"total: {rep['total_s']:.2f}s" + ("" if total_prev is None else f" (anterior: {total_prev:.2f}s)"))
+    return "\n".join(lines)
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# -----------------------
+# Hierarquia e contribuições do IPCA (tabela 7060, classificação 315)
+# -----------------------
+# Os nomes das categorias trazem o código na frente ("1.Alimentação e bebidas",
+# "1101002.Arroz"); o nível sai do tamanho do código e o pai é o prefixo do
+# nível acima:
+#   0 índice geral | 1 grupo (1 dígito) | 2 subgrupo (2) | 3 item (4) | 4 subitem (7)
+# As contribuições são calculadas como matrizes data x código (variação x peso),
+# então detalhar um grupo é só selecionar colunas, qualquer que seja o nível.
+
+INDICE_GERAL = "0"
+
+LEVEL_BY_LEN = {1: 1, 2: 2, 4: 3, 7: 4}
+PARENT_LEN = {2: 1, 4: 2, 7: 4}
+
+LEVEL_NAMES = {0: "Índice geral", 1: "Grupo", 2: "Subgrupo", 3: "Item", 4: "Subitem"}
+
+# códigos dos grupos na classificação 315 (ipca_grupos.parquet no formato antigo
+# traz só o nome do grupo: date, grupo, indicador, value)
+GROUP_CODES = {
+    "Índice geral": INDICE_GERAL,
+    "Alimentação e bebidas": "1",
+    "Habitação": "2",
+    "Artigos de residência": "3",
+    "Vestuário": "4",
+    "Transportes": "5",
+    "Saúde e cuidados pessoais": "6",
+    "Despesas pessoais": "7",
+    "Educação": "8",
+    "Comunicação": "9",
+}
+
+
+def parse_labels(names: pd.Series) -> pd.DataFrame:
+    """
+    Código, nome limpo, nível e código do pai de cada rótulo da classificação 315.
+    Trabalha sobre os rótulos distintos (algumas centenas) e devolve alinhado a `names`.
+    """
+    codes, uniques = pd.factorize(names.astype(str))
+    parts = pd.Series(uniques).str.extract(r"^\s*(\d+)\.\s*(.*)$")
+
+    codigo = parts[0].fillna(INDICE_GERAL)
+    nome = parts[1].where(parts[0].notna(), pd.Series(uniques)).str.strip()
+    n = codigo.str.len().where(codigo != INDICE_GERAL, 0)
+    nivel = n.map(LEVEL_BY_LEN).fillna(0).astype("int8")
+    pai = pd.Series(
+        [c[:PARENT_LEN[len(c)]] if len(c) in PARENT_LEN else (None if c == INDICE_GERAL else INDICE_GERAL)
+         for c in codigo],
+        dtype=object,
+    )
+
+    table = pd.DataFrame({"codigo": codigo, "grupo": nome, "nivel": nivel, "pai": pai})
+    return table.iloc[codes].reset_index(drop=True).set_axis(names.index)
+
+
+def with_codes(long: pd.DataFrame) -> pd.DataFrame:
+    """
+    Dataset no formato antigo (só grupos, sem codigo/nivel/pai) -> mesmas colunas
+    do formato atual, com o índice geral e os grupos (níveis 0 e 1). Um nome fora
+    de GROUP_CODES vira grupo com o próprio nome como código. No formato atual,
+    devolve o dataset como está.
+    """
+    if "codigo" in long.columns:
+        return long
+    nome = long["grupo"].astype(str)
+    codigo = nome.map(GROUP_CODES).fillna(nome)
+    geral = codigo == INDICE_GERAL
+    return long.assign(
+        codigo=codigo,
+        nivel=np.where(geral, 0, 1).astype("int8"),
+        pai=pd.Series(np.where(geral, None, INDICE_GERAL), index=long.index, dtype=object),
+    )
+
+
+def hierarchy(long: pd.DataFrame) -> pd.DataFrame:
+    """Uma linha por código: codigo, grupo (nome), nivel, pai — em ordem de árvore."""
+    h = long[["codigo", "grupo", "nivel", "pai"]].drop_duplicates("codigo")
+    for c in ("codigo", "grupo", "pai"):
+        h[c] = h[c].astype(object)
+    return h.sort_values("codigo").reset_index(drop=True)
+
+
+def children(hier: pd.DataFrame, codigo: str) -> pd.DataFrame:
+    return hier[hier["pai"] == codigo]
+
+
+def matrix(long: pd.DataFrame, indicador: str) -> pd.DataFrame:
+    """Matriz data x código de um indicador (float64, datas ordenadas)."""
+    df = long[long["indicador"] == indicador]
+    out = df.pivot_table(index="date", columns="codigo", values="value", aggfunc="last", observed=True)
+    out.columns = out.columns.astype(str)
+    return out.sort_index().astype("float64")
+
+
+def contributions(var: pd.DataFrame, peso: pd.DataFrame) -> pd.DataFrame:
+    """
+    Contribuição de cada série para o índice geral, em p.p.: variação x peso / 100.
+    As duas matrizes são alinhadas por data e código antes do produto.
+    """
+    var, peso = var.align(peso, join="inner")
+    return pd.DataFrame(
+        var.to_numpy() * peso.to_numpy() / 100.0,
+        index=var.index,
+        columns=var.columns,
+    )
+
+
+def to_long(mat: pd.DataFrame, codes: list[str], name: str) -> pd.DataFrame:
+    """Colunas `codes` da matriz em formato long (date, codigo, name)."""
+    cols = [c for c in codes if c in mat.columns]
+    sub = mat[cols]
+    return pd.DataFrame({
+        "date": np.repeat(sub.index.to_numpy(), len(cols)),
+        "codigo": np.tile(np.asarray(cols, dtype=object), len(sub)),
+        name: sub.to_numpy().ravel(),
+    }).dropna(subset=[name])
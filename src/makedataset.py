@@ -1,306 +1,275 @@
-import pandas as pd
-import numpy as np
-import sidrapy as sd
-from bcb import sgs
-import sidrapy as sidra
-from sidrapy import get_table
-import numpy as np
-import statsmodels.api as sm
-import statsmodels.formula.api as smf
-from functools import reduce
-from pathlib import Path   
+"""
+Pipeline dos dados do painel (data/processed).
+
+Uso (a partir da raiz do projeto):
+    python -m src.makedataset build all
+    python -m src.makedataset build sgs ipca-grupos
+    python -m src.makedataset build selic --incremental
+    python -m src.makedataset build sgs-diario              # Selic, CDI e PTAX diários, histórico completo
+    python -m src.makedataset build regional-mensal regional-trimestral
+    python -m src.makedataset vintages pib                  # revisões: 1ª divulgação x atual
+    python -m src.makedataset vintages pib --as-of 2024-06-30
+
+Opções:
+    --incremental  busca só a janela de revisão + períodos novos e mescla aos parquets
+    --no-cache     sempre vai à rede (ignora data/cache)
+    --cache-only   roda offline, apenas com respostas já gravadas em data/cache
+    --force        reconstrói tudo, mesmo o que não mudou desde a última execução
+    --partitioned  também grava o layout particionado por ano em data/processed/store
+    --trace-memory mede também o pico de memória por etapa (tracemalloc; deixa o build bem mais lento)
+
+Cada build grava data/processed/build_report.json (tempo, linhas, bytes e memória
+por etapa) e mostra um resumo comparado com o build anterior.
+"""
 from __future__ import annotations
 
-###################################################################
-### Dados SGS ###
+import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
 
-## Selic
-selic = sgs.get({'selic' : '432'},
-               start = '2020-01-31')
-selic
-# Tratamento dos dados da selic para mensal
-selic_mensal = selic.resample('M').last().reset_index()
-selic_mensal.rename(columns={"Date": "date"}, inplace=True)
-selic_mensal
-#Exportando os dados processados
-BASE_DIR = Path(__file__).resolve().parents[1]  # raiz do projeto
-out_dir = BASE_DIR / "data" / "processed"
-
-out_dir.mkdir(parents=True, exist_ok=True)
-
-selic_mensal.to_parquet(out_dir / "selic_mensal.parquet", index=False)
-
-
-ipca_mensal= sgs.get({'ipca' : '433'},
-               start = '2014-01-31')
-ipca_mensal
-
-ipca_12m = sgs.get({'ipca_12m' : '13522'},
-               start = '2014-01-31')
-ipca_12m
-
-ibc_br= sgs.get({'ibc_br' : '24363'},
-               start = '2014-03-31')
-ibc_br
-
-saldo_cred = sgs.get(
-    {
-        'credito_pf': '20570',
-        'credito_pj': '20543',
-        'credito_total': '20542'
-    },
-    start='2014-01-31'
-)
-saldo_cred
-
-## inadimplencia anual
-inadimplencia =  sgs.get(
-    {
-        'inadimplencia_total' : '21085',
-        'inadimplencia_pj' : '21086',
-        'inadimplencia_pf' : '21112',
-    },
-    start='2014-01-31'
-)
-inadimplencia
-
-
-## taxa de juros anual
-taxa_de_juros = sgs.get(
-    {
-        'taxa_juros_pf' : '20748',
-        'taxa_juros_pj' : '20718',
-        'taxa_juros_total' : '20717',
-    },
-    start='2014-01-31'
-)
-taxa_de_juros
-
-
-df_sgs = [
-    ibc_br,
-    ipca_mensal,
-    ipca_12m,
-    saldo_cred,
-    inadimplencia,
-    taxa_de_juros]
-
-df_sgs
-
-sgs_wide = reduce(
-    lambda left, right: pd.merge(left, right, on="Date", how="outer"),
-    df_sgs
-)
-sgs_wide
-sgs_wide=sgs_wide.reset_index()
-
-sgs_wide = sgs_wide.rename(columns={"Date": "date"})
-sgs_wide.dropna(inplace=True)
-sgs_wide.head()
-sgs_wide.tail()
+import pandas as pd
+import pyarrow.parquet as pq
+
+from . import cache, instrument, vintage
+from .fetch import fetch_one, sgs_request, sidra_request
+from .graph import Node, run
+from .incremental import merge_frames, merge_incremental, sgs_start, sidra_period
+from .ipca import parse_labels
+from .manifest import publish, read_manifest
+from .merge import align_series
+from .periods import sidra_period_to_date
+from .regional import KEYS as REGIONAL_KEYS, split_uf, tidy_regional
+from .registry import request_name, request_params, series_for
+from .store import count as count_store, exists as store_exists, read as read_store, write_partitioned
+from .tidy import sidra_to_long, sidra_to_wide, tidy_sidra
+from .validate import Checks, check
 
 BASE_DIR = Path(__file__).resolve().parents[1]  # raiz do projeto
-out_dir = BASE_DIR / "data" / "processed"
+DATA_DIR = Path(os.environ.get("CONJUNTURA_DATA_DIR", BASE_DIR / "data"))
+OUT_DIR = DATA_DIR / "processed"
+STATE_PATH = DATA_DIR / "build" / "state.json"
 
-out_dir.mkdir(parents=True, exist_ok=True)
+# junção das séries nos datasets wide: união das datas, descartando só as datas
+# sem nenhum valor (séries com início ou defasagem de divulgação diferentes são mantidas)
+WIDE_JOIN = dict(how="outer", dropna="all")
 
-sgs_wide.to_parquet(out_dir / "sgs_dados.parquet", index=False)
 
-#####################################################################################
+def start_for(filename: str, default: str, incremental: bool) -> str:
+    return sgs_start(OUT_DIR / filename, default) if incremental else default
+
+
+def period_for(filename: str, freq: str, default: str, incremental: bool) -> str:
+    return sidra_period(OUT_DIR / filename, freq, default) if incremental else default
 
-#  --- Dados SIDRA ---
 
-## PIB por setores trimestral
-
-pibs = sidra.get_table(
-    table_code=5932,
-    territorial_level='1',
-    ibge_territorial_code='1',
-    variable='6562',
-    period='all',
-    classifications={
-        '11255': '90687,90691,90707,90696,90704,93404,93405,93406'
-    },
-    header='n'
-)
-
-pibs
-##################################################################################
-
-# Funções de limpeza e transformação trimestrais SIDRA
-def sidra_quarter_code_to_date(s: pd.Series) -> pd.Series:
+def merge_published(df: pd.DataFrame, filename: str, keys: list[str], by_uf: bool = False) -> pd.DataFrame:
     """
-    Converte código trimestral SIDRA (YYYYQQ) em datetime:
-    QQ=01..04 => último dia do trimestre.
-    Ex.: 199601 -> 1996-03-31
+    Modo incremental: tabela completa a publicar = o que já está gravado + o
+    recém-tratado (as linhas novas prevalecem). Inclui as UFs do store se by_uf.
     """
-    s = s.astype(str).str.strip()
-    year = s.str.slice(0, 4).astype(int)
-    q = s.str.slice(4, 6).astype(int)
-
-    # fim do trimestre: Q1=03-31, Q2=06-30, Q3=09-30, Q4=12-31
-    month = q.map({1: 3, 2: 6, 3: 9, 4: 12})
-    # dia final por mês (3,6,9,12)
-    day = month.map({3: 31, 6: 30, 9: 30, 12: 31})
-
-    return pd.to_datetime(
-        dict(year=year, month=month, day=day),
-        errors="coerce"
-    )
+    path = OUT_DIR / filename
+    out = merge_incremental(df, path, keys)
+    uf_name = f"{path.stem}_uf"
+    if by_uf and store_exists(uf_name):
+        out = merge_frames(out, read_store(uf_name), keys)
+    return out
 
-def tidy_sidra_setores(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
 
-    # valor numérico (SIDRA às vezes vem como string)
-    out["V"] = pd.to_numeric(out["V"], errors="coerce")
+def previous_build(filename: str, by_uf: bool = False) -> dict | None:
+    """Entrada do manifest do build anterior (somando as linhas das UFs no store)."""
+    stem = Path(filename).stem
+    entry = read_manifest(OUT_DIR).get(stem)
+    if entry and by_uf and store_exists(f"{stem}_uf"):
+        entry = {**entry, "rows": entry["rows"] + count_store(f"{stem}_uf")}
+    return entry
 
-    # data a partir de D2C (YYYYQQ)
-    out["date"] = sidra_quarter_code_to_date(out["D2C"])
 
-    # colunas-alvo
-    out = out.rename(columns={
-        "D4N": "setor",
-        "V": "value",
-    })[["date", "setor","value"]]
-
-    # limpeza básica
-    out = out.dropna(subset=["date", "setor", "value"]).sort_values(["setor", "date"]).reset_index(drop=True)
+def save_parquet(
+    df: pd.DataFrame,
+    filename: str,
+    partitioned: bool = False,
+    series_col: str | None = None,
+    by_uf: bool = False,
+    vintage_keys: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Publica o parquet (gravação atômica + entrada no manifest.json).
+    Com partitioned=True grava também o layout particionado (store.py).
+    Com by_uf=True o parquet plano leva só os agregados (Brasil/regiões) e as
+    linhas das UFs vão para o store, particionadas por UF (regional.py).
+    Com vintage_keys, as células que mudaram entram numa nova safra (vintage.py).
+    """
+    path = OUT_DIR / filename
+    if vintage_keys:
+        vintage.record(path.stem, df, vintage_keys)
+    if by_uf:
+        df, ufs = split_uf(df)
+        write_partitioned(ufs, f"{path.stem}_uf", partition_by=("uf",))
+    publish(df, path)
+    if partitioned:
+        write_partitioned(df, path.stem, series_col=series_col)
+    return df
 
-    return out
 
-# uso:
-pib_long = tidy_sidra_setores(pibs)
-pib_long
+###################################################################
+### Dados SGS ###
 
+# uma requisição por código, para que todas rodem em paralelo
+SGS_SERIES = {
+    "ipca": ("433", "2014-01-31"),
+    "ipca_12m": ("13522", "2014-01-31"),
+    "ibc_br": ("24363", "2014-03-31"),
+    "credito_pf": ("20570", "2014-01-31"),
+    "credito_pj": ("20543", "2014-01-31"),
+    "credito_total": ("20542", "2014-01-31"),
+    "inadimplencia_total": ("21085", "2014-01-31"),
+    "inadimplencia_pj": ("21086", "2014-01-31"),
+    "inadimplencia_pf": ("21112", "2014-01-31"),
+    "taxa_juros_pf": ("20748", "2014-01-31"),
+    "taxa_juros_pj": ("20718", "2014-01-31"),
+    "taxa_juros_total": ("20717", "2014-01-31"),
+}
 
-setores = pib_long["setor"].unique().tolist()
-setores
 
-#Exportando os dados pib
+def selic_requests(incremental: bool = False) -> dict:
+    start = start_for("selic_mensal.parquet", "2020-01-31", incremental)
+    return {"selic": sgs_request({"selic": "432"}, start=start, freq="daily")}
 
-out_dir = BASE_DIR / "data" / "processed"
 
-out_dir.mkdir(parents=True, exist_ok=True)
+def tidy_selic(raw: dict) -> pd.DataFrame:
+    # Tratamento dos dados da selic para mensal
+    selic_mensal = raw["selic"].resample("ME").last().reset_index()
+    return selic_mensal.rename(columns={"Date": "date"})
 
-pib_long.to_parquet(out_dir / "pibs_quarterly.parquet", index=False)
 
-## IPCA detalhado
+def sgs_requests(incremental: bool = False) -> dict:
+    return {
+        f"sgs_{name}": sgs_request({name: code}, start=start_for("sgs_dados.parquet", start, incremental))
+        for name, (code, start) in SGS_SERIES.items()
+    }
 
-IPCA_TABLE = "7060"
 
-# Grupos (315) — índice cheio e grupos (seus códigos)
-IPCA_GRUPOS_315 = "7169,7170,7445,7486,7558,7625,7660,7712,7766,7786"
+def tidy_sgs(raw: dict) -> pd.DataFrame:
+    df_sgs = [raw[f"sgs_{name}"] for name in SGS_SERIES]
+    return align_series(df_sgs, on="date", **WIDE_JOIN)
 
-# Variáveis (tabela 7060):
-# 63  = variação mensal
-# 2265 = variação acumulada em 12 meses
-# 66  = peso mensal
-IPCA_VARS = ["63", "2265", "66"]
 
-VAR_LABELS = {
-    "IPCA - Variação mensal": "variacao_mensal",
-    "IPCA - Variação acumulada em 12 meses": "variacao_12m",
-    "IPCA - Peso mensal": "peso_mensal",
+# séries diárias, desde o início de cada uma; históricos longos são buscados
+# em janelas de até 10 anos, em paralelo (fetch.split_sgs)
+SGS_DAILY_SERIES = {
+    "selic": ("11", "1986-06-04"),
+    "selic_meta": ("432", "1999-03-05"),
+    "cdi": ("12", "1986-03-06"),
+    "ptax_venda": ("1", "1984-11-28"),
 }
 
-def fetch_ipca_grupos(period: str = "all") -> pd.DataFrame:
-    """
-    Busca no SIDRA a tabela 7060 para Brasil (nível 1, código 1),
-    para o IPCA cheio e grupos (classificação 315) e variáveis definidas em IPCA_VARS.
-    """
-    frames = []
-    for var in IPCA_VARS:
-        df = sidra.get_table(
-            table_code=IPCA_TABLE,
-            territorial_level="1",
-            ibge_territorial_code="1",
-            variable=var,
-            classifications={"315": IPCA_GRUPOS_315},
-            period=period,
-            header="n",
-        )
-        frames.append(df)
-
-    return pd.concat(frames, ignore_index=True)
-
-#Tratamento ipca detalhado
-
-def tidy_ipca_grupos(df_raw: pd.DataFrame) -> pd.DataFrame:
-    df = df_raw.copy()
 
-    rename_map = {
-        "D2C": "periodo",   # YYYYMM
-        "D3N": "variavel",
-        "D4N": "grupo",
-        "V": "value",
+def sgs_diario_requests(incremental: bool = False) -> dict:
+    return {
+        f"sgsd_{name}": sgs_request({name: code}, start=start_for("sgs_diario.parquet", start, incremental), freq="daily")
+        for name, (code, start) in SGS_DAILY_SERIES.items()
     }
 
-    for k, v in rename_map.items():
-        if k in df.columns:
-            df = df.rename(columns={k: v})
 
-    # valor numérico
-    df["value"] = pd.to_numeric(df["value"], errors="coerce")
+def tidy_sgs_diario(raw: dict) -> pd.DataFrame:
+    return align_series([raw[f"sgsd_{name}"] for name in SGS_DAILY_SERIES], on="date", **WIDE_JOIN)
 
-    # data: YYYYMM -> fim do mês
-    df["date"] = (
-        pd.to_datetime(df["periodo"].astype(str), format="%Y%m", errors="coerce")
-        + pd.offsets.MonthEnd(0)
-    )
 
-    # normaliza nomes das variáveis
-    df["indicador"] = df["variavel"].replace(VAR_LABELS)
+#####################################################################################
 
-    # limpa nome dos grupos (remove "1. ")
-    df["grupo"] = (
-        df["grupo"]
-        .astype(str)
-        .str.replace(r"^\d+\.\s*", "", regex=True)
-        .str.strip()
-    )
+#  --- Dados SIDRA ---
+# As séries do registro (registry.py) são tratadas pelo motor genérico (tidy.py)
+
+def sidra_requests(dataset: str, incremental: bool = False) -> dict:
+    """Uma requisição por série do registro pertencente ao dataset (e por nível territorial)."""
+    return {
+        request_name(spec, level): sidra_request(**request_params(
+            spec, period_for(f"{dataset}.parquet", spec.freq, spec.period, incremental), level
+        ))
+        for spec in series_for(dataset)
+        for level in spec.levels
+    }
 
-    out = (
-        df[["date", "grupo", "indicador", "value"]]
-        .dropna(subset=["date", "grupo", "indicador", "value"])
-        .sort_values(["grupo", "indicador", "date"])
-        .reset_index(drop=True)
-    )
 
-    return out
+def tidy_sidra_long(dataset: str) -> Callable[[dict], pd.DataFrame]:
+    """Dataset com categorias (PIB por setor, IPP por setor): formato long."""
+    def _tidy(raw: dict) -> pd.DataFrame:
+        spec, = series_for(dataset)
+        return sidra_to_long(tidy_sidra(raw, [spec]), spec)
+    return _tidy
 
 
+def tidy_sidra_wide(dataset: str) -> Callable[[dict], pd.DataFrame]:
+    """Dataset com uma coluna por série (PIM/PMS/PMC, PNAD): formato wide."""
+    def _tidy(raw: dict) -> pd.DataFrame:
+        specs = series_for(dataset)
+        return sidra_to_wide(tidy_sidra(raw, specs), specs, **WIDE_JOIN)
+    return _tidy
 
 
-# coleta
-raw_ipca = fetch_ipca_grupos(period="all")
+def tidy_sidra_regional(dataset: str) -> Callable[[dict], pd.DataFrame]:
+    """Dataset regional (Brasil, regiões e UFs): uma linha por território e data."""
+    def _tidy(raw: dict) -> pd.DataFrame:
+        specs = series_for(dataset)
+        names = {s.name: [request_name(s, level) for level in s.levels] for s in specs}
+        return tidy_regional(raw, specs, names)
+    return _tidy
 
-# tratamento
-ipca_grupos = tidy_ipca_grupos(raw_ipca)
 
-# visualização rápida (debug)
-print(ipca_grupos.head(10))
-print(ipca_grupos.tail(10))
-print(ipca_grupos["indicador"].value_counts())
-print(ipca_grupos["grupo"].unique())
+## IPCA detalhado
 
+IPCA_TABLE = "7060"
 
+# Grupos (315) — índice cheio e grupos (seus códigos)
+IPCA_GRUPOS_315 = "7169,7170,7445,7486,7558,7625,7660,7712,7766,7786"
 
-# Exportação de dados
+# Variáveis (tabela 7060) e categorias da classificação 315 pedidas para cada uma:
+# 63   = variação mensal                 -> árvore completa (grupos a subitens)
+# 2265 = variação acumulada em 12 meses  -> índice cheio e grupos
+# 66   = peso mensal                     -> árvore completa (grupos a subitens)
+IPCA_VARS = {
+    "63": "all",
+    "2265": IPCA_GRUPOS_315,
+    "66": "all",
+}
 
-# Exportação do IPCA grupos (parquet)
-BASE_DIR = Path(__file__).resolve().parents[1]
-out_dir = BASE_DIR / "data" / "processed"
-out_dir.mkdir(parents=True, exist_ok=True)
+VAR_LABELS = {
+    "IPCA - Variação mensal": "variacao_mensal",
+    "IPCA - Variação acumulada em 12 meses": "variacao_12m",
+    "IPCA - Peso mensal": "peso_mensal",
+}
 
-ipca_grupos.to_parquet(out_dir / "ipca_grupos.parquet", index=False)
 
+def ipca_grupos_requests(period: str = "all") -> dict:
+    """
+    Uma requisição por variável de IPCA_VARS na tabela 7060 para Brasil
+    (nível 1, código 1), com as categorias da classificação 315 de cada variável.
+    """
+    return {
+        f"ipca_grupos_{var}": sidra_request(
+            table_code=IPCA_TABLE,
+            territorial_level="1",
+            ibge_territorial_code="1",
+            variable=var,
+            classifications={"315": cats},
+            period=period,
+        )
+        for var, cats in IPCA_VARS.items()
+    }
 
 
 def tidy_ipca_grupos(df_raw: pd.DataFrame) -> pd.DataFrame:
     """
     Retorna dataframe long com:
       date (datetime, fim do mês),
-      grupo (str),
+      codigo (código na classificação 315: "0" índice geral, "1", "11", "1101", "1101002"),
+      grupo (nome, sem o código),
+      nivel (0 índice geral, 1 grupo, 2 subgrupo, 3 item, 4 subitem),
+      pai (código do nível acima),
       indicador (variacao_mensal | variacao_12m | peso_mensal),
       value (float)
     """
@@ -308,13 +277,13 @@ def tidy_ipca_grupos(df_raw: pd.DataFrame) -> pd.DataFrame:
 
     # padrão sidrapy quando header='n': colunas como D2C, D2N, D4N e V
     # - D2C: período (YYYYMM)
-    # - D4N: nome do grupo (geral/grupo/subgrupo/etc.)
+    # - D4N: nome da categoria ("1.Alimentação e bebidas", "1101002.Arroz"...)
     # - D3N: variável (nome)
     # - V  : valor
     rename_map = {
         "D2C": "periodo",
         "D3N": "variavel",
-        "D4N": "grupo",
+        "D4N": "rotulo",
         "V": "value",
     }
     for k, v in rename_map.items():
@@ -325,421 +294,266 @@ def tidy_ipca_grupos(df_raw: pd.DataFrame) -> pd.DataFrame:
     df["value"] = pd.to_numeric(df["value"], errors="coerce")
 
     # data: YYYYMM -> último dia do mês
-    df["date"] = pd.to_datetime(df["periodo"].astype(str), format="%Y%m", errors="coerce") + pd.offsets.MonthEnd(0)
+    df["date"] = sidra_period_to_date(df["periodo"], "monthly")
 
     # normaliza nomes de variável
-    df["indicador"] = df["variavel"].replace(VAR_LABELS)
+    df["indicador"] = df["variavel"].astype(object).replace(VAR_LABELS)
 
-    # limpeza do nome do grupo (remove "1." etc.)
-    df["grupo"] = df["grupo"].astype(str).str.replace(r"^\d+\.\s*", "", regex=True).str.strip()
+    # código, nome, nível e pai a partir do rótulo
+    df = pd.concat([df, parse_labels(df["rotulo"])], axis=1)
 
-    out = df[["date", "grupo", "indicador", "value"]].dropna(subset=["date", "grupo", "indicador", "value"])
-    out = out.sort_values(["grupo", "indicador", "date"]).reset_index(drop=True)
+    cols = ["date", "codigo", "grupo", "nivel", "pai", "indicador", "value"]
+    out = df[cols].dropna(subset=["date", "codigo", "indicador", "value"])
+    out = out.sort_values(["codigo", "indicador", "date"]).reset_index(drop=True)
 
     return out
 
-# Coleta de dados IPCA detalhados
-
-def build_ipca_grupos_dataset(period: str = "all") -> pd.DataFrame:
-    raw = fetch_ipca_grupos(period=period)
-    return tidy_ipca_grupos(raw)
-
-
-def save_ipca_grupos_parquet(df: pd.DataFrame, out_path: Path) -> None:
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_parquet(out_path, index=False)
-
-from pathlib import Path
-
-BASE_DIR = Path(__file__).resolve().parents[1]
-OUT_DIR = BASE_DIR / "data" / "processed"
-
-OUT_DIR.mkdir(parents=True, exist_ok=True)
-
-ipca_grupos.to_parquet(
-    OUT_DIR / "ipca_grupos.parquet",
-    index=False
-)
-
-ipca_grupos.head()
-
-
-#---------------------------
 
-# Indice de preços ao produtor - IPP
+def _ipca_grupos_requests(incremental: bool = False) -> dict:
+    return ipca_grupos_requests(period=period_for("ipca_grupos.parquet", "monthly", "all", incremental))
 
-ipp = sidra.get_table(
-    table_code= 6904,
-    territorial_level='1',
-    ibge_territorial_code='1',
-    variable='1394',
-    period='201501'+'-''202510',
-    classifications={
-        '543': '33586,33583,33585,33584,33580,33579'
-    },
-    header='n'
-)
 
-ipp.head()
+def _tidy_ipca_grupos(raw: dict) -> pd.DataFrame:
+    return tidy_ipca_grupos(pd.concat([raw[name] for name in ipca_grupos_requests()], ignore_index=True))
 
-def tidy_sidra_ipp(df: pd.DataFrame) -> pd.DataFrame:
-    out = ipp.copy()
 
-    # valor numérico (SIDRA às vezes vem como string)
-    out["V"] = pd.to_numeric(out["V"], errors="coerce")
-
-    # data a partir de D1C (YYYYMM)
-    out["date"] = pd.to_datetime(out["D2C"].astype(str), format="%Y%m", errors="coerce") + pd.offsets.MonthEnd(0)
-
-    # colunas-alvo
-    out = out.rename(columns={
-        "D4N": "setor_ipp",
-        "V": "value",
-    })[["date", "setor_ipp","value"]]
-
-    # limpeza básica
-    out = out.dropna(subset=["date", "setor_ipp", "value"]).sort_values(["setor_ipp", "date"]).reset_index(drop=True)
-
-    return out
-
-ipp_long = tidy_sidra_ipp(ipp)
-ipp_long
-
-
-#conferência
-ipp_long["setor_ipp"].unique().tolist()
-
-#Exportando os dados processados
-
-BASE_DIR = Path(__file__).resolve().parents[1]  # raiz do projeto
-out_dir = BASE_DIR / "data" / "processed"
-
-out_dir.mkdir(parents=True, exist_ok=True)
-
-ipp_long.to_parquet(out_dir / "ipp_m.parquet", index=False)
-
-#---------------------------
-#   DADOS MENSAIS DA INDÚSTRIA, COMÉRCIO E SERVIÇOS - PMC, PMS e PIM
-#PIM
-pim_raw = sidra.get_table(
-    table_code= 8888,
-    territorial_level='1',
-    ibge_territorial_code='1',
-    variable='11604',
-    period='all',
-    classifications={'544': '129314'},
-    header='n'
-)
-pim_raw
-
-
-def tidy_sidra_pim(df: pd.DataFrame) -> pd.DataFrame:
-    out = pim_raw.copy()
-
-    # valor numérico (SIDRA às vezes vem como string)
-    out["V"] = pd.to_numeric(out["V"], errors="coerce")
-
-    # data a partir de D2C (YYYYMM)
-    out["date"] = pd.to_datetime(out["D2C"].astype(str), format="%Y%m", errors="coerce") + pd.offsets.MonthEnd(0)
-
-    # colunas-alvo
-    out = out.rename(columns={
-        "V": "pim_12m",
-    })[["date","pim_12m"]]
-
-    # limpeza básica
-    out = out.dropna(subset=["date", "pim_12m"]).sort_values(["date"]).reset_index(drop=True)
-    return out
-
-pim_long = tidy_sidra_pim(pim_raw)
-pim_long
-
-
-#PMS
-
-pms_raw = sidra.get_table(
-    table_code= 5906,
-    territorial_level='1',
-    ibge_territorial_code='1',
-    variable='11626',
-    period='all',
-    classifications={'11046': '56726'},
-    header='n'
-)
-pms_raw
-
-def tidy_sidra_pms(df: pd.DataFrame) -> pd.DataFrame:
-    out = pms_raw.copy()
-
-    # valor numérico (SIDRA às vezes vem como string)
-    out["V"] = pd.to_numeric(out["V"], errors="coerce")
-
-    # data a partir de D2C (YYYYMM)
-    out["date"] = pd.to_datetime(out["D2C"].astype(str), format="%Y%m", errors="coerce") + pd.offsets.MonthEnd(0)
-
-    # colunas-alvo
-    out = out.rename(columns={
-        "V": "pms_12m",
-    })[["date","pms_12m"]]
-
-    # limpeza básica
-    out = out.dropna(subset=["date", "pms_12m"]).sort_values(["date"]).reset_index(drop=True)
-    return out
-
-pms_long = tidy_sidra_pms(pms_raw)
-pms_long
-
-
-#PMC
-pmc_raw = sidra.get_table(
-    table_code= 8880,
-    territorial_level='1',
-    ibge_territorial_code='1',
-    variable='11711',
-    period='all',
-    classifications={'11046':'56734'},
-    header='n'
-)
-pmc_raw
-
-
-def tidy_sidra_pmc(df: pd.DataFrame) -> pd.DataFrame:
-    out = pmc_raw.copy()
-
-    # valor numérico (SIDRA às vezes vem como string)
-    out["V"] = pd.to_numeric(out["V"], errors="coerce")
-
-    # data a partir de D2C (YYYYMM)
-    out["date"] = pd.to_datetime(out["D2C"].astype(str), format="%Y%m", errors="coerce") + pd.offsets.MonthEnd(0)
-
-    # colunas-alvo
-    out = out.rename(columns={
-        "V": "pmc_12m",
-    })[["date","pmc_12m"]]
-
-    # limpeza básica
-    out = out.dropna(subset=["date", "pmc_12m"]).sort_values(["date"]).reset_index(drop=True)
-    return out
-
-pmc_long = tidy_sidra_pmc(pmc_raw)
-pmc_long
-
-#exportando os dados pim/pms/pmc
-
-df_ind_com_ser = [
-    pim_long,
-    pms_long,
-    pmc_long]
-
-df_ind_com_ser
-
-df_ind_com_ser_2 = reduce(
-    lambda left, right: pd.merge(left, right, on="date", how="outer"),
-    df_ind_com_ser
-)
-df_ind_com_ser_final = df_ind_com_ser_2.copy()
-df_ind_com_ser_final.dropna(inplace=True)
-df_ind_com_ser_final
-
-
-BASE_DIR = Path(__file__).resolve().parents[1]  # raiz do projeto
-out_dir = BASE_DIR / "data" / "processed"
-
-out_dir.mkdir(parents=True, exist_ok=True)
-
-df_ind_com_ser_final.to_parquet(out_dir / "indust_comer_serv.parquet", index=False)
-
-
-#---------------------------------------------------------------------
-# Sócio econômicos
-
-#- desemprego
-
-desemp = sidra.get_table(
-    table_code= 4099,
-    territorial_level='1',
-    ibge_territorial_code='1',
-    variable='4099',
-    period='all',
-    classifications='',
-    header='n'
-)
-desemp
-
-def tidy_sidra_desemp(df: pd.DataFrame) -> pd.DataFrame:
-    desemprego = desemp.copy()
-
-    # valor numérico (SIDRA às vezes vem como string)
-    desemprego["V"] = pd.to_numeric(desemprego["V"], errors="coerce")
-
-    # data a partir de D2C (YYYYQQ)
-    desemprego["date"] = sidra_quarter_code_to_date(desemprego["D2C"])
-
-    # colunas-alvo
-    desemprego = desemprego.rename(columns={
-        "D4N": "setor",
-        "V": "taxa_desemprego",
-    })[["date", "taxa_desemprego"]]
-
-    return desemprego
-
-desemprego_long = tidy_sidra_desemp(desemp)
-desemprego_long
-#ocupação
-
-ocup = sidra.get_table(
-    table_code= 6466,
-    territorial_level='1',
-    ibge_territorial_code='1',
-    variable='4097',
-    period='all',
-    classifications='',
-    header='n'
-)
-ocup
-
-
-def tidy_sidra_ocup(df: pd.DataFrame) -> pd.DataFrame:
-    ocupacao = ocup.copy()
-
-    # valor numérico (SIDRA às vezes vem como string)
-    ocupacao["V"] = pd.to_numeric(ocupacao["V"], errors="coerce")
-
-    # data a partir de D2C (YYYYQQ)
-    ocupacao["date"] = sidra_quarter_code_to_date(ocupacao["D2C"])
-
-    # colunas-alvo
-    ocupacao = ocupacao.rename(columns={
-        "D4N": "setor",
-        "V": "taxa_ocupacao",
-    })[["date", "taxa_ocupacao"]]
-
-    return ocupacao
-
-ocupacao_long =  tidy_sidra_ocup(ocup)
-ocupacao_long
-
-
-# renda média
-
-renda = sidra.get_table(
-    table_code= 5439,
-    territorial_level='1',
-    ibge_territorial_code='1',
-    variable='5932',
-    period='all',
-    classifications={'12029': '99383'},
-    header='n'
-)
-renda
-
-def tidy_sidra_renda(df: pd.DataFrame) -> pd.DataFrame:
-    renda_media = renda.copy()
-
-    # valor numérico (SIDRA às vezes vem como string)
-    renda_media["V"] = pd.to_numeric(renda_media["V"], errors="coerce")
-
-    # data a partir de D2C (YYYYQQ)
-    renda_media["date"] = sidra_quarter_code_to_date(renda_media["D2C"])
-
-    # colunas-alvo
-    renda_media = renda_media.rename(columns={
-        "V": "renda_media",
-    })[["date", "renda_media"]]
-
-    return renda_media
-
-renda_media_long = tidy_sidra_renda(renda)
-renda_media_long
-
-
-# informalidade
-
-infor= sidra.get_table(
-    table_code= 8529,
-    territorial_level='1',
-    ibge_territorial_code='1',
-    variable='12466',
-    period='all',
-    classifications='',
-    header='n'
-)
-infor
-
-def tidy_sidra_informalidade(df: pd.DataFrame) -> pd.DataFrame:
-    informalidade = infor.copy()
-
-    # valor numérico (SIDRA às vezes vem como string)
-    informalidade["V"] = pd.to_numeric(informalidade["V"], errors="coerce")
-
-    # data a partir de D2C (YYYYQQ)
-    informalidade["date"] = sidra_quarter_code_to_date(informalidade["D2C"])
-
-    # colunas-alvo
-    informalidade = informalidade.rename(columns={
-        "V": "informalidade",
-    })[["date", "informalidade"]]
-
-    return informalidade
-informalidade_long = tidy_sidra_informalidade(infor)
-informalidade_long
-
-#Pessoas desalentadas
-
-desalent = sidra.get_table(
-    table_code= 6813,
-    territorial_level='1',
-    ibge_territorial_code='1',
-    variable='9869',
-    period='all',
-    classifications='',
-    header='n'
-)
-desalent
-
-def tidy_sidra_desalent(df: pd.DataFrame) -> pd.DataFrame:
-
-    desalentadas = desalent.copy()
-
-    # valor numérico (SIDRA às vezes vem como string)
-    desalentadas["V"] = pd.to_numeric(desalentadas["V"], errors="coerce")
-    # data a partir de D2C (YYYYQQ)
-    desalentadas["date"] = sidra_quarter_code_to_date(desalentadas["D2C"])
-
-    # colunas-alvo
-    desalentadas = desalentadas.rename(columns={
-        "V": "desalentadas",
-    })[["date", "desalentadas"]]
-
-    return desalentadas
-
-desalentadas_long = tidy_sidra_desalent(desalent)
-desalentadas_long
+#####################################################################################
+# Datasets e CLI
+
+@dataclass(frozen=True)
+class Dataset:
+    filename: str
+    keys: list[str]                                   # chaves (e ordem) das linhas
+    requests: Callable[[bool], dict]                  # incremental -> {nome: FetchRequest}
+    tidy: Callable[[dict], pd.DataFrame]              # {nome: bruto} -> dataset tratado
+    series: str | None = None                         # coluna de série/grupo (datasets long)
+    by_uf: bool = False                               # UFs no store, particionadas por UF
+    checks: Checks = Checks()                         # validação antes de publicar (validate.py)
+    vintages: bool = False                            # série revisada: guarda as safras (vintage.py)
+
+
+# faixas plausíveis dos valores (validate.py); padrões de coluna no estilo fnmatch
+PCT = (0.0, 100.0)
+INF = float("inf")
+PNAD_RANGES = {"taxa_*": PCT, "informalidade": PCT, "desalentadas": PCT, "renda_media": (0.0, 1e6)}
+
+DATASETS: dict[str, Dataset] = {
+    "selic": Dataset(
+        "selic_mensal.parquet", ["date"], selic_requests, tidy_selic,
+        checks=Checks("monthly", {"selic": PCT}),
+    ),
+    "sgs": Dataset(
+        "sgs_dados.parquet", ["date"], sgs_requests, tidy_sgs,
+        checks=Checks("monthly", {
+            "ipca": (-5.0, 10.0), "ipca_12m": (-10.0, 100.0), "ibc_br": (0.0, 1e3), "credito_*": (0.0, INF),
+            "inadimplencia_*": PCT, "taxa_juros_*": (0.0, 1e3),
+        }),
+    ),
+    "sgs-diario": Dataset(
+        "sgs_diario.parquet", ["date"], sgs_diario_requests, tidy_sgs_diario,
+        checks=Checks(None, {"selic": PCT, "selic_meta": PCT, "cdi": PCT, "ptax_venda": (0.0, INF)}),
+    ),
+    "pib": Dataset(
+        "pibs_quarterly.parquet", ["setor", "date"],
+        lambda inc: sidra_requests("pibs_quarterly", inc), tidy_sidra_long("pibs_quarterly"), series="setor",
+        checks=Checks("quarterly", {"value": (-50.0, 50.0)}), vintages=True,
+    ),
+    "ipca-grupos": Dataset(
+        "ipca_grupos.parquet", ["codigo", "indicador", "date"], _ipca_grupos_requests, _tidy_ipca_grupos,
+        series="grupo",
+        checks=Checks("monthly", {"value": (-100.0, 100.0)}),
+    ),
+    "ipp": Dataset(
+        "ipp_m.parquet", ["setor_ipp", "date"],
+        lambda inc: sidra_requests("ipp_m", inc), tidy_sidra_long("ipp_m"), series="setor_ipp",
+        checks=Checks("monthly", {"value": (-100.0, 300.0)}),
+    ),
+    "indust-comer-serv": Dataset(
+        "indust_comer_serv.parquet", ["date"],
+        lambda inc: sidra_requests("indust_comer_serv", inc), tidy_sidra_wide("indust_comer_serv"),
+        checks=Checks("monthly", {"*_12m": (-100.0, 100.0)}), vintages=True,
+    ),
+    "socioeconomico": Dataset(
+        "socioeconomico_quarterly.parquet", ["date"],
+        lambda inc: sidra_requests("socioeconomico_quarterly", inc), tidy_sidra_wide("socioeconomico_quarterly"),
+        checks=Checks("quarterly", PNAD_RANGES),
+    ),
+    "regional-mensal": Dataset(
+        "regional_mensal.parquet", REGIONAL_KEYS,
+        lambda inc: sidra_requests("regional_mensal", inc), tidy_sidra_regional("regional_mensal"), by_uf=True,
+        checks=Checks("monthly", {"*_12m": (-100.0, 200.0)}), vintages=True,
+    ),
+    "regional-trimestral": Dataset(
+        "regional_trimestral.parquet", REGIONAL_KEYS,
+        lambda inc: sidra_requests("regional_trimestral", inc), tidy_sidra_regional("regional_trimestral"),
+        by_uf=True, checks=Checks("quarterly", PNAD_RANGES),
+    ),
+}
 
-#juntando os dados sócioeconômicos
 
-dfs = [
-    desemprego_long,
-    ocupacao_long,
-    renda_media_long,
-    informalidade_long,
-    desalentadas_long,
-]
+def schema_current(ds: Dataset) -> bool:
+    """
+    O parquet publicado tem as chaves atuais do dataset. Se não tem (o formato
+    mudou, ex.: ipca_grupos antes de codigo/nivel/pai), o modo incremental não
+    consegue mesclar e o dataset é reconstruído por inteiro.
+    """
+    path = OUT_DIR / ds.filename
+    if not path.exists():
+        return True
+    names = pq.read_schema(path).names
+    return all(k in names for k in ds.keys)
 
-socioeco_wide = reduce(
-    lambda left, right: pd.merge(left, right, on="date", how="outer"),
-    dfs
-).sort_values("date").reset_index(drop=True)
 
-socioeco_wide.dropna(inplace=True)
-socioeco_wide.head()
+def validate_dataset(name: str, df: pd.DataFrame, incremental: bool = False) -> pd.DataFrame:
+    """Tabela que será publicada (mesclada, no modo incremental), já validada."""
+    ds = DATASETS[name]
+    if incremental:
+        df = merge_published(df, ds.filename, ds.keys, ds.by_uf)
+    return check(df, name, ds.keys, ds.checks, previous_build(ds.filename, ds.by_uf))
 
-#Exportando os dados processados
 
-BASE_DIR = Path(__file__).resolve().parents[1]  # raiz do projeto
-out_dir = BASE_DIR / "data" / "processed"
+def build_graph(names: list[str], incremental: bool = False, partitioned: bool = False) -> dict[str, Node]:
+    """
+    Grafo do pipeline: fetch:<requisição> -> tidy:<dataset> -> validate:<dataset> -> write:<dataset>.
+    O nó tidy também faz a junção das séries do dataset (quando há mais de uma);
+    o nó validate bloqueia a gravação de um dataset reprovado (os demais seguem).
+    Todos os nós são instrumentados (instrument.py); só medem durante um build.
+    """
+    nodes: dict[str, Node] = {}
+    for name in names:
+        ds = DATASETS[name]
+        inc = incremental and schema_current(ds)
+        reqs = ds.requests(inc)
+
+        for req_name, req in reqs.items():
+            nodes[f"fetch:{req_name}"] = Node(
+                f"fetch:{req_name}",
+                instrument.wrap(f"fetch:{req_name}", "fetch", name, lambda _, req=req: fetch_one(req)),
+                always=True,
+            )
+
+        nodes[f"tidy:{name}"] = Node(
+            f"tidy:{name}",
+            instrument.wrap(
+                f"tidy:{name}", "tidy", name,
+                lambda inputs, ds=ds: ds.tidy({k.removeprefix("fetch:"): v for k, v in inputs.items()}),
+            ),
+            deps=tuple(f"fetch:{r}" for r in reqs),
+        )
+        nodes[f"validate:{name}"] = Node(
+            f"validate:{name}",
+            instrument.wrap(
+                f"validate:{name}", "validate", name,
+                lambda inputs, name=name, inc=inc: validate_dataset(name, inputs[f"tidy:{name}"], inc),
+            ),
+            deps=(f"tidy:{name}",),
+        )
+        nodes[f"write:{name}"] = Node(
+            f"write:{name}",
+            instrument.wrap(
+                f"write:{name}", "write", name,
+                lambda inputs, ds=ds, name=name: save_parquet(
+                    inputs[f"validate:{name}"], ds.filename, partitioned, ds.series, ds.by_uf,
+                    ds.keys if ds.vintages else None,
+                ),
+            ),
+            deps=(f"validate:{name}",),
+            fresh=lambda ds=ds: (OUT_DIR / ds.filename).exists() and schema_current(ds),
+        )
+    return nodes
 
-out_dir.mkdir(parents=True, exist_ok=True)
 
-socioeco_wide.to_parquet(out_dir / "socioeconomico_quarterly.parquet", index=False)
+def build(
+    names: list[str],
+    incremental: bool = False,
+    force: bool = False,
+    partitioned: bool = False,
+    errors: dict[str, BaseException] | None = None,
+    trace_memory: bool = False,
+) -> dict[str, str]:
+    """
+    Constrói os datasets pedidos. Todas as requisições são feitas em paralelo;
+    tratamento e gravação só rodam para os datasets cujas entradas mudaram
+    desde a última execução (a menos que force=True).
+
+    Retorna {dataset: "run" | "skip" | "blocked"}; blocked = alguma etapa do
+    dataset falhou (a exceção vai para `errors`, por nó) e nada foi publicado.
+    O tempo, as linhas, os bytes e o pico de memória de cada etapa vão para
+    data/processed/build_report.json (instrument.py).
+    """
+    if "all" in names:
+        names = list(DATASETS)
+
+    nodes = build_graph(names, incremental, partitioned)
+    instrument.start(trace_memory)
+    t0 = time.perf_counter()
+    try:
+        status = run(nodes, [f"write:{name}" for name in names], STATE_PATH, force=force, errors=errors)
+    finally:
+        records = instrument.stop()
+    instrument.write_report(instrument.report(records, status, time.perf_counter() - t0), OUT_DIR)
+    return {name: status[f"write:{name}"] for name in names}
+
+
+def show_vintages(name: str, as_of: str | None = None, top: int = 20) -> None:
+    stem = Path(DATASETS[name].filename).stem
+    if not vintage.exists(stem):
+        sys.exit(f"{name}: nenhuma safra gravada ainda (rode o build)")
+    if as_of:
+        print(vintage.as_of(stem, pd.Timestamp(as_of) + pd.Timedelta(days=1)).to_string(index=False))
+        return
+    rev = vintage.revisions(stem)
+    rev = rev[rev["revision"].abs() > vintage.REVISION_TOL]
+    print(f"{name}: {len(rev)} células revisadas")
+    if len(rev):
+        print(rev.loc[rev["revision"].abs().sort_values(ascending=False).index[:top]].to_string(index=False))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.makedataset", description="Pipeline dos dados do painel.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="constrói um ou mais datasets")
+    p_build.add_argument("datasets", nargs="+", choices=[*DATASETS, "all"])
+    p_build.add_argument("--incremental", action="store_true")
+    p_build.add_argument("--no-cache", action="store_true")
+    p_build.add_argument("--cache-only", action="store_true")
+    p_build.add_argument("--force", action="store_true")
+    p_build.add_argument("--partitioned", action="store_true")
+    p_build.add_argument("--trace-memory", action="store_true")
+
+    p_vint = sub.add_parser("vintages", help="revisões (1ª divulgação x atual) ou o dataset numa data passada")
+    p_vint.add_argument("dataset", choices=[n for n, ds in DATASETS.items() if ds.vintages])
+    p_vint.add_argument("--as-of", help="reconstrói o dataset como publicado nesta data (AAAA-MM-DD)")
+    p_vint.add_argument("--top", type=int, default=20, help="quantas revisões mostrar (maiores em módulo)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "vintages":
+        show_vintages(args.dataset, args.as_of, args.top)
+        return
+
+    cache.configure(
+        enabled=False if args.no_cache else None,
+        cache_only=True if args.cache_only else None,
+    )
 
+    errors: dict[str, BaseException] = {}
+    previous = instrument.read_report(OUT_DIR)
+    status = build(
+        args.datasets, incremental=args.incremental, force=args.force, partitioned=args.partitioned, errors=errors,
+        trace_memory=args.trace_memory,
+    )
+    labels = {"run": "atualizado", "skip": "sem mudanças", "blocked": "NÃO publicado", "failed": "NÃO publicado"}
+    for name, st in status.items():
+        print(f"{name}: {labels[st]} -> {OUT_DIR / DATASETS[name].filename}")
+    print()
+    print(instrument.format_table(instrument.read_report(OUT_DIR), previous))
+    for node, err in errors.items():
+        print(f"erro em {node}: {err}", file=sys.stderr)
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
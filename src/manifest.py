@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from .encoding import write_parquet
+
+# -----------------------
+# Manifesto dos datasets publicados
+# -----------------------
+# Cada parquet de data/processed é publicado de forma atômica (grava em arquivo
+# temporário e renomeia) e descrito em data/processed/manifest.json:
+# schema, número de linhas, datas mínima/máxima, última data válida e mediana
+# de |valor| de cada coluna, hash do conteúdo e horário da construção. As páginas podem validar
+# colunas e chavear seus caches pelo manifesto sem abrir o parquet.
+
+MANIFEST_NAME = "manifest.json"
+
+_lock = threading.Lock()
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _iso(d) -> str | None:
+    return None if d is None or pd.isna(d) else pd.Timestamp(d).strftime("%Y-%m-%d")
+
+
+def describe(df: pd.DataFrame) -> dict:
+    """Schema, linhas e cobertura de datas de um dataset."""
+    info = {
+        "rows": int(len(df)),
+        "schema": {c: str(t) for c, t in df.dtypes.items()},
+        "date_min": None,
+        "date_max": None,
+        "last_valid": {},
+        # mediana de |valor| por coluna numérica (referência de escala para a validação)
+        "median_abs": {
+            c: None if pd.isna(m) else float(m)
+            for c, m in df.select_dtypes("number").abs().median().items()
+        },
+    }
+    if "date" in df.columns and len(df):
+        dates = pd.to_datetime(df["date"], errors="coerce")
+        info["date_min"] = _iso(dates.min())
+        info["date_max"] = _iso(dates.max())
+        # última data com valor não nulo, por coluna
+        for c in df.columns:
+            if c == "date":
+                continue
+            info["last_valid"][c] = _iso(dates[df[c].notna().to_numpy()].max())
+    return info
+
+
+def read_manifest(out_dir: Path) -> dict:
+    path = out_dir / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _write_json_atomic(path: Path, data: dict) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def publish(df: pd.DataFrame, path: Path) -> dict:
+    """
+    Grava df em `path` de forma atômica e atualiza o manifesto do diretório.
+    Um leitor nunca vê um parquet pela metade: ou o arquivo anterior, ou o novo.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+    table = write_parquet(df, tmp)
+
+    entry = describe(df)
+    # tipos efetivamente gravados (date32, dictionary, float32...)
+    entry["schema"] = {f.name: str(f.type) for f in table.schema}
+    entry["file"] = path.name
+    entry["bytes"] = tmp.stat().st_size
+    entry["sha256"] = file_sha256(tmp)
+    entry["built_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    os.replace(tmp, path)
+
+    with _lock:
+        manifest = read_manifest(path.parent)
+        manifest[path.stem] = entry
+        _write_json_atomic(path.parent / MANIFEST_NAME, manifest)
+
+    return entry
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from . import instrument
+
+# -----------------------
+# Junção alinhada de N séries por data
+# -----------------------
+# Substitui reduce(pd.merge(..., how="outer")) por um único alinhamento:
+# cada série é indexada por data uma vez e todas são concatenadas lado a lado
+# (concat axis=1) sobre o índice de datas comum — sem um hash join e um frame
+# intermediário por série.
+
+JOINS = ("outer", "inner", "left")
+DROPNA = (None, "any", "all")
+
+
+def align_series(
+    frames: list[pd.DataFrame | pd.Series],
+    on: str = "date",
+    how: str = "outer",
+    dropna: str | None = "all",
+) -> pd.DataFrame:
+    """
+    Alinha N séries/dataframes pela coluna (ou índice) `on`.
+
+    how:    "outer" (união das datas), "inner" (datas comuns a todas),
+            "left" (datas da primeira série)
+    dropna: None (mantém tudo), "all" (remove datas sem nenhum valor),
+            "any" (só datas completas — comportamento antigo)
+
+    Retorna dataframe com `on` como primeira coluna, ordenado por data.
+    """
+    if how not in JOINS:
+        raise ValueError(f"how deve ser um de {JOINS}")
+    if dropna not in DROPNA:
+        raise ValueError(f"dropna deve ser um de {DROPNA}")
+    if not frames:
+        return pd.DataFrame(columns=[on])
+
+    with instrument.substage("merge", list(frames)) as st:
+        indexed = []
+        for f in frames:
+            if isinstance(f, pd.DataFrame) and on in f.columns:
+                f = f.set_index(on)
+            f = f.rename_axis(on)
+            # datas repetidas impediriam o alinhamento: fica a última observação
+            if not f.index.is_unique:
+                f = f[~f.index.duplicated(keep="last")]
+            indexed.append(f)
+
+        out = pd.concat(indexed, axis=1, join="inner" if how == "inner" else "outer", sort=True)
+        if how == "left":
+            out = out.reindex(indexed[0].index.sort_values())
+
+        if dropna is not None:
+            out = out.dropna(how=dropna)
+
+        out = out.reset_index()
+        if st is not None:
+            st.rows_out = len(out)
+    return out
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import io
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as pj
+
+from . import endpoints
+
+# -----------------------
+# Cliente nativo SIDRA / SGS: JSON -> Arrow
+# -----------------------
+# O sidrapy devolve um dataframe de strings (object) que cada tratamento
+# converte de novo. Aqui a resposta JSON (um array de objetos planos) é lida
+# pelo leitor de JSON do pyarrow, em C++, sem passar por objetos Python, e as
+# conversões são feitas pelos kernels do pyarrow, com as colunas já tipadas:
+#   V    -> float64, com os sinais especiais do IBGE tratados no decodificador
+#   D2C  -> int32 (código do período, AAAAMM / AAAATT)
+#   demais colunas (códigos e nomes de dimensões) -> dictionary (categorias)
+# As séries do SGS saem como date32 + float64.
+# Convertido para pandas (to_pandas), o resultado tem as mesmas colunas da
+# resposta do sidrapy/python-bcb e serve direto aos tratamentos (tidy.py).
+# Uso: CONJUNTURA_BACKEND=arrow (fetch.py).
+
+# sinais do IBGE no lugar do valor ("-" zero absoluto, ".." não se aplica,
+# "..." dado não disponível, "X" dado omitido) -> nulo, como o
+# pd.to_numeric(errors="coerce") dos tratamentos faz com a resposta do sidrapy
+
+PERIOD_COLUMN = "D2C"
+VALUE_COLUMN = "V"
+
+_NUMBER = r"^\s*-?\d+(\.\d*)?([eE][-+]?\d+)?\s*$"
+
+
+def _records_table(body: bytes) -> pa.Table:
+    """Array JSON de objetos planos -> tabela Arrow com uma coluna por campo."""
+    # o leitor do pyarrow lê objetos, não arrays: a resposta vira o campo de um
+    # objeto único (lido num bloco só) e a lista de structs, as colunas
+    doc = b'{"r":' + body + b"}"
+    try:
+        table = pj.read_json(
+            io.BytesIO(doc),
+            read_options=pj.ReadOptions(block_size=len(doc) + 1),
+            parse_options=pj.ParseOptions(newlines_in_values=True),
+        )
+    except pa.ArrowInvalid:
+        table = None
+    typ = None if table is None else table.schema.field("r").type
+    if typ is None or not pa.types.is_list(typ):
+        raise ValueError(f"Resposta inesperada: {body.strip()[:200]!r}")
+    if pa.types.is_null(typ.value_type):  # array vazio
+        return pa.table({})
+    if not pa.types.is_struct(typ.value_type):
+        raise ValueError(f"Resposta inesperada: {body.strip()[:200]!r}")
+    records = table.column("r").combine_chunks().flatten()
+    return pa.Table.from_arrays(records.flatten(), names=[f.name for f in records.type])
+
+
+def _as_string(col: pa.ChunkedArray) -> pa.ChunkedArray:
+    return col if pa.types.is_string(col.type) else col.cast(pa.string())
+
+
+def decode_values(col: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Coluna V (texto) -> float64: sinais do IBGE e demais textos não numéricos viram nulo."""
+    col = _as_string(col)
+    numeric = pc.match_substring_regex(col, _NUMBER)
+    return pc.cast(pc.if_else(numeric, col, pa.scalar(None, pa.string())), pa.float64())
+
+
+def decode_sidra(body: bytes) -> pa.Table:
+    """Resposta da API /values do SIDRA (header "n") -> tabela Arrow tipada."""
+    raw = _records_table(body)
+    cols = {}
+    for name in raw.column_names:
+        col = _as_string(raw.column(name))
+        if name == VALUE_COLUMN:
+            cols[name] = decode_values(col)
+        elif name == PERIOD_COLUMN:
+            ok = pc.match_substring_regex(col, r"^\d+$")
+            cols[name] = pc.cast(pc.if_else(ok, col, pa.scalar(None, pa.string())), pa.int32())
+        else:
+            cols[name] = col.dictionary_encode()
+    return pa.table(cols)
+
+
+def decode_sgs(body: bytes, name: str) -> pa.Table:
+    """Resposta JSON do SGS (data dd/mm/aaaa, valor texto) -> tabela date (date32), <name> (float64)."""
+    raw = _records_table(body)
+    if raw.num_rows == 0:
+        return pa.table({"date": pa.array([], pa.date32()), name: pa.array([], pa.float64())})
+    dates = pc.strptime(_as_string(raw.column("data")), format="%d/%m/%Y", unit="s")
+    return pa.table({"date": pc.cast(dates, pa.date32()), name: decode_values(raw.column("valor"))})
+
+
+def sidra_table(**params) -> pa.Table:
+    # o decodificador não guarda a linha de rótulos: pede sempre sem cabeçalho
+    return decode_sidra(endpoints.get_bytes(endpoints.SIDRA_URL, endpoints.sidra_path({**params, "header": "n"})))
+
+
+def sgs_tables(codes: dict[str, str], start=None, end=None) -> list[pa.Table]:
+    return [
+        decode_sgs(endpoints.get_bytes(endpoints.SGS_URL, endpoints.sgs_path(code, start, end)), name)
+        for name, code in codes.items()
+    ]
+
+
+def get_sidra(**params) -> pd.DataFrame:
+    """Como sidrapy.get_table(header="n"), mas com V numérico, D2C inteiro e dimensões categóricas."""
+    df = sidra_table(**params).to_pandas()
+    # categorias em ordem alfabética: ordenar pela coluna dá o mesmo resultado que com texto
+    for c in df.columns:
+        if isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].cat.reorder_categories(sorted(df[c].cat.categories))
+    return df
+
+
+def get_sgs(codes: dict[str, str], start=None, end=None, **_) -> pd.DataFrame:
+    """Como bcb.sgs.get: índice Date e uma coluna float por série."""
+    frames = []
+    for t in sgs_tables(codes, start, end):
+        df = t.to_pandas(date_as_object=False)
+        frames.append(df.set_index(pd.DatetimeIndex(df.pop("date"), name="Date").as_unit("ns")))
+    return frames[0] if len(frames) == 1 else pd.concat(frames, axis=1, join="outer").sort_index()
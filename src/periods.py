@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# -----------------------
+# Decodificação dos códigos de período do SIDRA (D2C)
+# -----------------------
+# Os códigos são inteiros YYYYPP. Em vez de fatiar strings, cada código distinto
+# é convertido uma única vez com aritmética inteira e a data é lida de uma
+# tabela pré-calculada com o último dia de cada mês entre MIN_YEAR e MAX_YEAR.
+#
+#   monthly         YYYYMM  (MM = 01..12)           -> fim do mês
+#   quarterly       YYYYQQ  (QQ = 01..04)           -> fim do trimestre
+#   moving_quarter  YYYYMM  (trimestre móvel PNAD,
+#                            MM = último mês)        -> fim do último mês
+
+MIN_YEAR = 1900
+MAX_YEAR = 2100
+
+_months = np.arange(np.datetime64(f"{MIN_YEAR}-01", "M"), np.datetime64(f"{MAX_YEAR + 1}-01", "M"))
+# _MONTH_END[(ano - MIN_YEAR) * 12 + (mês - 1)] = último dia do mês
+_MONTH_END = ((_months + 1).astype("datetime64[D]") - 1).astype("datetime64[ns]")
+
+# último mês de cada período, por tipo (índice = PP; -1 = inválido)
+_LAST_MONTH = {
+    "monthly": np.array([-1] + list(range(1, 13)) + [-1] * 87, dtype=np.int64),
+    "quarterly": np.array([-1, 3, 6, 9, 12] + [-1] * 95, dtype=np.int64),
+}
+_LAST_MONTH["moving_quarter"] = _LAST_MONTH["monthly"]
+
+FREQS = tuple(_LAST_MONTH)
+
+
+def _codes_to_int(values: np.ndarray) -> np.ndarray:
+    if values.dtype.kind in "iu":
+        return values.astype(np.int64, copy=False)
+    num = pd.to_numeric(pd.Series(values, copy=False), errors="coerce").to_numpy(dtype="float64")
+    return np.where(np.isfinite(num), num, -1).astype(np.int64)
+
+
+def period_end(codes: np.ndarray, freq: str) -> np.ndarray:
+    """
+    Converte códigos inteiros YYYYPP em datetime64[ns] (fim do período).
+    Códigos inválidos viram NaT.
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    year = codes // 100
+    pp = codes % 100
+
+    month = _LAST_MONTH[freq][pp]
+    idx = (year - MIN_YEAR) * 12 + (month - 1)
+    valid = (month > 0) & (year >= MIN_YEAR) & (year <= MAX_YEAR)
+
+    out = np.full(codes.shape, np.datetime64("NaT"), dtype="datetime64[ns]")
+    out[valid] = _MONTH_END[idx[valid]]
+    return out
+
+
+def sidra_period_to_date(s, freq: str) -> pd.Series:
+    """
+    Converte uma coluna D2C do SIDRA (str ou int) em datetime (fim do período).
+    Cada código distinto é convertido uma vez; o resultado é espalhado pelas linhas.
+    """
+    if freq not in _LAST_MONTH:
+        raise ValueError(f"Tipo de período desconhecido: {freq}")
+
+    index = s.index if isinstance(s, pd.Series) else None
+    inverse, uniques = pd.factorize(np.asarray(s), use_na_sentinel=True)
+
+    dates = period_end(_codes_to_int(np.asarray(uniques)), freq)
+    # sentinela -1 (código ausente) -> NaT
+    dates = np.append(dates, np.datetime64("NaT", "ns"))
+
+    return pd.Series(dates[inverse], index=index, name="date")
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from .registry import SidraSeries
+from .tidy import tidy_sidra
+
+# -----------------------
+# Recortes regionais (Brasil, grandes regiões e UFs)
+# -----------------------
+# As séries regionais do registro são pedidas em cada nível territorial
+# (requisições em paralelo) e tratadas juntas. O resultado tem uma linha por
+# (nivel, codigo, date) e uma coluna por série; é gravado em duas partes:
+#   - agregados (Brasil e regiões, como publicados pelo IBGE): parquet plano
+#     data/processed/<dataset>.parquet
+#   - UFs: data/processed/store/<dataset>_uf/uf=XX/, particionado por UF, para
+#     que as páginas leiam só o estado escolhido
+# Os agregados são os oficiais (taxas e variações não se somam entre UFs).
+
+NIVEIS = {"1": "Brasil", "2": "Região", "3": "UF"}
+
+REGIOES = {"1": "Norte", "2": "Nordeste", "3": "Sudeste", "4": "Sul", "5": "Centro-Oeste"}
+
+UF_SIGLAS = {
+    "11": "RO", "12": "AC", "13": "AM", "14": "RR", "15": "PA", "16": "AP", "17": "TO",
+    "21": "MA", "22": "PI", "23": "CE", "24": "RN", "25": "PB", "26": "PE", "27": "AL", "28": "SE", "29": "BA",
+    "31": "MG", "32": "ES", "33": "RJ", "35": "SP",
+    "41": "PR", "42": "SC", "43": "RS",
+    "50": "MS", "51": "MT", "52": "GO", "53": "DF",
+}
+
+KEYS = ["nivel", "codigo", "date"]
+
+
+def tidy_regional(raw: dict[str, pd.DataFrame], specs: list[SidraSeries], names: dict[str, list[str]]) -> pd.DataFrame:
+    """
+    raw:   {nome da requisição: bruto}
+    names: {spec.name: [nomes das requisições da série, um por nível]}
+
+    Retorna: date, nivel, codigo, nome, regiao, uf, <uma coluna por série>.
+    """
+    per_spec = {
+        spec.name: pd.concat([raw[n] for n in names[spec.name] if n in raw], ignore_index=True)
+        for spec in specs
+        if any(n in raw for n in names[spec.name])
+    }
+    long = tidy_sidra(per_spec, specs, territory=True)
+    columns = {s.name: s.column for s in specs}
+
+    wide = long.pivot_table(
+        index=["nivel", "territorio", "date"],
+        columns="serie",
+        values="value",
+        aggfunc="last",
+        observed=True,
+    )
+    wide.columns = [columns[c] for c in wide.columns.astype(str)]
+    wide = wide[[c for c in dict.fromkeys(columns.values()) if c in wide.columns]]
+    wide = wide.dropna(how="all").reset_index().rename(columns={"territorio": "codigo"})
+
+    # nome de cada território (um por código e nível)
+    nomes = long.drop_duplicates(["nivel", "territorio"]).set_index(["nivel", "territorio"])["territorio_nome"]
+    nome = nomes.reindex(pd.MultiIndex.from_arrays([wide["nivel"], wide["codigo"]])).to_numpy()
+
+    nivel = wide["nivel"].to_numpy()
+    codigo = wide["codigo"].to_numpy(dtype=object)
+    # região: o próprio código (nível 2) ou o primeiro dígito do código da UF (nível 3)
+    regiao_cod = np.where(nivel == "3", wide["codigo"].str[:1], np.where(nivel == "2", codigo, None))
+
+    out = pd.DataFrame({
+        "date": wide["date"],
+        "nivel": wide["nivel"].map(NIVEIS),
+        "codigo": codigo,
+        "nome": nome,
+        "regiao": pd.Series(regiao_cod).map(REGIOES),
+        "uf": pd.Series(np.where(nivel == "3", codigo, None)).map(UF_SIGLAS),
+    })
+    out = pd.concat([out, wide.drop(columns=["nivel", "codigo", "date"])], axis=1)
+    return out.sort_values(KEYS).reset_index(drop=True)
+
+
+def split_uf(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(agregados Brasil/regiões, UFs)."""
+    is_uf = (df["nivel"] == NIVEIS["3"]).to_numpy()
+    return df[~is_uf].reset_index(drop=True), df[is_uf].reset_index(drop=True)
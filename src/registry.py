@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+# -----------------------
+# Registro de séries SIDRA
+# -----------------------
+# Cada série é descrita uma única vez: de onde vem (tabela, variável,
+# classificação, níveis territoriais), o tipo de período (ver periods.py),
+# a coluna de saída e o dataset (parquet) onde é gravada.
+# Acrescentar uma série nova é só acrescentar uma entrada em SIDRA_SERIES.
+
+
+@dataclass(frozen=True)
+class SidraSeries:
+    name: str
+    dataset: str                # nome do parquet em data/processed (sem extensão)
+    table: int
+    variable: str
+    freq: str                   # "monthly" (YYYYMM) | "quarterly" (YYYYQQ) | "moving_quarter" (YYYYMM)
+    column: str                 # coluna de valor na saída
+    classifications: dict | str = field(default="")
+    dim: str | None = None      # nome da coluna para D4N (categoria); None = série única
+    period: str = "all"         # período padrão pedido ao SIDRA
+    levels: tuple[str, ...] = ("1",)  # níveis territoriais: "1" Brasil, "2" regiões, "3" UFs
+
+
+SIDRA_SERIES: dict[str, SidraSeries] = {
+    s.name: s
+    for s in [
+        # PIB por setores trimestral
+        SidraSeries(
+            name="pib_setores",
+            dataset="pibs_quarterly",
+            table=5932,
+            variable="6562",
+            freq="quarterly",
+            column="value",
+            classifications={"11255": "90687,90691,90707,90696,90704,93404,93405,93406"},
+            dim="setor",
+        ),
+        # Índice de preços ao produtor - IPP
+        SidraSeries(
+            name="ipp",
+            dataset="ipp_m",
+            table=6904,
+            variable="1394",
+            freq="monthly",
+            column="value",
+            classifications={"543": "33586,33583,33585,33584,33580,33579"},
+            dim="setor_ipp",
+        ),
+        # Indústria, comércio e serviços (variação em 12 meses)
+        SidraSeries(
+            name="pim_12m",
+            dataset="indust_comer_serv",
+            table=8888,
+            variable="11604",
+            freq="monthly",
+            column="pim_12m",
+            classifications={"544": "129314"},
+        ),
+        SidraSeries(
+            name="pms_12m",
+            dataset="indust_comer_serv",
+            table=5906,
+            variable="11626",
+            freq="monthly",
+            column="pms_12m",
+            classifications={"11046": "56726"},
+        ),
+        SidraSeries(
+            name="pmc_12m",
+            dataset="indust_comer_serv",
+            table=8880,
+            variable="11711",
+            freq="monthly",
+            column="pmc_12m",
+            classifications={"11046": "56734"},
+        ),
+        # Sócio econômicos (PNAD)
+        SidraSeries(
+            name="taxa_desemprego",
+            dataset="socioeconomico_quarterly",
+            table=4099,
+            variable="4099",
+            freq="quarterly",
+            column="taxa_desemprego",
+        ),
+        SidraSeries(
+            name="taxa_ocupacao",
+            dataset="socioeconomico_quarterly",
+            table=6466,
+            variable="4097",
+            freq="quarterly",
+            column="taxa_ocupacao",
+        ),
+        SidraSeries(
+            name="renda_media",
+            dataset="socioeconomico_quarterly",
+            table=5439,
+            variable="5932",
+            freq="quarterly",
+            column="renda_media",
+            classifications={"12029": "99383"},
+        ),
+        SidraSeries(
+            name="informalidade",
+            dataset="socioeconomico_quarterly",
+            table=8529,
+            variable="12466",
+            freq="quarterly",
+            column="informalidade",
+        ),
+        SidraSeries(
+            name="desalentadas",
+            dataset="socioeconomico_quarterly",
+            table=6813,
+            variable="9869",
+            freq="quarterly",
+            column="desalentadas",
+        ),
+        # Recortes regionais (Brasil, grandes regiões e UFs) — ver regional.py
+        # Nem toda tabela tem o nível 2: a PIM só publica o Nordeste, PMC e PMS nenhum.
+        SidraSeries(
+            name="pim_12m_uf",
+            dataset="regional_mensal",
+            table=8888,
+            variable="11604",
+            freq="monthly",
+            column="pim_12m",
+            classifications={"544": "129314"},
+            levels=("1", "2", "3"),
+        ),
+        SidraSeries(
+            name="pms_12m_uf",
+            dataset="regional_mensal",
+            table=5906,
+            variable="11626",
+            freq="monthly",
+            column="pms_12m",
+            classifications={"11046": "56726"},
+            levels=("1", "3"),
+        ),
+        SidraSeries(
+            name="pmc_12m_uf",
+            dataset="regional_mensal",
+            table=8880,
+            variable="11711",
+            freq="monthly",
+            column="pmc_12m",
+            classifications={"11046": "56734"},
+            levels=("1", "3"),
+        ),
+        SidraSeries(
+            name="taxa_desemprego_uf",
+            dataset="regional_trimestral",
+            table=4099,
+            variable="4099",
+            freq="quarterly",
+            column="taxa_desemprego",
+            levels=("1", "2", "3"),
+        ),
+        SidraSeries(
+            name="taxa_ocupacao_uf",
+            dataset="regional_trimestral",
+            table=6466,
+            variable="4097",
+            freq="quarterly",
+            column="taxa_ocupacao",
+            levels=("1", "2", "3"),
+        ),
+        SidraSeries(
+            name="renda_media_uf",
+            dataset="regional_trimestral",
+            table=5439,
+            variable="5932",
+            freq="quarterly",
+            column="renda_media",
+            classifications={"12029": "99383"},
+            levels=("1", "2", "3"),
+        ),
+    ]
+}
+
+
+def series_for(dataset: str) -> list[SidraSeries]:
+    return [s for s in SIDRA_SERIES.values() if s.dataset == dataset]
+
+
+def request_name(spec: SidraSeries, level: str) -> str:
+    """Nome da requisição: o da série (só Brasil) ou série + nível territorial."""
+    return spec.name if spec.levels == ("1",) else f"{spec.name}_n{level}"
+
+
+def request_params(spec: SidraSeries, period: str | None = None, level: str = "1") -> dict:
+    """Parâmetros de sidra.get_table para a série: Brasil (nível 1) ou todas as unidades do nível."""
+    return dict(
+        table_code=spec.table,
+        territorial_level=level,
+        ibge_territorial_code="1" if level == "1" else "all",
+        variable=spec.variable,
+        period=period or spec.period,
+        classifications=spec.classifications,
+    )
@@ -0,0 +1,313 @@
+"""
+Substituto local das APIs do SIDRA, do SGS e de metadados do IBGE, e benchmark
+do pipeline contra ele (sem depender da latência das APIs reais).
+
+Uso (a partir da raiz do projeto):
+    python -m src.standin record all                       # grava as respostas reais em data/fixtures
+    python -m src.standin serve --latency 0.2 --error-rate 0.05
+    python -m src.standin bench all --latency 0.1 --jitter 0.05 --repeat 3
+    python -m src.standin bench all --backend arrow        # cliente nativo (native.py)
+
+record roda o pipeline com CONJUNTURA_BACKEND=http e grava cada resposta
+(endpoints.py). serve reproduz as fixtures num servidor HTTP local, com
+latência e erros injetados. bench sobe o servidor e cronometra o pipeline
+inteiro e cada dataset, cada um num processo novo, sem cache e num diretório
+de dados temporário (nada em data/processed é tocado).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+BASE_DIR = Path(__file__).resolve().parents[1]  # raiz do projeto
+DATA_DIR = Path(os.environ.get("CONJUNTURA_DATA_DIR", BASE_DIR / "data"))
+FIXTURE_DIR = DATA_DIR / "fixtures"
+BENCH_PATH = DATA_DIR / "build" / "bench.json"
+
+HOST = "127.0.0.1"
+
+
+# -----------------------
+# Fixtures
+# -----------------------
+
+def _loose(path: str) -> str:
+    """
+    URL sem a data final do SGS: a última janela de uma série diária termina
+    "hoje", então a URL gravada não se repete em outro dia.
+    """
+    parts = urlsplit(path)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k != "dataFinal"]
+    return parts.path + (f"?{urlencode(query, safe='/')}" if query else "")
+
+
+def load_fixtures(fixture_dir: Path = FIXTURE_DIR) -> tuple[dict[str, bytes], dict[str, bytes]]:
+    """({url: corpo}, {url sem dataFinal: corpo})."""
+    exact: dict[str, bytes] = {}
+    loose: dict[str, bytes] = {}
+    for p in sorted(fixture_dir.glob("*.json")):
+        fx = json.loads(p.read_text(encoding="utf-8"))
+        body = fx["body"].encode("utf-8")
+        exact[fx["url"]] = body
+        loose[_loose(fx["url"])] = body
+    return exact, loose
+
+
+# -----------------------
+# Servidor
+# -----------------------
+
+@dataclass(frozen=True)
+class Faults:
+    latency: float = 0.0       # segundos por resposta
+    jitter: float = 0.0        # + uniforme em [0, jitter]
+    error_rate: float = 0.0    # fração das requisições respondidas com erro
+    error_status: int = 503
+    seed: int | None = None
+
+
+@dataclass
+class Stats:
+    requests: int = 0
+    hits: int = 0
+    misses: list[str] = field(default_factory=list)
+    errors: int = 0
+
+
+class StandIn:
+    """Servidor HTTP local que responde com as fixtures gravadas (em uma thread)."""
+
+    def __init__(self, fixture_dir: Path = FIXTURE_DIR, faults: Faults = Faults(), port: int = 0):
+        self.exact, self.loose = load_fixtures(fixture_dir)
+        self.faults = faults
+        self.stats = Stats()
+        self._rng = random.Random(faults.seed)
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((HOST, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{HOST}:{self.server.server_address[1]}"
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                standin.respond(self)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def respond(self, h: BaseHTTPRequestHandler) -> None:
+        f = self.faults
+        with self._lock:
+            self.stats.requests += 1
+            delay = f.latency + self._rng.uniform(0, f.jitter)
+            fail = self._rng.random() < f.error_rate
+        time.sleep(delay)
+
+        if fail:
+            with self._lock:
+                self.stats.errors += 1
+            self._send(h, f.error_status, b"erro injetado pelo servidor substituto")
+            return
+
+        body = self.exact.get(h.path) or self.loose.get(_loose(h.path))
+        with self._lock:
+            if body is None:
+                self.stats.misses.append(h.path)
+            else:
+                self.stats.hits += 1
+        if body is None:
+            self._send(h, 404, f"sem fixture para {h.path}".encode("utf-8"))
+        else:
+            self._send(h, 200, body, "application/json")
+
+    @staticmethod
+    def _send(h: BaseHTTPRequestHandler, status: int, body: bytes, ctype: str = "text/plain; charset=utf-8") -> None:
+        h.send_response(status)
+        h.send_header("Content-Type", ctype)
+        h.send_header("Content-Length", str(len(body)))
+        h.end_headers()
+        h.wfile.write(body)
+
+    def start(self) -> "StandIn":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "StandIn":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+# -----------------------
+# Execução do pipeline (processo separado)
+# -----------------------
+
+def run_build(datasets: list[str], env: dict[str, str]) -> tuple[float, int, str]:
+    """Roda `makedataset build` num processo novo; devolve (segundos, código de saída, stderr)."""
+    cmd = [sys.executable, "-m", "src.makedataset", "build", *datasets, "--force"]
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=BASE_DIR, env={**os.environ, **env}, capture_output=True, text=True)
+    return time.perf_counter() - t0, proc.returncode, proc.stderr
+
+
+def _isolated_env(data_dir: str, backend: str = "http", **extra: str) -> dict[str, str]:
+    return {"CONJUNTURA_DATA_DIR": data_dir, "CONJUNTURA_CACHE": "0", "CONJUNTURA_BACKEND": backend, **extra}
+
+
+def record(datasets: list[str], fixture_dir: Path = FIXTURE_DIR) -> int:
+    """Roda o pipeline contra as APIs reais gravando as respostas em fixture_dir."""
+    with tempfile.TemporaryDirectory() as tmp:
+        secs, code, err = run_build(datasets, _isolated_env(tmp, CONJUNTURA_RECORD_DIR=str(fixture_dir)))
+    n = len(list(fixture_dir.glob("*.json"))) if fixture_dir.exists() else 0
+    print(f"{n} fixtures em {fixture_dir} ({secs:.1f}s)")
+    if code:
+        print(err, file=sys.stderr)
+    return code
+
+
+def startup_time() -> float:
+    """Tempo de subir o interpretador e importar o pipeline (descontável dos tempos do benchmark)."""
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import src.makedataset"], cwd=BASE_DIR, check=True)
+    return time.perf_counter() - t0
+
+
+def bench(
+    datasets: list[str],
+    faults: Faults = Faults(),
+    repeat: int = 3,
+    fixture_dir: Path = FIXTURE_DIR,
+    out: Path = BENCH_PATH,
+    backend: str = "http",
+) -> dict:
+    """
+    Cronometra o pipeline completo ("all" = todos os pedidos juntos) e cada
+    dataset isolado, `repeat` vezes, contra o servidor substituto.
+    backend: "http" (dataframes no formato do sidrapy) ou "arrow" (native.py).
+    """
+    from .makedataset import DATASETS
+
+    names = list(DATASETS) if "all" in datasets else datasets
+    runs: dict[str, list[float]] = {"pipeline": [], **{n: [] for n in names}}
+    failures: dict[str, str] = {}
+
+    with StandIn(fixture_dir, faults) as standin:
+        base = startup_time()
+        for _ in range(repeat):
+            for target, args in [("pipeline", names), *((n, [n]) for n in names)]:
+                with tempfile.TemporaryDirectory() as tmp:
+                    secs, code, err = run_build(args, _isolated_env(tmp, backend, CONJUNTURA_API_URL=standin.url))
+                runs[target].append(secs)
+                if code:
+                    failures[target] = err.strip().splitlines()[-1] if err.strip() else f"saída {code}"
+        stats = standin.stats
+
+    report = {
+        "when": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "backend": backend,
+        "faults": asdict(faults),
+        "repeat": repeat,
+        "startup_s": round(base, 3),
+        "results": {
+            t: {"min_s": round(min(v), 3), "median_s": round(statistics.median(v), 3), "max_s": round(max(v), 3)}
+            for t, v in runs.items()
+        },
+        "server": {"requests": stats.requests, "hits": stats.hits, "errors": stats.errors,
+                   "misses": sorted(set(stats.misses))},
+        "failures": failures,
+    }
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    return report
+
+
+def print_report(report: dict) -> None:
+    print(f"{'alvo':<24}{'mín (s)':>10}{'mediana (s)':>13}{'máx (s)':>10}")
+    for target, r in report["results"].items():
+        flag = "  FALHOU" if target in report["failures"] else ""
+        print(f"{target:<24}{r['min_s']:>10.2f}{r['median_s']:>13.2f}{r['max_s']:>10.2f}{flag}")
+    s = report["server"]
+    print(f"(inclui {report['startup_s']:.2f}s de inicialização por processo; "
+          f"servidor: {s['requests']} requisições, {s['errors']} erros injetados, {len(s['misses'])} sem fixture)")
+    for url in s["misses"][:10]:
+        print(f"  sem fixture: {url}", file=sys.stderr)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.standin", description="Substituto local das APIs e benchmark.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_faults(p: argparse.ArgumentParser) -> None:
+        p.add_argument("--latency", type=float, default=0.0, help="segundos por resposta")
+        p.add_argument("--jitter", type=float, default=0.0, help="latência extra uniforme em [0, jitter]")
+        p.add_argument("--error-rate", type=float, default=0.0, help="fração de respostas com erro")
+        p.add_argument("--error-status", type=int, default=503)
+        p.add_argument("--seed", type=int, default=None)
+
+    p_rec = sub.add_parser("record", help="grava as respostas das APIs reais")
+    p_rec.add_argument("datasets", nargs="+")
+    p_rec.add_argument("--fixtures", type=Path, default=FIXTURE_DIR)
+
+    p_serve = sub.add_parser("serve", help="serve as fixtures gravadas")
+    p_serve.add_argument("--port", type=int, default=8765)
+    p_serve.add_argument("--fixtures", type=Path, default=FIXTURE_DIR)
+    add_faults(p_serve)
+
+    p_bench = sub.add_parser("bench", help="cronometra o pipeline contra o servidor substituto")
+    p_bench.add_argument("datasets", nargs="+")
+    p_bench.add_argument("--repeat", type=int, default=3)
+    p_bench.add_argument("--fixtures", type=Path, default=FIXTURE_DIR)
+    p_bench.add_argument("--out", type=Path, default=BENCH_PATH)
+    p_bench.add_argument("--backend", choices=["http", "arrow"], default="http")
+    add_faults(p_bench)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        sys.exit(record(args.datasets, args.fixtures))
+
+    faults = Faults(args.latency, args.jitter, args.error_rate, args.error_status, args.seed)
+    if args.command == "serve":
+        standin = StandIn(args.fixtures, faults, args.port)
+        print(f"{len(standin.exact)} fixtures em {standin.url} (CONJUNTURA_BACKEND=http CONJUNTURA_API_URL={standin.url})")
+        try:
+            standin.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            standin.server.server_close()
+        return
+
+    report = bench(args.datasets, faults, args.repeat, args.fixtures, args.out, args.backend)
+    print_report(report)
+    print(f"relatório: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from .encoding import COMPRESSION, COMPRESSION_LEVEL, ROW_GROUP_SIZE, to_arrow
+
+# -----------------------
+# Armazenamento particionado (layout Hive)
+# -----------------------
+# Layout opcional ao lado dos parquets planos:
+#   data/processed/store/<dataset>/year=YYYY/part-0.parquet
+# ou particionado por outra coluna (ex.: UF nos recortes regionais):
+#   data/processed/store/<dataset>/uf=SP/part-0.parquet
+# Os tipos são os mesmos dos parquets planos (src/encoding.py): a coluna de
+# série/grupo vai com dictionary encoding, date como date32, zstd.
+# A leitura usa pyarrow.dataset com pushdown de filtros (datas, séries) e de
+# colunas: só as partições, row groups e colunas necessários saem do disco.
+
+BASE_DIR = Path(__file__).resolve().parents[1]  # raiz do projeto
+STORE_DIR = Path(os.environ.get("CONJUNTURA_DATA_DIR", BASE_DIR / "data")) / "processed" / "store"
+
+# tipos das colunas de partição (as demais são texto)
+PARTITION_TYPES = {"year": pa.int16()}
+
+_lock = threading.Lock()
+
+
+def dataset_path(name: str, store_dir: Path = STORE_DIR) -> Path:
+    return store_dir / name
+
+
+def exists(name: str, store_dir: Path = STORE_DIR) -> bool:
+    return dataset_path(name, store_dir).is_dir()
+
+
+def count(name: str, store_dir: Path = STORE_DIR) -> int:
+    """Número de linhas (lido dos metadados dos arquivos, sem carregar os dados)."""
+    return ds.dataset(dataset_path(name, store_dir), format="parquet", partitioning="hive").count_rows()
+
+
+def columns(name: str, store_dir: Path = STORE_DIR) -> list[str]:
+    """Colunas do dataset (esquema dos arquivos, sem as colunas de partição por ano)."""
+    schema = ds.dataset(dataset_path(name, store_dir), format="parquet", partitioning="hive").schema
+    return [c for c in schema.names if c != "year"]
+
+
+def last_date(name: str, store_dir: Path = STORE_DIR) -> pd.Timestamp | None:
+    """Data mais recente do dataset (só a coluna date é lida)."""
+    dataset = ds.dataset(dataset_path(name, store_dir), format="parquet", partitioning="hive")
+    last = pc.max(dataset.to_table(columns=["date"]).column("date")).as_py()
+    return None if last is None else pd.Timestamp(last)
+
+
+def write_partitioned(
+    df: pd.DataFrame,
+    name: str,
+    series_col: str | None = None,
+    store_dir: Path = STORE_DIR,
+    partition_by: tuple[str, ...] = ("year",),
+) -> Path:
+    """
+    Grava o dataset particionado por `partition_by` (padrão: ano). A nova versão
+    é escrita num diretório temporário e trocada pela anterior com rename
+    (leitores não veem meio termo).
+    """
+    out = df.copy()
+    if "year" in partition_by:
+        out["year"] = pd.to_datetime(out["date"]).dt.year.astype("int16")
+    if series_col is not None:
+        out[series_col] = out[series_col].astype("category")
+
+    table = to_arrow(out)
+    # colunas de partição vão para o nome do diretório: tipo simples, sem dictionary
+    fields = []
+    for col in partition_by:
+        typ = PARTITION_TYPES.get(col, pa.string())
+        i = table.column_names.index(col)
+        table = table.set_column(i, col, table.column(col).cast(typ))
+        fields.append((col, typ))
+    partitioning = ds.partitioning(pa.schema(fields), flavor="hive")
+    write_options = ds.ParquetFileFormat().make_write_options(
+        compression=COMPRESSION, compression_level=COMPRESSION_LEVEL
+    )
+
+    target = dataset_path(name, store_dir)
+    tmp = target.with_name(f".{name}.tmp")
+    old = target.with_name(f".{name}.old")
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    ds.write_dataset(
+        table,
+        tmp,
+        format="parquet",
+        partitioning=partitioning,
+        basename_template="part-{i}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        file_options=write_options,
+        max_rows_per_group=ROW_GROUP_SIZE,
+    )
+
+    with _lock:
+        shutil.rmtree(old, ignore_errors=True)
+        if target.exists():
+            os.replace(target, old)
+        os.replace(tmp, target)
+        shutil.rmtree(old, ignore_errors=True)
+
+    return target
+
+
+def read(
+    name: str,
+    columns: list[str] | None = None,
+    start=None,
+    end=None,
+    where: dict[str, list] | None = None,
+    store_dir: Path = STORE_DIR,
+) -> pd.DataFrame:
+    """
+    Lê o dataset particionado aplicando pushdown:
+      columns     -> só as colunas pedidas (date sempre incluída)
+      start / end -> intervalo de datas (poda partições por ano e row groups por date)
+      where       -> {coluna: [valores]} (ex.: {"grupo": ["Transportes"]}, {"uf": ["SP"]});
+                     em coluna de partição, só os diretórios escolhidos são lidos
+    """
+    dataset = ds.dataset(dataset_path(name, store_dir), format="parquet", partitioning="hive")
+    partitioned_by_year = "year" in dataset.schema.names
+
+    expr = None
+
+    def _and(e):
+        nonlocal expr
+        expr = e if expr is None else expr & e
+
+    if start is not None:
+        start = pd.Timestamp(start)
+        if partitioned_by_year:
+            _and(ds.field("year") >= start.year)
+        _and(ds.field("date") >= start.date())
+    if end is not None:
+        end = pd.Timestamp(end)
+        if partitioned_by_year:
+            _and(ds.field("year") <= end.year)
+        _and(ds.field("date") <= end.date())
+    for col, values in (where or {}).items():
+        _and(ds.field(col).isin(list(values)))
+
+    if columns is not None:
+        columns = ["date"] + [c for c in columns if c != "date"]
+    else:
+        columns = [c for c in dataset.schema.names if c != "year"]
+
+    table = dataset.to_table(columns=columns, filter=expr)
+    df = table.to_pandas(date_as_object=False)
+    # date32 sai como datetime64[ms]: mesma resolução dos parquets planos (encoding.read_parquet)
+    df["date"] = df["date"].astype("datetime64[ns]")
+    return df.sort_values("date", kind="stable").reset_index(drop=True)
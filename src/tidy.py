@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from .merge import align_series
+from .periods import FREQS, sidra_period_to_date
+from .registry import SidraSeries
+
+# -----------------------
+# Motor genérico de tratamento SIDRA
+# -----------------------
+# Recebe os dataframes brutos (header='n') de qualquer número de séries do
+# registro e trata todos em uma única passada vetorizada:
+#   D2C -> date (fim do mês / fim do trimestre), V -> value numérico, D4N -> dim.
+# O resultado é uma tabela long (serie, date, dim, value) que depois é
+# remontada no formato de cada dataset (wide ou long).
+
+
+def tidy_sidra(
+    raw: dict[str, pd.DataFrame],
+    specs: list[SidraSeries],
+    territory: bool = False,
+) -> pd.DataFrame:
+    """
+    Trata de uma vez os dataframes brutos das séries em `specs`
+    (raw[spec.name] = resposta do sidra.get_table).
+
+    Retorna long com colunas: serie, date, dim, value.
+    Com territory=True inclui nivel (NC), territorio (D1C) e territorio_nome (D1N).
+    """
+    specs = [s for s in specs if s.name in raw]
+    terr_cols = ["nivel", "territorio", "territorio_nome"] if territory else []
+    if not specs:
+        return pd.DataFrame(columns=["serie", "date", "dim", "value", *terr_cols])
+
+    frames = [raw[s.name] for s in specs]
+    sizes = [len(f) for f in frames]
+
+    # só as colunas usadas, concatenadas uma vez
+    cols = ["D2C", "D4N", "V"] + (["NC", "D1C", "D1N"] if territory else [])
+    df = pd.concat([f.reindex(columns=cols) for f in frames], ignore_index=True)
+    serie = pd.Categorical(np.repeat([s.name for s in specs], sizes), categories=[s.name for s in specs])
+
+    out = pd.DataFrame({
+        "serie": serie,
+        "date": pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]"),
+        "dim": df["D4N"],
+        # valor numérico (SIDRA às vezes vem como string)
+        "value": pd.to_numeric(df["V"], errors="coerce"),
+    })
+    if territory:
+        out["nivel"] = df["NC"].astype(str)
+        out["territorio"] = df["D1C"].astype(str)
+        out["territorio_nome"] = df["D1N"]
+
+    # datas: uma decodificação por tipo de período, aplicada a todas as séries daquele tipo
+    freq = pd.Series(serie).map({s.name: s.freq for s in specs}).to_numpy()
+    for kind in FREQS:
+        mask = freq == kind
+        if mask.any():
+            out.loc[mask, "date"] = sidra_period_to_date(df.loc[mask, "D2C"], kind).to_numpy()
+
+    return out.dropna(subset=["date", "value"]).reset_index(drop=True)
+
+
+def sidra_to_wide(
+    long: pd.DataFrame,
+    specs: list[SidraSeries],
+    how: str = "outer",
+    dropna: str | None = "all",
+) -> pd.DataFrame:
+    """Uma coluna por série (spec.column), alinhadas por date (ver merge.align_series)."""
+    cols = {s.name: s.column for s in specs}
+    sub = long[long["serie"].isin(list(cols))]
+    series = {
+        name: g.set_index("date")["value"].rename(cols[name])
+        for name, g in sub.groupby("serie", observed=True, sort=False)
+    }
+    return align_series([series[s.name] for s in specs if s.name in series], how=how, dropna=dropna)
+
+
+def sidra_to_long(long: pd.DataFrame, spec: SidraSeries) -> pd.DataFrame:
+    """Série com categorias (spec.dim): colunas date, <dim>, <column>."""
+    out = long.loc[long["serie"] == spec.name, ["date", "dim", "value"]]
+    out = out.rename(columns={"dim": spec.dim, "value": spec.column})
+    out = out.dropna(subset=[spec.dim])
+    return out.sort_values([spec.dim, "date"]).reset_index(drop=True)
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import warnings
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+
+import numpy as np
+import pandas as pd
+
+from .periods import MIN_YEAR
+
+# -----------------------
+# Validação dos datasets antes da publicação
+# -----------------------
+# Roda entre o tratamento e a gravação, sobre a tabela completa que seria
+# publicada (já mesclada no modo incremental). Todas as colunas e séries são
+# verificadas de uma vez, com operações vetorizadas:
+#   - schema: colunas esperadas presentes, date como data, valores numéricos
+#   - unicidade das chaves (ex.: date, ou série + date), sem chaves nulas
+#   - datas dentro da faixa plausível (de MIN_YEAR até pouco depois de hoje)
+#   - periodicidade: saltos entre datas consecutivas de cada série
+#   - faixas de valores, infinitos e colunas inteiramente vazias
+#   - comparação com o build anterior (manifest.json): queda no número de
+#     linhas, coluna que "perdeu" as últimas datas, mudança de escala (unidade)
+# Qualquer falha levanta ValidationError e o dataset não é publicado.
+
+MAX_ROW_DROP = 0.02     # fração de linhas que pode sumir em relação ao build anterior
+MAX_UNIT_SHIFT = 100.0  # razão máxima entre as medianas de |valor| (novo / anterior)
+MAX_LEAD_DAYS = 92      # datas aceitas além de hoje (fim do trimestre corrente)
+
+
+class ValidationError(ValueError):
+    """Dataset reprovado na validação; nada foi publicado."""
+
+    def __init__(self, dataset: str, failures: list[str]):
+        self.dataset = dataset
+        self.failures = failures
+        super().__init__(f"{dataset}: " + "; ".join(failures))
+
+
+@dataclass(frozen=True)
+class Checks:
+    freq: str | None = None     # "monthly" | "quarterly": periodicidade de date em cada série
+    ranges: dict[str, tuple[float, float]] = field(default_factory=dict)  # padrão de coluna -> (mín, máx)
+    max_gap: int | None = 1     # maior distância (em períodos) entre datas consecutivas; None = não verifica
+    max_row_drop: float = MAX_ROW_DROP
+    max_unit_shift: float = MAX_UNIT_SHIFT
+    max_lead_days: int = MAX_LEAD_DAYS
+
+
+def _ordinal(dates: pd.Series, freq: str) -> np.ndarray:
+    """Número sequencial do período de cada data (mês ou trimestre)."""
+    d = pd.DatetimeIndex(dates)
+    if freq == "monthly":
+        return d.year.to_numpy() * 12 + d.month.to_numpy() - 1
+    if freq == "quarterly":
+        return d.year.to_numpy() * 4 + (d.month.to_numpy() - 1) // 3
+    raise ValueError(f"Frequência desconhecida: {freq}")
+
+
+def column_stats(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Estatísticas por coluna numérica, calculadas de uma vez sobre a matriz de valores."""
+    cols = [c for c in df.columns if c != "date" and pd.api.types.is_numeric_dtype(df[c])]
+    vals = df[cols].to_numpy(dtype="float64") if cols else np.empty((len(df), 0))
+    valid = np.isfinite(vals)
+    median_abs = np.full(len(cols), np.nan)
+    if len(df):
+        with np.errstate(all="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # coluna toda NaN
+            median_abs = np.nanmedian(np.where(valid, np.abs(vals), np.nan), axis=0)
+    return {"cols": np.array(cols, dtype=object), "vals": vals, "valid": valid, "median_abs": median_abs}
+
+
+def validate(
+    df: pd.DataFrame,
+    keys: list[str],
+    checks: Checks,
+    previous: dict | None = None,
+) -> list[str]:
+    """Lista de falhas (vazia = aprovado). previous: entrada do manifest do build anterior."""
+    failures: list[str] = []
+
+    # schema
+    missing = [k for k in keys if k not in df.columns]
+    if missing:
+        return [f"colunas ausentes: {missing}"]
+    if "date" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["date"]):
+        failures.append("coluna date não é data")
+    not_numeric = [
+        c for c in df.columns
+        if any(fnmatch(c, p) for p in checks.ranges) and not pd.api.types.is_numeric_dtype(df[c])
+    ]
+    if not_numeric:
+        failures.append(f"colunas de valor não numéricas: {not_numeric}")
+    if previous:
+        lost = sorted(set(previous.get("schema", {})) - set(df.columns))
+        if lost:
+            failures.append(f"colunas removidas em relação ao build anterior: {lost}")
+    if df.empty:
+        return failures + ["dataset vazio"]
+
+    # unicidade das chaves
+    dup = int(df.duplicated(keys).sum())
+    if dup:
+        failures.append(f"{dup} linhas com chaves repetidas {keys}")
+    nulls = df[keys].isna().sum()
+    for c, n in nulls[nulls > 0].items():
+        failures.append(f"{c}: {n} chaves nulas")
+
+    # datas fora da faixa plausível
+    if "date" in df.columns and pd.api.types.is_datetime64_any_dtype(df["date"]):
+        lo = pd.Timestamp(f"{MIN_YEAR}-01-01")
+        hi = pd.Timestamp.today().normalize() + pd.Timedelta(days=checks.max_lead_days)
+        out_of_range = (df["date"] < lo) | (df["date"] > hi)
+        n = int(out_of_range.sum())
+        if n:
+            bad = df.loc[out_of_range, "date"]
+            failures.append(
+                f"{n} datas fora da faixa [{lo:%Y-%m-%d}, {hi:%Y-%m-%d}] "
+                f"(de {bad.min():%Y-%m-%d} a {bad.max():%Y-%m-%d})"
+            )
+
+    # periodicidade / lacunas, por série (chaves exceto date)
+    if checks.freq and checks.max_gap is not None and "date" in df.columns:
+        series_keys = [k for k in keys if k != "date"]
+        if series_keys:
+            group = df.groupby(series_keys, observed=True, sort=False).ngroup().to_numpy()
+        else:
+            group = np.zeros(len(df), dtype=int)
+        ordinal = _ordinal(df["date"], checks.freq)
+        order = np.lexsort((ordinal, group))
+        g, o = group[order], ordinal[order]
+        step = np.diff(o)[g[1:] == g[:-1]]
+        gaps = int((step > checks.max_gap).sum())
+        if gaps:
+            failures.append(f"{gaps} lacunas na série (maior salto: {int(step.max())} períodos)")
+
+    # valores: infinitos, faixas, colunas vazias — todas as colunas de uma vez
+    stats = column_stats(df)
+    cols, vals, valid = stats["cols"], stats["vals"], stats["valid"]
+    if len(cols):
+        inf = np.isinf(vals).sum(axis=0)
+        for c, n in zip(cols[inf > 0], inf[inf > 0]):
+            failures.append(f"{c}: {n} valores infinitos")
+
+        empty = ~valid.any(axis=0)
+        for c in cols[empty]:
+            failures.append(f"{c}: coluna inteiramente vazia")
+
+        lo = np.full(len(cols), -np.inf)
+        hi = np.full(len(cols), np.inf)
+        for i, c in enumerate(cols):
+            for pattern, (a, b) in checks.ranges.items():
+                if fnmatch(c, pattern):
+                    lo[i], hi[i] = a, b
+        with np.errstate(invalid="ignore"):
+            out = (valid & ((vals < lo) | (vals > hi))).sum(axis=0)
+        for i in np.flatnonzero(out):
+            failures.append(f"{cols[i]}: {out[i]} valores fora da faixa [{lo[i]:g}, {hi[i]:g}]")
+
+    # comparação com o build anterior
+    if previous:
+        prev_rows = int(previous.get("rows", 0))
+        if prev_rows and len(df) < prev_rows * (1 - checks.max_row_drop):
+            failures.append(f"linhas caíram de {prev_rows} para {len(df)}")
+
+        if "date" in df.columns and len(cols):
+            # última data com valor de cada coluna (em dias), numa passada só
+            days = df["date"].to_numpy(dtype="datetime64[D]").astype("int64")
+            last = np.where(valid, days[:, None], np.iinfo(np.int64).min).max(axis=0)
+            for c, d in zip(cols, last):
+                before = (previous.get("last_valid") or {}).get(c)
+                if before and d < np.datetime64(before, "D").astype("int64"):
+                    now = "nenhuma" if d == np.iinfo(np.int64).min else str(np.datetime64(int(d), "D"))
+                    failures.append(f"{c}: última data válida recuou de {before} para {now}")
+
+        prev_median = previous.get("median_abs") or {}
+        for c, m in zip(cols, stats["median_abs"]):
+            p = prev_median.get(c)
+            if p and m and np.isfinite(m) and p > 0 and m > 0:
+                ratio = max(m / p, p / m)
+                if ratio > checks.max_unit_shift:
+                    failures.append(f"{c}: escala mudou {ratio:.0f}x (mediana |valor| {p:g} -> {m:g})")
+
+    return failures
+
+
+def check(df: pd.DataFrame, dataset: str, keys: list[str], checks: Checks, previous: dict | None = None) -> pd.DataFrame:
+    """Valida e devolve df; levanta ValidationError se houver falhas."""
+    failures = validate(df, keys, checks, previous)
+    if failures:
+        raise ValidationError(dataset, failures)
+    return df
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .encoding import FLOAT32_TOL
+
+# -----------------------
+# Vintages (safras) das séries revisadas
+# -----------------------
+# PIB e pesquisas mensais são revisados pelo IBGE; o parquet publicado guarda
+# só a versão mais recente. Aqui cada build acrescenta um arquivo com as
+# células (chaves + coluna + valor) que mudaram em relação à última safra:
+#   data/vintages/<dataset>/v-<AAAAMMDDTHHMMSS>.parquet
+# Nada é reescrito (append-only). Uma célula que some do dataset é registrada
+# com removed=True. Qualquer safra é reconstruída por as_of(data): para cada
+# célula, o último registro com vintage <= data.
+
+BASE_DIR = Path(__file__).resolve().parents[1]  # raiz do projeto
+VINTAGE_DIR = Path(os.environ.get("CONJUNTURA_DATA_DIR", BASE_DIR / "data")) / "vintages"
+
+META_COLS = ["value", "removed", "vintage"]
+
+# diferenças abaixo disto não são revisão: os parquets publicados guardam float32
+# (encoding.py) e, no modo incremental, linhas relidas do disco voltam com esse ruído
+REVISION_TOL = FLOAT32_TOL
+
+
+def _dir(name: str, vintage_dir: Path = VINTAGE_DIR) -> Path:
+    return vintage_dir / name
+
+
+def exists(name: str, vintage_dir: Path = VINTAGE_DIR) -> bool:
+    d = _dir(name, vintage_dir)
+    return d.is_dir() and any(d.glob("v-*.parquet"))
+
+
+def to_cells(df: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """Uma linha por célula numérica não nula: keys + column + value."""
+    value_cols = [c for c in df.columns if c not in keys and pd.api.types.is_numeric_dtype(df[c])]
+    vals = df[value_cols].to_numpy(dtype="float64")
+    row, col = np.nonzero(~np.isnan(vals))
+    out = df[keys].iloc[row].reset_index(drop=True)
+    for k in keys:
+        if k == "date":
+            out[k] = pd.to_datetime(out[k]).astype("datetime64[ns]")
+        elif isinstance(out[k].dtype, pd.CategoricalDtype):
+            out[k] = out[k].astype(object)
+    out["column"] = np.asarray(value_cols, dtype=object)[col]
+    out["value"] = vals[row, col]
+    return out
+
+
+def read_cells(name: str, as_of=None, vintage_dir: Path = VINTAGE_DIR) -> pd.DataFrame:
+    """Todos os registros (de todas as safras até `as_of`), em ordem de safra."""
+    dataset = ds.dataset(_dir(name, vintage_dir), format="parquet")
+    expr = None
+    if as_of is not None:
+        expr = ds.field("vintage") <= pa.scalar(pd.Timestamp(as_of).to_pydatetime(), pa.timestamp("s"))
+    cells = dataset.to_table(filter=expr).to_pandas()
+    if "date" in cells.columns:
+        cells["date"] = cells["date"].astype("datetime64[ns]")
+    return cells.sort_values("vintage", kind="stable").reset_index(drop=True)
+
+
+def _cell_id(cells: pd.DataFrame) -> list[str]:
+    """Chaves do dataset + column."""
+    return [c for c in cells.columns if c not in META_COLS]
+
+
+def latest(cells: pd.DataFrame) -> pd.DataFrame:
+    """Último registro de cada célula (cells em ordem de safra)."""
+    return cells.drop_duplicates(_cell_id(cells), keep="last")
+
+
+def record(name: str, df: pd.DataFrame, keys: list[str], vintage=None, vintage_dir: Path = VINTAGE_DIR) -> int:
+    """
+    Acrescenta uma safra com as células novas, alteradas ou removidas em relação
+    à última. Retorna o número de células gravadas (0 = nada mudou, nada gravado).
+    """
+    vintage = pd.Timestamp(vintage or datetime.now(timezone.utc)).tz_localize(None).floor("s")
+    new = to_cells(df, keys)
+    ids = keys + ["column"]
+
+    if exists(name, vintage_dir):
+        cur = latest(read_cells(name, vintage_dir=vintage_dir))
+        cur = cur[ids + ["value", "removed"]].rename(columns={"value": "value_cur", "removed": "removed_cur"})
+        m = new.merge(cur, on=ids, how="outer", indicator=True)
+        only_new = m["_merge"] == "left_only"
+        only_cur = (m["_merge"] == "right_only") & ~m["removed_cur"].astype("boolean").fillna(True)
+        both = m["_merge"] == "both"
+        changed = both & (((m["value"] - m["value_cur"]).abs() > REVISION_TOL) | m["removed_cur"].astype("boolean").fillna(False))
+        m["removed"] = only_cur
+        out = m.loc[only_new | changed | only_cur, ids + ["value", "removed"]]
+    else:
+        out = new.assign(removed=False)
+
+    if out.empty:
+        return 0
+
+    out = out.assign(vintage=vintage).reset_index(drop=True)
+    out["removed"] = out["removed"].astype(bool)
+    table = pa.Table.from_pandas(out, preserve_index=False)
+    table = table.set_column(
+        table.column_names.index("vintage"), "vintage", table.column("vintage").cast(pa.timestamp("s"))
+    )
+
+    d = _dir(name, vintage_dir)
+    d.mkdir(parents=True, exist_ok=True)
+    path = d / f"v-{vintage:%Y%m%dT%H%M%S}.parquet"
+    tmp = d / f".{path.name}.tmp"
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, path)
+    return len(out)
+
+
+def as_of(name: str, when=None, vintage_dir: Path = VINTAGE_DIR) -> pd.DataFrame:
+    """Dataset como estava publicado em `when` (None = última safra), no formato original."""
+    cells = latest(read_cells(name, as_of=when, vintage_dir=vintage_dir))
+    cells = cells[~cells["removed"]]
+    keys = [c for c in _cell_id(cells) if c != "column"]
+    wide = cells.pivot(index=keys, columns="column", values="value")
+    wide.columns.name = None
+    return wide.reset_index().sort_values(keys).reset_index(drop=True)
+
+
+def revisions(name: str, vintage_dir: Path = VINTAGE_DIR) -> pd.DataFrame:
+    """
+    Por célula: primeira divulgação x valor atual.
+    Colunas: chaves, column, first, first_vintage, current, current_vintage, n_vintages, revision.
+    """
+    cells = read_cells(name, vintage_dir=vintage_dir)
+    cells = cells[~cells["removed"]]
+    ids = _cell_id(cells)
+    g = cells.groupby(ids, sort=True, observed=True)
+    out = pd.DataFrame({
+        "first": g["value"].first(),
+        "first_vintage": g["vintage"].first(),
+        "current": g["value"].last(),
+        "current_vintage": g["vintage"].last(),
+        "n_vintages": g["value"].size(),
+    })
+    out["revision"] = out["current"] - out["first"]
+    return out.reset_index()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable
+
+from . import data_access
+from .ipca import INDICE_GERAL
+from .makedataset import DATASETS
+
+# -----------------------
+# Aquecimento do cache do painel
+# -----------------------
+# Na primeira visita a cada página, o visitante pagaria a leitura dos parquets,
+# a conversão das datas e as visões padrão (rótulos de trimestre, matrizes do
+# IPCA). start(), chamado pelo home.py, roda uma vez por processo do servidor,
+# numa thread em segundo plano, e passa tudo isso pelos mesmos carregadores das
+# páginas (src/data_access.py):
+#   - todos os datasets publicados
+#   - trimestrais: com o rótulo do trimestre (PIB e PNAD, com as séries padrão)
+#   - regionais: agregados + a UF padrão das páginas
+#   - IPCA: hierarquia, matrizes e contribuições do índice geral e de cada grupo
+# Uma página aberta durante o aquecimento não lê de novo: espera a carga em
+# andamento (carga única, data_access.single_flight).
+
+DEFAULT_UF = "SP"  # UF inicial dos recortes regionais nas páginas
+
+log = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_thread: threading.Thread | None = None
+_status: dict[str, float | str] = {}
+
+
+def tasks() -> list[tuple[str, Callable[[], object]]]:
+    """(nome, carga) de cada dataset publicado e de cada visão padrão das páginas."""
+    out: list[tuple[str, Callable[[], object]]] = []
+    for name, ds in DATASETS.items():
+        if not data_access.exists(name):
+            continue
+        if ds.by_uf:
+            if data_access.has_uf(name):
+                out.append((f"{name} [{DEFAULT_UF}]", lambda n=name: data_access.load_regional(n, DEFAULT_UF)))
+            else:
+                out.append((name, lambda n=name: data_access.load(n)))
+        elif ds.checks.freq == "quarterly":
+            out.append((name, lambda n=name: data_access.load_quarterly(n)))
+        else:
+            out.append((name, lambda n=name: data_access.load(n)))
+
+    if data_access.exists(data_access.IPCA_GRUPOS):
+        out.append(("ipca: contribuições", data_access.ipca_contribuicoes))
+        out.append(("ipca: grupos", _ipca_grupos))
+    return out
+
+
+def _ipca_grupos() -> None:
+    """Composição do índice geral (todos os grupos) e o detalhamento de cada grupo."""
+    hier, _, _ = data_access.ipca_contribuicoes()
+    grupos = data_access.ipca_composicao(INDICE_GERAL)
+    for codigo in grupos["codigo"].unique():
+        if (hier["pai"] == codigo).any():
+            data_access.ipca_composicao(codigo)
+
+
+def run() -> dict[str, float | str]:
+    """Executa as cargas em ordem; por item, segundos ou a mensagem de erro (uma falha não para as demais)."""
+    for label, load in tasks():
+        t0 = time.perf_counter()
+        try:
+            load()
+            _status[label] = round(time.perf_counter() - t0, 3)
+        except Exception as exc:
+            _status[label] = f"erro: {exc}"
+            log.warning("aquecimento de %s falhou: %s", label, exc)
+    return dict(_status)
+
+
+def status() -> dict[str, float | str]:
+    """Itens já aquecidos (segundos) ou com erro, desde o início do processo."""
+    return dict(_status)
+
+
+def start() -> threading.Thread:
+    """Inicia o aquecimento em segundo plano, uma vez por processo (chamadas seguintes não fazem nada)."""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=run, name="conjuntura-warmup", daemon=True)
+            _thread.start()
+        return _thread
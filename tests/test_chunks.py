@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+from src import fetch
+from src.chunks import date_windows, split_params, split_sgs_params
+
+
+def assert_tiles(windows, start, end, years=10):
+    """Janelas com fins inclusivos, em sequência, sem lacuna nem sobreposição, cobrindo start..end."""
+    ts = [(pd.Timestamp(a), pd.Timestamp(b)) for a, b in windows]
+    assert ts[0][0] == pd.Timestamp(start) and ts[-1][1] == pd.Timestamp(end)
+    for a, b in ts:
+        assert a <= b <= a + pd.DateOffset(years=years) - pd.Timedelta(days=1)
+    for (_, prev_end), (next_start, _) in zip(ts, ts[1:]):
+        assert next_start == prev_end + pd.Timedelta(days=1)
+
+
+@pytest.mark.parametrize("start, end, n", [
+    ("1986-06-04", "2025-10-17", 4),
+    ("2000-01-01", "2009-12-31", 1),   # exatamente 10 anos
+    ("2000-01-01", "2010-01-01", 2),   # um dia a mais
+    ("2000-02-29", "2024-02-29", 3),   # início em dia 29/02
+    ("2024-05-01", "2024-05-01", 1),
+])
+def test_date_windows_tile_the_range(start, end, n):
+    windows = date_windows(start, end)
+    assert len(windows) == n
+    assert_tiles(windows, start, end)
+
+
+def test_date_windows_boundaries():
+    assert date_windows("2000-01-01", "2010-01-01") == [("2000-01-01", "2009-12-31"), ("2010-01-01", "2010-01-01")]
+    assert date_windows("2025-01-02", "2025-01-01") == []
+
+
+def test_split_sgs_params():
+    params = {"codes": {"selic": "11"}, "start": "1986-06-04"}
+    parts = split_sgs_params(params, today="2025-10-17")
+    assert_tiles([(p["start"], p["end"]) for p in parts], "1986-06-04", "2025-10-17")
+    assert all(p["codes"] == params["codes"] for p in parts)
+    assert split_sgs_params({"codes": {"selic": "11"}, "start": "2020-01-01"}, today="2025-10-17") == [
+        {"codes": {"selic": "11"}, "start": "2020-01-01"}
+    ]
+
+
+def test_only_daily_requests_are_windowed():
+    daily = fetch.sgs_request({"cdi": "12"}, start="1986-03-06", end="2025-10-17", freq="daily")
+    monthly = fetch.sgs_request({"ipca": "433"}, start="1980-01-31", end="2025-10-17")
+    assert len(fetch.split_sgs(daily)) == 4
+    assert all(p.freq == "daily" for p in fetch.split_sgs(daily))
+    assert fetch.split_sgs(monthly) == [monthly]
+
+
+def months(start: int, n: int) -> list[str]:
+    return [str(p) for p in pd.period_range(f"{start // 100}-{start % 100:02d}", periods=n, freq="M").strftime("%Y%m")]
+
+
+def test_split_params_covers_every_period_once():
+    available = months(201201, 150)
+    params = {"table_code": "7060", "variable": "63", "classifications": {"315": "all"},
+              "territorial_level": "1", "ibge_territorial_code": "1", "period": "all"}
+    dims = {"variavel": 3, "315": 400}
+    parts = split_params(params, available, dims, limit=50_000)  # 400 valores por período -> 125 por faixa
+    assert [p["period"] for p in parts] == ["201201-202205", "202206-202406"]
+
+    covered = []
+    for p in parts:
+        lo, hi = p["period"].split("-")
+        chunk = [m for m in available if int(lo) <= int(m) <= int(hi)]
+        assert len(chunk) * 400 <= 50_000
+        covered += chunk
+    assert covered == available
+
+
+def test_split_params_keeps_small_requests_whole():
+    params = {"variable": "63", "classifications": {"315": "7169"}, "ibge_territorial_code": "1", "period": "last 12"}
+    assert split_params(params, months(202001, 60), {"variavel": 3, "315": 400}) == [params]
+    # sem metadados da dimensão não há estimativa: segue inteira
+    params_all = {**params, "classifications": {"999": "all"}, "period": "all"}
+    assert split_params(params_all, months(202001, 60), {"variavel": 3}) == [params_all]
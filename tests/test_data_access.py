@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from src import data_access
+from src.encoding import write_parquet
+
+
+@pytest.fixture
+def published(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_access, "OUT_DIR", tmp_path)
+    monkeypatch.setattr(data_access, "_loaded", {})
+    monkeypatch.setattr(data_access, "_manifest", None)
+    data_access._read.clear()
+    df = pd.DataFrame({
+        "date": pd.date_range("2024-01-31", periods=4, freq="ME"),
+        "ipca": [0.42, 0.83, 0.16, 0.38],
+        "selic": [11.25, 11.25, 10.75, 10.75],
+    })
+    write_parquet(df, data_access.path("sgs"))
+    yield df
+    data_access._read.clear()
+
+
+@pytest.mark.parametrize("cow", [True, False])
+def test_page_mutation_does_not_reach_cached_frame(published, cow):
+    with pd.option_context("mode.copy_on_write", cow):
+        before = data_access.load("sgs").copy(deep=True)
+        df = data_access.load("sgs")
+        df.loc[0, "ipca"] = 99.0
+        df["ipca"] = df["ipca"] * 2
+        df["nova"] = 1
+        sub = data_access.load("sgs", columns=["selic"])
+        sub.loc[1, "selic"] = -1.0
+
+        again = data_access.load("sgs")
+    pd.testing.assert_frame_equal(again, before)
+    assert again["ipca"].tolist() == pytest.approx(published["ipca"].tolist())
+    # a mesma instância em cache atende as duas leituras
+    assert len(data_access._loaded) == 1
+
+
+def test_import_enables_copy_on_write():
+    # páginas abertas direto (sem passar pela home.py) também recebem cópias rasas
+    assert pd.get_option("mode.copy_on_write") is True
+    with pd.option_context("mode.copy_on_write", False):
+        data_access._enable_copy_on_write()
+        assert pd.get_option("mode.copy_on_write") is True
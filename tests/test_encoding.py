@@ -0,0 +1,32 @@
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.encoding import read_parquet, schema_info, write_parquet
+
+
+def frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "date": pd.to_datetime(["2024-01-31", "2024-02-29", "2024-03-31"]),
+        "setor": ["a", "a", "b"],
+        "value": [1.25, 2.5, 3.0],
+    })
+
+
+def test_dates_come_back_as_datetime64(tmp_path):
+    path = tmp_path / "x.parquet"
+    write_parquet(frame(), path)
+    assert schema_info(path)["coerced"]
+    df = read_parquet(path)
+    assert df["date"].dtype == "datetime64[ns]"
+    assert df["date"].tolist() == frame()["date"].tolist()
+    assert read_parquet(path, columns=["date"])["date"].dtype == "datetime64[ns]"
+
+
+def test_file_without_metadata_is_coerced(tmp_path):
+    path = tmp_path / "old.parquet"
+    frame().assign(date=lambda d: d["date"].dt.strftime("%Y-%m-%d")).to_parquet(path)
+    assert schema_info(path) is None
+    assert pq.read_schema(path).field("date").type == "string"
+    df = read_parquet(path)
+    assert df["date"].dtype == "datetime64[ns]"
+    assert df["date"].iloc[1] == pd.Timestamp("2024-02-29")
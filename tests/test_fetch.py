@@ -0,0 +1,62 @@
+import random
+import time
+
+import pandas as pd
+
+from src import fetch
+
+
+def sidra_part(part: fetch.FetchRequest, *args, **kwargs) -> pd.DataFrame:
+    i = part.params["i"]
+    time.sleep(random.uniform(0, 0.02))  # as partes terminam fora de ordem
+    return pd.DataFrame({"D2C": [f"2024{i:02d}"] * 2, "D3N": ["IPCA", f"item {9 - i}"], "V": ["1.0", "-"]})
+
+
+def test_chunks_keep_period_order(monkeypatch):
+    monkeypatch.setattr(fetch, "_fetch_single", sidra_part)
+    parts = [fetch.FetchRequest("sidra", {"i": i}) for i in range(1, 9)]
+    df = fetch.fetch_chunks(parts)
+    assert df["D2C"].tolist() == [f"2024{i:02d}" for i in range(1, 9) for _ in range(2)]
+    assert df.index.tolist() == list(range(16))
+    assert df["V"].dtype == object
+
+
+def test_native_categories_are_merged_and_sorted(monkeypatch):
+    def part(req, *args, **kwargs):
+        return sidra_part(req).astype({"D3N": "category"})
+
+    monkeypatch.setattr(fetch, "_fetch_single", part)
+    df = fetch.fetch_chunks([fetch.FetchRequest("sidra", {"i": i}) for i in (1, 2, 3)])
+    assert isinstance(df["D3N"].dtype, pd.CategoricalDtype)
+    assert list(df["D3N"].cat.categories) == ["IPCA", "item 6", "item 7", "item 8"]
+
+
+def test_sgs_windows_are_stitched(monkeypatch):
+    def window(req, *args, **kwargs):
+        dates = pd.date_range(req.params["start"], periods=3, freq="D", name="Date")
+        return pd.DataFrame({"selic": range(len(dates))}, index=dates, dtype="float64")
+
+    monkeypatch.setattr(fetch, "_fetch_single", window)
+    parts = [fetch.FetchRequest("sgs", {"start": s}) for s in ("2024-01-03", "2024-01-01")]
+    df = fetch.fetch_chunks(parts)
+    assert df.index.is_monotonic_increasing and df.index.is_unique
+    assert len(df) == 5 and df.index.name == "Date"
+
+
+def test_failed_table_metadata_is_not_cached(monkeypatch):
+    calls = []
+
+    def meta(req, *args, **kwargs):
+        calls.append(req.params["kind"])
+        if len(calls) == 1:
+            raise ConnectionError("timeout")
+        if req.params["kind"] == "periodos":
+            return pd.DataFrame({"periodo": ["202401", "202402"]})
+        return pd.DataFrame({"dim": ["variavel"], "n": [1]})
+
+    monkeypatch.setattr(fetch, "_fetch_single", meta)
+    monkeypatch.setattr(fetch, "_meta", {})
+    assert fetch._table_meta("7060") is None
+    assert fetch._table_meta("7060") == (["202401", "202402"], {"variavel": 1})
+    assert fetch._table_meta("7060") == (["202401", "202402"], {"variavel": 1})
+    assert calls == ["periodos", "periodos", "metadados"]
@@ -0,0 +1,88 @@
+import pandas as pd
+import pytest
+
+from src.graph import Node, run
+
+
+@pytest.fixture
+def pipeline():
+    """fetch:a / fetch:b -> tidy:a / tidy:b -> merge -> write (e write:b só de b)."""
+    source = {"a": [1.0, 2.0], "b": [10.0, 20.0]}
+    calls: list[str] = []
+    written = set()
+
+    def node(name, func, deps=(), **kw):
+        def wrapped(inputs):
+            calls.append(name)
+            return func(inputs)
+        return Node(name, wrapped, tuple(deps), **kw)
+
+    def fetch(key):
+        return lambda _: pd.DataFrame({"v": source[key]})
+
+    def tidy(dep):
+        return lambda inp: inp[dep].assign(v=inp[dep]["v"] * 2)
+
+    def write(dep):
+        def f(inp):
+            written.add(dep)
+            return len(inp[dep])
+        return f
+
+    nodes = {
+        n.name: n
+        for n in [
+            node("fetch:a", fetch("a"), always=True),
+            node("fetch:b", fetch("b"), always=True),
+            node("tidy:a", tidy("fetch:a"), ["fetch:a"]),
+            node("tidy:b", tidy("fetch:b"), ["fetch:b"]),
+            node("merge", lambda inp: pd.concat([inp["tidy:a"], inp["tidy:b"]], ignore_index=True), ["tidy:a", "tidy:b"]),
+            node("write:merge", write("merge"), ["merge"], fresh=lambda: "merge" in written),
+            node("write:b", write("tidy:b"), ["tidy:b"], fresh=lambda: "tidy:b" in written),
+        ]
+    }
+    return nodes, source, calls, written
+
+
+def test_first_build_runs_everything(pipeline, tmp_path):
+    nodes, _, calls, _ = pipeline
+    status = run(nodes, ["write:merge", "write:b"], tmp_path / "state.json", max_workers=1)
+    assert set(status.values()) == {"run"}
+    assert sorted(calls) == sorted(nodes)
+
+
+def test_identical_inputs_skip_everything_but_sources(pipeline, tmp_path):
+    nodes, _, calls, _ = pipeline
+    state = tmp_path / "state.json"
+    run(nodes, ["write:merge", "write:b"], state)
+    calls.clear()
+
+    status = run(nodes, ["write:merge", "write:b"], state)
+    assert {n for n, s in status.items() if s == "run"} == {"fetch:a", "fetch:b"}
+    assert {n for n, s in status.items() if s == "skip"} == {"tidy:a", "tidy:b", "merge", "write:merge", "write:b"}
+    assert sorted(calls) == ["fetch:a", "fetch:b"]
+
+
+def test_changed_input_reruns_only_its_downstream(pipeline, tmp_path):
+    nodes, source, calls, _ = pipeline
+    state = tmp_path / "state.json"
+    run(nodes, ["write:merge", "write:b"], state)
+    calls.clear()
+
+    source["a"] = [1.0, 3.0]
+    status = run(nodes, ["write:merge", "write:b"], state)
+    assert {n for n, s in status.items() if s == "run"} == {"fetch:a", "fetch:b", "tidy:a", "merge", "write:merge"}
+    assert status["tidy:b"] == status["write:b"] == "skip"
+    # merge roda com tidy:b pulado: a saída de tidy:b é recalculada para a entrada, sem virar "run"
+    assert calls.count("tidy:b") == 1 and "write:b" not in calls
+
+
+def test_missing_output_reruns_the_writer(pipeline, tmp_path):
+    nodes, _, calls, written = pipeline
+    state = tmp_path / "state.json"
+    run(nodes, ["write:merge", "write:b"], state)
+    written.discard("tidy:b")  # arquivo apagado
+
+    status = run(nodes, ["write:merge", "write:b"], state)
+    assert status["write:b"] == "run"
+    assert status["write:merge"] == status["merge"] == "skip"
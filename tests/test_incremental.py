@@ -0,0 +1,28 @@
+import warnings
+
+import pandas as pd
+
+from src.incremental import merge_frames
+
+
+def frame(dates, values) -> pd.DataFrame:
+    return pd.DataFrame({"date": pd.to_datetime(dates), "setor": "a", "value": values})
+
+
+def test_new_rows_win_on_repeated_keys():
+    old = frame(["2024-01-31", "2024-02-29"], [1.0, 2.0])
+    new = frame(["2024-02-29", "2024-03-31"], [20.0, 3.0])
+    out = merge_frames(new, old, ["setor", "date"])
+    assert out["value"].tolist() == [1.0, 20.0, 3.0]
+
+
+def test_empty_or_all_na_frames_are_left_out():
+    old = frame(["2024-01-31"], [1.0])
+    empty = old.iloc[:0]
+    all_na = pd.DataFrame({"date": [pd.NaT], "setor": [None], "value": [float("nan")]})
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FutureWarning)
+        assert merge_frames(empty, old, ["setor", "date"]).equals(old)
+        assert merge_frames(all_na, old, ["setor", "date"]).equals(old)
+        assert merge_frames(old, empty, ["setor", "date"]).equals(old)
+        assert merge_frames(empty, empty, ["setor", "date"]).empty
@@ -0,0 +1,49 @@
+import pandas as pd
+
+from src import makedataset
+from src.ipca import INDICE_GERAL, children, contributions, hierarchy, matrix, with_codes
+
+
+def old_schema_frame() -> pd.DataFrame:
+    """ipca_grupos.parquet no formato antigo: date, grupo, indicador, value."""
+    dates = pd.to_datetime(["2024-01-31", "2024-02-29"])
+    rows = []
+    for d in dates:
+        for grupo, var, peso in [("Índice geral", 0.5, 100.0), ("Alimentação e bebidas", 1.0, 20.0),
+                                 ("Transportes", -0.5, 80.0)]:
+            rows.append((d, grupo, "variacao_mensal", var))
+            rows.append((d, grupo, "peso_mensal", peso))
+    return pd.DataFrame(rows, columns=["date", "grupo", "indicador", "value"])
+
+
+def test_old_schema_gets_group_hierarchy():
+    df = with_codes(old_schema_frame())
+    hier = hierarchy(df)
+    assert hier.set_index("grupo")["codigo"].to_dict() == {
+        "Índice geral": INDICE_GERAL, "Alimentação e bebidas": "1", "Transportes": "5",
+    }
+    assert sorted(children(hier, INDICE_GERAL)["codigo"]) == ["1", "5"]
+    assert hier.loc[hier["codigo"] == INDICE_GERAL, "pai"].isna().all()
+
+
+def test_old_schema_contributions():
+    df = with_codes(old_schema_frame())
+    peso = matrix(df, "peso_mensal")
+    contrib = contributions(matrix(df, "variacao_mensal"), peso)
+    assert contrib.loc["2024-01-31", "1"] == 0.2
+    assert contrib.loc["2024-01-31", "5"] == -0.4
+
+
+def test_current_schema_untouched():
+    df = with_codes(old_schema_frame())
+    assert with_codes(df) is df
+
+
+def test_incremental_rebuilds_old_schema(tmp_path, monkeypatch):
+    monkeypatch.setattr(makedataset, "OUT_DIR", tmp_path)
+    ds = makedataset.DATASETS["ipca-grupos"]
+    assert makedataset.schema_current(ds)  # nada publicado ainda
+    old_schema_frame().to_parquet(tmp_path / ds.filename)
+    assert not makedataset.schema_current(ds)
+    with_codes(old_schema_frame()).to_parquet(tmp_path / ds.filename)
+    assert makedataset.schema_current(ds)
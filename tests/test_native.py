@@ -0,0 +1,45 @@
+import json
+
+import pandas as pd
+import pytest
+
+from src import cache, endpoints
+from src.native import decode_sgs, decode_sidra
+
+
+def test_sidra_signs_are_null_like_the_sidrapy_path():
+    records = [
+        {"D2C": "202401", "D1N": "a", "V": "-"},
+        {"D2C": "202402", "D1N": "a", "V": "1.5"},
+        {"D2C": "202403", "D1N": "a", "V": "..."},
+    ]
+    df = decode_sidra(json.dumps(records).encode()).to_pandas()
+    expected = pd.to_numeric(pd.Series([r["V"] for r in records]), errors="coerce")
+    pd.testing.assert_series_equal(df["V"], expected, check_names=False)
+    assert df["D2C"].tolist() == [202401, 202402, 202403]
+
+
+def test_field_with_record_separator():
+    body = json.dumps([{"D2C": "202401", "D1N": "a},{b", "V": "1"}, {"D2C": "202402", "D1N": "c", "V": "2"}])
+    df = decode_sidra(body.encode()).to_pandas()
+    assert df["D1N"].astype(str).tolist() == ["a},{b", "c"]
+    assert df["V"].tolist() == [1.0, 2.0]
+
+
+def test_empty_sgs_response():
+    t = decode_sgs(b"[]", "selic")
+    assert t.num_rows == 0 and t.column_names == ["date", "selic"]
+
+
+@pytest.mark.parametrize("body", [b'{"erro": "tabela inexistente"}', b"Par\xe2metro inv\xe1lido", b'"texto"'])
+def test_unexpected_response(body):
+    with pytest.raises(ValueError, match="Resposta inesperada"):
+        decode_sidra(body)
+
+
+def test_cache_key_depends_on_backend(monkeypatch):
+    keys = set()
+    for backend in ("lib", "http", "arrow"):
+        monkeypatch.setattr(endpoints, "BACKEND", backend)
+        keys.add(cache.request_key("sidra", {"table_code": "1737"}))
+    assert len(keys) == 3
@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+from src.validate import Checks, ValidationError, check, validate
+
+KEYS = ["setor", "date"]
+CHECKS = Checks("monthly", {"value": (-100.0, 100.0)})
+
+
+def frame() -> pd.DataFrame:
+    dates = pd.date_range("2024-01-31", periods=6, freq="ME")
+    return pd.DataFrame({
+        "setor": ["a"] * 6 + ["b"] * 6,
+        "date": list(dates) * 2,
+        "value": [0.5, 0.3, -0.1, 0.2, 0.4, 0.6, 1.1, 0.9, 1.0, 1.2, 0.8, 0.7],
+    })
+
+
+def test_valid_frame_passes():
+    df = frame()
+    assert validate(df, KEYS, CHECKS) == []
+    assert check(df, "x", KEYS, CHECKS) is df
+
+
+def test_duplicate_keys():
+    df = pd.concat([frame(), frame().iloc[[3]]], ignore_index=True)
+    assert validate(df, KEYS, CHECKS) == ["1 linhas com chaves repetidas ['setor', 'date']"]
+
+
+def test_out_of_range_dates():
+    df = frame()
+    df.loc[0, "date"] = pd.Timestamp("1850-01-31")
+    df.loc[11, "date"] = pd.Timestamp.today().normalize() + pd.Timedelta(days=400)
+    failures = validate(df, KEYS, Checks("monthly", max_gap=None))
+    assert len(failures) == 1
+    assert failures[0].startswith("2 datas fora da faixa [1900-01-01, ")
+    assert "(de 1850-01-31 a " in failures[0]
+
+
+def test_null_keys():
+    df = frame()
+    df.loc[2, "date"] = pd.NaT
+    df.loc[7, "setor"] = None
+    failures = validate(df, KEYS, Checks("monthly", max_gap=None))
+    assert failures == ["setor: 1 chaves nulas", "date: 1 chaves nulas"]
+
+
+def test_frequency_gaps():
+    df = frame().drop(index=[2, 3, 8]).reset_index(drop=True)
+    assert validate(df, KEYS, CHECKS) == ["2 lacunas na série (maior salto: 3 períodos)"]
+
+
+def test_values_out_of_range_and_empty_columns():
+    df = frame().assign(value=lambda d: d["value"].where(d.index != 4, 250.0), extra=float("nan"))
+    assert validate(df, KEYS, CHECKS) == [
+        "extra: coluna inteiramente vazia",
+        "value: 1 valores fora da faixa [-100, 100]",
+    ]
+
+
+def test_check_raises_with_every_failure():
+    df = pd.concat([frame(), frame().iloc[[0]]], ignore_index=True)
+    df.loc[5, "value"] = -500.0
+    with pytest.raises(ValidationError) as exc:
+        check(df, "ipp", KEYS, CHECKS)
+    assert exc.value.dataset == "ipp"
+    assert exc.value.failures == [
+        "1 linhas com chaves repetidas ['setor', 'date']",
+        "value: 1 valores fora da faixa [-100, 100]",
+    ]
+    assert str(exc.value).startswith("ipp: 1 linhas com chaves repetidas")
+
+
+def test_previous_build_comparison():
+    previous = {
+        "rows": 20,
+        "schema": {"setor": "category", "date": "date32", "value": "float", "antiga": "float"},
+        "last_valid": {"value": "2024-12-31"},
+        "median_abs": {"value": 0.001},
+    }
+    failures = validate(frame(), KEYS, CHECKS, previous)
+    assert failures[0] == "colunas removidas em relação ao build anterior: ['antiga']"
+    assert "linhas caíram de 20 para 12" in failures
+    assert "value: última data válida recuou de 2024-12-31 para 2024-06-30" in failures
+    assert any(f.startswith("value: escala mudou") for f in failures)
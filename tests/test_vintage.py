@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+from src import vintage
+
+KEYS = ["setor", "date"]
+V1, V2 = pd.Timestamp("2025-03-04 09:00"), pd.Timestamp("2025-06-03 09:00")
+
+
+def release(values: dict[str, list[float]]) -> pd.DataFrame:
+    frames = [
+        pd.DataFrame({"setor": setor, "date": pd.date_range("2024-03-31", periods=len(v), freq="QE"), "value": v})
+        for setor, v in values.items()
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+FIRST = release({"PIB": [1.0, 0.8, 0.9], "Agro": [5.0, -2.0, 1.1]})
+# revisão de PIB 2024Q2, novo trimestre de PIB, Agro 2024Q4 retirado
+SECOND = release({"PIB": [1.0, 1.2, 0.9, 0.4], "Agro": [5.0, -2.0]})
+
+
+@pytest.fixture
+def store(tmp_path):
+    assert vintage.record("pib", FIRST, KEYS, vintage=V1, vintage_dir=tmp_path) == 6
+    assert vintage.record("pib", SECOND, KEYS, vintage=V2, vintage_dir=tmp_path) == 3
+    return tmp_path
+
+
+def expected(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values(KEYS).reset_index(drop=True)
+
+
+def test_as_of_before_between_and_after(store):
+    assert vintage.as_of("pib", "2025-01-01", vintage_dir=store).empty
+    pd.testing.assert_frame_equal(vintage.as_of("pib", "2025-04-01", vintage_dir=store), expected(FIRST))
+    pd.testing.assert_frame_equal(vintage.as_of("pib", V1, vintage_dir=store), expected(FIRST))
+    pd.testing.assert_frame_equal(vintage.as_of("pib", "2025-07-01", vintage_dir=store), expected(SECOND))
+    pd.testing.assert_frame_equal(vintage.as_of("pib", vintage_dir=store), expected(SECOND))
+
+
+def test_only_changed_cells_are_appended(store):
+    files = sorted(p.name for p in (store / "pib").glob("v-*.parquet"))
+    assert files == ["v-20250304T090000.parquet", "v-20250603T090000.parquet"]
+    last = vintage.read_cells("pib", vintage_dir=store).query("vintage == @V2")
+    assert sorted(zip(last["setor"], last["date"].dt.strftime("%Y-%m"), last["removed"])) == [
+        ("Agro", "2024-09", True),
+        ("PIB", "2024-06", False),
+        ("PIB", "2024-12", False),
+    ]
+
+
+def test_identical_data_does_not_append(store):
+    assert vintage.record("pib", SECOND, KEYS, vintage="2025-09-02", vintage_dir=store) == 0
+    # ruído de float32 (parquet publicado) não é revisão
+    noisy = SECOND.assign(value=SECOND["value"].astype("float32").astype("float64"))
+    assert vintage.record("pib", noisy, KEYS, vintage="2025-09-03", vintage_dir=store) == 0
+    assert len(list((store / "pib").glob("v-*.parquet"))) == 2
+
+
+def test_revisions_first_vs_current(store):
+    rev = vintage.revisions("pib", vintage_dir=store).set_index(["setor", "date"])
+    row = rev.loc[("PIB", pd.Timestamp("2024-06-30"))]
+    assert (row["first"], row["current"], row["n_vintages"]) == (0.8, 1.2, 2)
+    assert row["revision"] == pytest.approx(0.4)
+    assert row["first_vintage"] == V1 and row["current_vintage"] == V2